@@ -0,0 +1,188 @@
+"""材質圖集 (texture atlas)
+
+把所有圖片依遊戲中實際使用的大小縮放後，用貨架式裝箱 (shelf packing)
+排進少數幾張大圖，依像素格式分頁 (不透明 / colorkey / alpha)，
+讓繪圖時可以用一次 Surface.blits 從同一張大圖取不同區塊。
+
+排好的結果存在 assets/atlas/ (atlas.json + 每頁一張 png)，
+來源圖片沒有變動時直接載入，不會每次啟動都重新排版。
+
+實測 (python bench.py atlas，兩種輪流量、取中位數)：軟體繪圖下每次 blit 的成本主要在
+逐像素混色，一次 blits 與共用大圖省下的只是呼叫的成本，懲罰模式畫面 (61 個精靈) 兩者
+在量測誤差內 (各約 4–6 ms，每次執行互有勝負)，圖集並沒有比較快；載入加上縮放的時間也差不多。
+
+手動重建：python atlas.py
+"""
+import os
+import sys
+import json
+
+import pygame
+import engine
+
+ATLAS_VERSION = 2
+PAGE_SIZE = 1024
+PADDING = 1 # 區塊之間留 1 像素，避免縮放/取樣時沾到隔壁
+# 區塊的 x 與整頁寬度對齊 (像素)：寬度不對齊時 alpha blit 會慢到兩倍
+ALIGN_X = 8
+ALIGN_PAGE_W = 64
+ATLAS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "atlas")
+LAYOUT_FILE = "atlas.json"
+
+
+def in_game_variants():
+    """列出遊戲中會用到的 (圖片名稱, 大小)"""
+    variants = set()
+    for size, _, asset in engine.COIN_STYLES:
+        variants.add((asset, size))
+    for base in ("player", "player2"):
+        for name in (base, base + "_jump", base + "2", base + "2_jump"):
+            variants.add((name, 200))   # Player.current_size
+        variants.add((base, 180))       # 角色選擇卡片
+    variants.add(("player_jump", 200))  # AerialEnemy.base_size
+    variants.add(("player_jump", 80))   # formation.FORMATION_SIZE
+    return sorted(variants)
+
+
+def classify_surface(surf):
+    """'opaque' / 'colorkey' / 'alpha'，規則與 engine.optimize_surface 相同"""
+    total = surf.get_width() * surf.get_height()
+    opaque = pygame.mask.from_surface(surf, 254).count()
+    if opaque == total:
+        return "opaque"
+    if pygame.mask.from_surface(surf, 0).count() == opaque:
+        return "colorkey"
+    return "alpha"
+
+
+def pack_shelves(sizes, page_size=PAGE_SIZE):
+    """貨架式裝箱：依高度由大到小排，一列放滿就換下一列，一頁放滿就換頁
+
+    sizes 為 [(key, w, h)]，回傳 {key: (頁碼, x, y)} 與每頁實際用到的 (寬, 高)
+    """
+    placements = {}
+    pages = []
+    x = y = shelf_h = 0
+    used_w = 0
+    for key, w, h in sorted(sizes, key=lambda item: (-item[2], -item[1])):
+        if not pages:
+            pages.append((0, 0))
+        if x + w > page_size:
+            # 換下一列
+            y += shelf_h + PADDING
+            x = shelf_h = 0
+        if y + h > page_size:
+            # 換頁
+            pages.append((0, 0))
+            x = y = shelf_h = used_w = 0
+        placements[key] = (len(pages) - 1, x, y)
+        used_w = max(used_w, x + w)
+        x = _align(x + w + PADDING, ALIGN_X)
+        shelf_h = max(shelf_h, h)
+        pages[-1] = (min(page_size, _align(used_w, ALIGN_PAGE_W)), y + shelf_h)
+    return placements, pages
+
+
+def _align(value, step):
+    return (value + step - 1) // step * step
+
+
+def _source_signature(asset_path):
+    """來源圖片的檔名/大小/修改時間，用來判斷快取的圖集是否過期"""
+    signature = []
+    for filename in sorted(os.listdir(asset_path)):
+        full_path = os.path.join(asset_path, filename)
+        if os.path.isfile(full_path) and filename.lower().endswith((".png", ".jpg", ".jpeg")):
+            stat = os.stat(full_path)
+            signature.append([filename, stat.st_size, stat.st_mtime_ns])
+    return signature
+
+
+def build(resource_manager, asset_path):
+    """依目前的來源圖片排版並存檔，回傳 layout dict"""
+    variants = [(name, size) for name, size in in_game_variants() if resource_manager.get(name)]
+    scaled = {}
+    by_format = {"opaque": [], "colorkey": [], "alpha": []}
+    for name, size in variants:
+        image = pygame.transform.scale(resource_manager.get(name), (size, size))
+        key = f"{name}@{size}"
+        scaled[key] = image
+        by_format[classify_surface(image)].append((key, size, size))
+
+    os.makedirs(ATLAS_DIR, exist_ok=True)
+    for filename in os.listdir(ATLAS_DIR):
+        if filename.endswith(".png"):
+            os.remove(os.path.join(ATLAS_DIR, filename))
+
+    layout = {"version": ATLAS_VERSION, "sources": _source_signature(asset_path),
+              "pages": [], "regions": {}}
+    for fmt, sizes in by_format.items():
+        if not sizes:
+            continue
+        placements, page_sizes = pack_shelves(sizes)
+        first_page = len(layout["pages"])
+        for i, (w, h) in enumerate(page_sizes):
+            if fmt == "alpha":
+                page = pygame.Surface((w, h), pygame.SRCALPHA)
+            else:
+                page = pygame.Surface((w, h))
+                page.fill(engine.COLORKEY)
+            for key, (page_index, x, y) in placements.items():
+                if page_index == i:
+                    page.blit(scaled[key], (x, y))
+            filename = f"{fmt}-{i}.png"
+            pygame.image.save(page, os.path.join(ATLAS_DIR, filename))
+            layout["pages"].append({"file": filename, "format": fmt})
+        for key, (page_index, x, y) in placements.items():
+            w, h = scaled[key].get_size()
+            layout["regions"][key] = [first_page + page_index, x, y, w, h]
+
+    with open(os.path.join(ATLAS_DIR, LAYOUT_FILE), "w", encoding="utf-8") as f:
+        json.dump(layout, f, indent=1)
+    return layout
+
+
+def load(resource_manager, asset_path):
+    """載入 (必要時重建) 圖集，把每個區塊登記進 resource_manager
+
+    需要已經 set_mode；回傳頁數
+    """
+    layout_path = os.path.join(ATLAS_DIR, LAYOUT_FILE)
+    layout = None
+    if os.path.exists(layout_path):
+        with open(layout_path, encoding="utf-8") as f:
+            layout = json.load(f)
+        if layout.get("version") != ATLAS_VERSION or layout.get("sources") != _source_signature(asset_path):
+            layout = None
+    if layout is None:
+        layout = build(resource_manager, asset_path)
+
+    pages = []
+    for page_info in layout["pages"]:
+        page = pygame.image.load(os.path.join(ATLAS_DIR, page_info["file"]))
+        if page_info["format"] == "alpha":
+            page = page.convert_alpha()
+        else:
+            page = page.convert()
+            if page_info["format"] == "colorkey":
+                page.set_colorkey(engine.COLORKEY, pygame.RLEACCEL)
+        pages.append(page)
+
+    for key, (page_index, x, y, w, h) in layout["regions"].items():
+        name, size = key.rsplit("@", 1)
+        resource_manager.add_atlas_region(name, (int(size), int(size)), pages[page_index], pygame.Rect(x, y, w, h))
+    return len(pages)
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    engine.resource_manager.use_atlas = False
+    engine.resource_manager.load_assets()
+    asset_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+    layout = build(engine.resource_manager, asset_path)
+    for i, page in enumerate(layout["pages"]):
+        regions = sum(1 for r in layout["regions"].values() if r[0] == i)
+        print(f"{page['file']:<16} {page['format']:<9} {regions} 個區塊")
+    sys.exit(0)
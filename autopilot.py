@@ -0,0 +1,262 @@
+"""自動駕駛機器人：用和玩家一樣的輸入 (INPUT_* 位元遮罩) 操控 Player
+
+每幀在固定的毫秒預算內做 anytime 搜尋：把未來幾十幀切成數段，
+每段選一個動作 (左/右/不動、是否起跳、是否格擋)，用輕量的預測模型
+(只複製玩家的幾個數字，雷射/尖刺/子彈/金幣都是可直接算出的軌跡)
+推演並評分，時間用完就採用目前最好的方案，下一幀再從它繼續改良。
+
+用途：長時間測試的驅動程式、平衡工具的基準線。
+"""
+import time
+import random
+
+from engine import (SCREEN_WIDTH, SCREEN_HEIGHT, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP,
+                    INPUT_SHIELD, INPUT_BLOCK, resource_manager)
+
+# --- 搜尋參數 ---
+SEGMENT_FRAMES = 8      # 每段動作持續的幀數
+SEGMENTS = 5            # 預測 8 x 5 = 40 幀
+DEATH_PENALTY = 100000
+DISCOUNT = 0.97         # 越遠的得失越不確定
+
+MOVES = (0, INPUT_LEFT, INPUT_RIGHT)
+
+
+class PlayerState:
+    """預測用的玩家狀態，只有推演需要的欄位，複製很便宜"""
+    __slots__ = ("x", "y", "vy", "jumping", "shield")
+
+    def __init__(self, x, y, vy, jumping, shield):
+        self.x, self.y, self.vy, self.jumping, self.shield = x, y, vy, jumping, shield
+
+
+class Forecast:
+    """從 GameSession 擷取未來 horizon 幀內可預測的危險與金幣"""
+
+    def __init__(self, game, horizon):
+        player = game.player
+        self.horizon = horizon
+        self.half_w = player.hit_rect.width / 2
+        self.half_h = player.hit_rect.height / 2
+        # hit_rect 中心相對 rect 底部的位置 (落地判定用 rect.bottom)
+        self.center_to_bottom = player.rect.bottom - player.hit_rect.centery
+        self.ground_y = player.ground_y
+        self.speed = player.speed
+        self.jump_strength = player.jump_strength
+        self.gravity = player.gravity
+        self.shield_timer = player.shield_timer if player.shield_active else 0
+        # 金幣與子彈用像素碰撞：以不透明像素的外框近似，(box_dx, box_dy) 為外框中心相對 hit_rect 中心
+        box = resource_manager.mask(player.image)[1]
+        self.box_dx = box.centerx - player.rect.width / 2
+        self.box_dy = box.centery - player.rect.height / 2
+        box_w, box_h = box.width / 2, box.height / 2
+
+        # 每一幀的致命 x 區間：lasers[f] 全高度、spikes[f] 只在 spike_top 以下
+        self.lasers = [[] for _ in range(horizon + 1)]
+        self.spikes = [[] for _ in range(horizon + 1)]
+        self.spike_top = SCREEN_HEIGHT
+        self.danger_columns = []    # 目前預警中的區域，超出預測範圍後仍會致命
+        for lc in game.laser_cannons:
+            if lc.active and (lc.is_warning or lc.is_firing):
+                self.danger_columns.append((lc.x + 20, lc.x + lc.width - 20))
+                self._mark_cycle(self.lasers, lc.timer, lc.cooldown, lc.warning_duration,
+                                 lc.warning_duration + lc.fire_duration, lc.x + 20, lc.x + lc.width - 20)
+        spikes = game.ground_spikes
+        if spikes.active and (spikes.is_warning or spikes.is_attacking):
+            self.spike_top = SCREEN_HEIGHT - spikes.height
+            self._mark_cycle(self.spikes, spikes.timer, spikes.cooldown, spikes.warning_duration,
+                             spikes.warning_duration + spikes.attack_duration, spikes.x, spikes.x + spikes.width)
+
+        self.bullets = []
+        for b in game.bullets:
+            bbox = resource_manager.mask(b.image)[1]
+            self.bullets.append((b.rect.x + bbox.centerx, b.rect.y + bbox.centery, b.vx, b.vy,
+                                 bbox.width / 2 + box_w, bbox.height / 2 + box_h))
+
+        # 金幣：普通金幣都要算 (漏接會扣分)，懲罰金幣只留預測範圍內碰得到的
+        self.score = game.score
+        self.miss_penalty = 0 if game.is_in_penalty_mode and not game.miss_penalty_in_penalty else 5
+        self.shield_stops_bullets = game.shield_stops_bullets
+        reach = self.speed * horizon + box_w
+        px = player.hit_rect.centerx + self.box_dx
+        self.coins = []
+        for c in game.coins:
+            cbox = resource_manager.mask(c.image)[1]
+            cx, cy = c.rect.x + cbox.centerx, c.rect.y + cbox.centery
+            reach_x, reach_y = cbox.width / 2 + box_w, cbox.height / 2 + box_h
+            if c.type == "penalty":
+                bottom_at_end = cy + reach_y + c.speed * horizon
+                if bottom_at_end < player.rect.top - 200 or abs(cx - px) > reach + reach_x:
+                    continue
+            miss_y = cy + SCREEN_HEIGHT - c.rect.top   # rect.top 超過畫面底部
+            value = -100 if c.type == "penalty" else 100
+            self.coins.append((cx, cy, c.speed, reach_x, reach_y, value, miss_y))
+
+    def _mark_cycle(self, table, timer, cooldown, start, end, left, right):
+        for f in range(1, self.horizon + 1):
+            cycle_time = (timer + f) % cooldown
+            if cycle_time == 1:
+                break   # 下一輪的位置還不知道
+            if start <= cycle_time < end:
+                table[f].append((left, right))
+
+    def player_state(self, game):
+        player = game.player
+        return PlayerState(player.hit_rect.centerx, player.hit_rect.centery, player.velocity_y,
+                           player.is_jumping, self.shield_timer)
+
+
+class Autopilot:
+    """每幀呼叫 decide(game) 取得輸入位元遮罩"""
+
+    def __init__(self, budget_ms=2.0, seed=None, max_rollouts=None):
+        """max_rollouts 時每幀固定推演這麼多個方案、不看時間，同一個 seed 的決策完全可重現"""
+        self.budget = budget_ms / 1000.0
+        self.max_rollouts = max_rollouts
+        self.rng = random.Random(seed)
+        self.plan = None            # 目前最好的動作序列 (每段一個位元遮罩)
+        self.plan_frame = 0         # 目前這段已經執行了幾幀
+        self.rollouts = 0           # 上一次 decide 推演了幾個方案
+        self.last_think_ms = 0.0
+
+    def decide(self, game):
+        start = time.perf_counter()
+        deadline = start + self.budget
+        horizon = SEGMENT_FRAMES * SEGMENTS
+        forecast = Forecast(game, horizon)
+        origin = forecast.player_state(game)
+        can_block = game.shop.has_block_skill
+
+        actions = [move | jump for move in MOVES for jump in (0, INPUT_JUMP)]
+        if can_block:
+            actions += [INPUT_BLOCK, INPUT_BLOCK | INPUT_LEFT, INPUT_BLOCK | INPUT_RIGHT]
+
+        # 候選：沿用上一幀的計畫 (往前推一段)，加上每個固定動作
+        candidates = []
+        if self.plan:
+            if self.plan_frame >= SEGMENT_FRAMES:
+                self.plan = self.plan[1:] + [self.plan[-1]]
+                self.plan_frame = 0
+            candidates.append(self.plan)
+        candidates += [[a] * SEGMENTS for a in actions]
+
+        best_plan, best_score = None, None
+        rollouts = 0
+        i = 0
+        while True:
+            # 至少評估第一個候選，之後時間到就停 (anytime)
+            if rollouts and (time.perf_counter() >= deadline if self.max_rollouts is None
+                             else rollouts >= self.max_rollouts):
+                break
+            if i < len(candidates):
+                plan = candidates[i]
+                i += 1
+            else:
+                plan = self._mutate(best_plan, actions)
+            score, _ = self._rollout(forecast, origin, plan, self.plan_frame if plan is self.plan else 0)
+            rollouts += 1
+            if best_score is None or score > best_score:
+                best_plan, best_score = plan, score
+
+        if best_plan is not self.plan:
+            self.plan = best_plan
+            self.plan_frame = 0
+        controls = self.plan[0]
+        # 跳躍只在一段的第一幀按下
+        if self.plan_frame > 0:
+            controls &= ~INPUT_JUMP
+        self.plan_frame += 1
+
+        # 怎麼走都會死而且有護盾時開盾
+        if best_score <= -DEATH_PENALTY / 2 and game.shop.shield_count > 0 and not game.player.shield_active:
+            controls |= INPUT_SHIELD
+
+        self.rollouts = rollouts
+        self.last_think_ms = (time.perf_counter() - start) * 1000
+        return controls
+
+    def _mutate(self, plan, actions):
+        plan = list(plan)
+        for _ in range(self.rng.randint(1, 2)):
+            plan[self.rng.randrange(SEGMENTS)] = self.rng.choice(actions)
+        return plan
+
+    def _rollout(self, fc, origin, plan, offset):
+        """推演一個方案，回傳 (分數, 死亡幀)；offset 為第一段已經執行過的幀數"""
+        s = PlayerState(origin.x, origin.y, origin.vy, origin.jumping, origin.shield)
+        half_w, half_h = fc.half_w, fc.half_h
+        score = 0.0
+        weight = 1.0
+        frame = 0
+        caught = [False] * len(fc.coins)
+        credits = fc.score
+        for segment, controls in enumerate(plan):
+            length = SEGMENT_FRAMES - offset if segment == 0 else SEGMENT_FRAMES
+            for step in range(length):
+                frame += 1
+                if frame > fc.horizon:
+                    return score, None
+                blocking = controls & INPUT_BLOCK
+                if step == 0 and controls & INPUT_JUMP and not s.jumping and not blocking and \
+                        not (segment == 0 and offset):
+                    s.vy = fc.jump_strength
+                    s.jumping = True
+                move = 2 if blocking else fc.speed
+                if controls & INPUT_LEFT: s.x -= move
+                if controls & INPUT_RIGHT: s.x += move
+                s.x = min(max(s.x, half_w), SCREEN_WIDTH - half_w)
+                s.vy += fc.gravity
+                s.y += s.vy
+                if s.y + fc.center_to_bottom >= fc.ground_y:
+                    s.y = fc.ground_y - fc.center_to_bottom
+                    s.vy = 0
+                    s.jumping = False
+                if s.shield:
+                    s.shield -= 1
+
+                left, right = s.x - half_w, s.x + half_w
+                bottom = s.y + half_h
+                dead = False
+                if not s.shield:
+                    for l, r in fc.lasers[frame]:
+                        if left < r and right > l:
+                            dead = True
+                if bottom > fc.spike_top:
+                    for l, r in fc.spikes[frame]:
+                        if left < r and right > l:
+                            dead = True
+                box_x, box_y = s.x + fc.box_dx, s.y + fc.box_dy
+                if not blocking and not (s.shield and fc.shield_stops_bullets):
+                    for bx, by, vx, vy, reach_x, reach_y in fc.bullets:
+                        if abs(bx + vx * frame - box_x) < reach_x and abs(by + vy * frame - box_y) < reach_y:
+                            dead = True
+                for i, (cx, cy, speed, reach_x, reach_y, value, miss_y) in enumerate(fc.coins):
+                    if caught[i]:
+                        continue
+                    cy += speed * frame
+                    if cy > miss_y:
+                        # 掉出畫面：普通金幣扣 5 分
+                        caught[i] = True
+                        if value > 0:
+                            credits -= fc.miss_penalty
+                            score -= fc.miss_penalty * weight
+                    elif abs(cx - box_x) < reach_x and abs(cy - box_y) < reach_y:
+                        score += value * weight
+                        credits += value
+                        caught[i] = True
+                if credits < 0:
+                    dead = True   # 分數變負數會直接死亡
+                if dead:
+                    return score - DEATH_PENALTY * (1.0 + (fc.horizon - frame) / fc.horizon), frame
+                weight *= DISCOUNT
+            offset = 0
+        # 預測範圍外的估計：停在預警區域裡很危險、往還沒接到的金幣靠近
+        for l, r in fc.danger_columns:
+            if s.x + half_w > l and s.x - half_w < r:
+                score -= DEATH_PENALTY * 0.2
+        for i, (cx, cy, speed, reach_x, reach_y, value, miss_y) in enumerate(fc.coins):
+            if not caught[i] and value > 0:
+                score += value * 0.5 * max(0.0, 1.0 - abs(cx - s.x - fc.box_dx) / SCREEN_WIDTH)
+        # 靠近畫面中央比較有閃避空間
+        score -= abs(s.x - SCREEN_WIDTH / 2) * 0.01
+        return score, None
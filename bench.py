@@ -0,0 +1,779 @@
+"""效能基準測試
+
+用法：
+    python bench.py blit        各種像素格式的 blit 速度
+    python bench.py atlas       圖集批次繪製 vs 逐張 Surface (兩者在誤差內，圖集沒有比較快)
+    python bench.py quality     後期畫面在每個畫質等級的繪圖時間
+    python bench.py scale       邏輯畫布放大到各種視窗大小的成本
+    python bench.py collision   懲罰模式金幣密度下，像素遮罩碰撞 vs 只比 rect
+    python bench.py sound       音效載入時間、play() 的成本與懲罰模式下的限流
+    python bench.py formation   空中敵人編隊 (numpy) vs 逐一更新 AerialEnemy 的成本
+    python bench.py capture     錄影時主迴圈每幀的額外時間與掉幀數
+    python bench.py startup     python -m play 到第一個畫面的時間，超過預算時失敗
+    python bench.py gc          有無 GC 管理 (--gc) 的幀時間百分位數與 GC 暫停
+    python bench.py metrics     --metrics 在遊戲執行緒每幀的成本與產生一次回應的時間
+    python bench.py hazardmap   危險物佔用表每秒可回答的查詢數 vs 每次往前推演
+    python bench.py ui          商店、死亡畫面、HUD、角色選擇：快取圖層 vs 每幀重畫
+    python bench.py pipeline    一般主迴圈 vs 模擬/繪圖分開兩條執行緒 (--pipeline) 的幀時間與藏起來的模擬時間
+    python bench.py versus      雙人對戰 (共用世界) 第二個玩家的邊際成本 vs 兩局各自的 GameSession
+    python bench.py savegame    存檔的打包/寫檔/接續時間與大小 (金幣與子彈數量到上萬)
+    python bench.py alloc [--alloc-budget BYTES]
+                                後期畫面穩定後每幀的記憶體配置，超過預算時失敗
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
+import engine
+
+
+def _open_window():
+    pygame.init()
+    screen = pygame.display.set_mode((engine.SCREEN_WIDTH, engine.SCREEN_HEIGHT))
+    engine.init_display()
+    return screen
+
+
+def _time_blits(screen, image, count=2000):
+    positions = [((i * 37) % 600, (i * 53) % 400) for i in range(count)]
+    start = time.perf_counter()
+    for pos in positions:
+        screen.blit(image, pos)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def bench_blit():
+    """比較每個精靈圖以 convert_alpha() 與最佳化格式 blit 的時間"""
+    screen = _open_window()
+    rm = engine.resource_manager
+    cases = [
+        ("bullet", engine.draw_bullet_sprite()),
+        ("coin fallback 70", engine.draw_coin_sprite(70, False)),
+        ("penalty fallback 180", engine.draw_coin_sprite(180, True)),
+        ("enemy fallback 200", engine.draw_enemy_sprite(200)),
+        ("player fallback 200", engine.draw_player_sprite(200, 1)),
+    ]
+    for name, size in [("flag", 70), ("flag2", 90), ("flag3", 180), ("player", 200), ("player_jump", 120)]:
+        source = rm.get(name)
+        if source:
+            cases.append((f"{name} {size}", pygame.transform.scale(source.convert_alpha(), (size, size))))
+
+    print(f"{'sprite':<22} {'format':<13} {'alpha us':>9} {'best us':>9} {'speedup':>8}")
+    for name, raw in cases:
+        alpha = raw.convert_alpha()
+        best = engine.optimize_surface(raw)
+        t_alpha = _time_blits(screen, alpha)
+        t_best = _time_blits(screen, best)
+        print(f"{name:<22} {engine.surface_format(best):<13} {t_alpha:>9.2f} {t_best:>9.2f} {t_alpha / t_best:>7.2f}x")
+
+
+def _penalty_scene(coins=60):
+    """懲罰模式下的畫面：一位玩家加上滿天的金幣"""
+    game = engine.GameSession()
+    game.start("player")
+    game.is_in_penalty_mode = True
+    for _ in range(coins):
+        game.spawn_coin()
+    for i, coin in enumerate(game.coins):
+        coin.rect.y = (i * 97) % 500
+    return game
+
+
+def bench_atlas():
+    """同一個畫面分別用圖集 (blits 從大圖取區塊) 與逐張縮放的 Surface 繪製；
+    兩種輪流量幾輪取中位數，CPU 降頻或背景負載不會只算到其中一種"""
+    screen = _open_window()
+    rm = engine.resource_manager
+    scenes = {}
+    for use_atlas in (False, True):
+        rm.use_atlas = use_atlas
+        rm.load_assets()
+        random.seed(0)  # 兩個畫面的金幣位置相同
+        scenes[use_atlas] = _penalty_scene()
+    # 逐張縮放的 Surface 不在 rm.sources 裡，載入圖集後照樣逐張 blit
+    pages = {id(page) for page, _ in rm.sources.values()}
+    rounds = {False: [], True: []}
+    for _ in range(7):
+        for use_atlas, game in scenes.items():
+            for _ in range(20):
+                rm.draw_sprites(screen, game.all_sprites)
+            start = time.perf_counter()
+            for _ in range(100):
+                rm.draw_sprites(screen, game.all_sprites)
+            rounds[use_atlas].append((time.perf_counter() - start) / 100 * 1000)
+    print(f"sprites per frame: {len(scenes[True].all_sprites)}  atlas pages: {len(pages)}")
+    for use_atlas, label in ((False, "separate surfaces"), (True, "atlas")):
+        times = sorted(rounds[use_atlas])
+        print(f"{label:<18} median {times[3]:.3f} ms  (min {times[0]:.3f}, max {times[-1]:.3f})")
+
+
+def _late_game_scene():
+    """懲罰模式加上兩座雷射發射中、尖刺攻擊中、敵人與子彈都在場"""
+    game = _penalty_scene()
+    game.score = 5000
+    for lc in game.laser_cannons:
+        lc.active, lc.is_firing = True, True
+    game.laser_cannons[1].x = 500
+    spikes = game.ground_spikes
+    spikes.active, spikes.is_attacking, spikes.anim_frame = True, True, 10
+    game.aerial_enemy.active = True
+    for i in range(6):
+        b = engine.Bullet(100 + i * 100, 100, 400, 600)
+        game.bullets.add(b)
+        game.all_sprites.add(b)
+    return game
+
+
+def bench_quality():
+    """同一個後期畫面在每個畫質等級下 GameSession.draw 的時間"""
+    screen = _open_window()
+    game = _late_game_scene()
+    print(f"{'level':<6} {'glow':>4} {'particles':>9} {'sparks':>6} {'scale':>5} {'draw ms':>8}")
+    for level, q in enumerate(engine.QUALITY_LEVELS):
+        engine.set_quality_level(level)
+        for _ in range(20):
+            game.draw(screen)
+        start = time.perf_counter()
+        for _ in range(200):
+            game.draw(screen)
+        ms = (time.perf_counter() - start) / 200 * 1000
+        print(f"{level:<6} {q.glow_layers:>4} {q.max_particles:>9} {str(q.sparks):>6} {q.render_scale:>5} {ms:>8.3f}")
+    engine.set_quality_level(0)
+
+
+def bench_scale():
+    """Display.present 的成本：800x600 畫布放大到常見視窗大小，以及效能模式省下的繪圖時間"""
+    from display import Display
+    pygame.init()
+    game = None
+    print(f"{'window':<11} {'scale ms':>9} {'smooth ms':>10} {'draw 1.0':>9} {'draw 0.5':>9}")
+    for size in [(800, 600), (1280, 720), (1600, 1200), (1920, 1080), (2560, 1440)]:
+        display = Display(size)
+        if game is None:
+            engine.init_display()
+            game = _late_game_scene()
+        times = []
+        for smooth in (False, True):
+            display.smooth = smooth
+            display.present()
+            start = time.perf_counter()
+            for _ in range(100):
+                display.present()
+            times.append((time.perf_counter() - start) / 100 * 1000)
+        for render_scale in (1.0, 0.5):
+            for _ in range(10):
+                game.draw(display.canvas, render_scale)
+            start = time.perf_counter()
+            for _ in range(100):
+                game.draw(display.canvas, render_scale)
+            times.append((time.perf_counter() - start) / 100 * 1000)
+        name = f"{size[0]}x{size[1]}"
+        print(f"{name:<11} {times[0]:>9.3f} {times[1]:>10.3f} {times[2]:>9.3f} {times[3]:>9.3f}")
+
+
+def bench_collision(frames=300):
+    """懲罰模式滿天金幣時，每幀玩家對所有金幣做碰撞判定的時間"""
+    _open_window()  # 金幣/玩家圖片的 convert() 需要顯示模式
+    for coins in (60, 120, 240):
+        game = _penalty_scene(coins)
+        player = game.player
+        # 金幣均勻散佈在玩家高度附近，讓一部分金幣的 rect 真的與玩家重疊
+        for i, coin in enumerate(game.coins):
+            coin.rect.topleft = ((i * 131) % 700, player.rect.top - 100 + (i * 53) % 250)
+            coin.hit_rect.center = coin.rect.center
+        coin_list = list(game.coins)
+        engine.pixels_collide(player, coin_list[0])    # 建立遮罩快取
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            rect_hits = sum(1 for coin in coin_list if player.hit_rect.colliderect(coin.hit_rect))
+        t_rect = (time.perf_counter() - start) / frames * 1e6
+        start = time.perf_counter()
+        for _ in range(frames):
+            pixel_hits = sum(1 for coin in coin_list if engine.pixels_collide(player, coin))
+        t_pixel = (time.perf_counter() - start) / frames * 1e6
+        candidates = sum(1 for coin in coin_list if player.rect.colliderect(coin.rect))
+        print(f"{coins:>4} coins: rect {t_rect:7.1f} us ({rect_hits} hits)   "
+              f"mask {t_pixel:7.1f} us ({candidates} AABB candidates, {pixel_hits} pixel hits)   "
+              f"+{t_pixel - t_rect:.1f} us/frame")
+
+
+def bench_sound(frames=600):
+    """音效：載入 (解碼/合成) 時間、每次 play() 的時間，以及懲罰模式滿天金幣時實際播了幾次"""
+    import sound
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    sound.pre_init()
+    screen = _open_window()
+    start = time.perf_counter()
+    sounds = sound.SoundEngine()
+    if not sounds.enabled:
+        print("沒有音效裝置")
+        return
+    mixer = pygame.mixer.get_init()
+    print(f"mixer {mixer}  buffer {sound.BUFFER} samples "
+          f"(~{sound.BUFFER / mixer[0] * 1000:.1f} ms)  load {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    game = _penalty_scene(0)
+    game.sound = sounds
+    player = game.player
+    for frame in range(frames):
+        # 每幀在玩家身上放 3 枚懲罰金幣：一幀內接到好幾個
+        for _ in range(3):
+            game.spawn_coin()
+        for coin in game.coins:
+            if coin.rect.y < 0:
+                coin.rect.center = player.rect.center
+                coin.rect.y -= coin.speed
+        game.score = 10 ** 6
+        game.step(0)
+        game.draw(screen)
+        pygame.display.flip()
+        time.sleep(1 / 60)  # 限流以模擬幀計，但聲道要實際播完才空出來，要用接近實際的幀率
+    print(f"penalty flood, {frames} frames: {sounds.stats()}")
+    start = time.perf_counter()
+    for i in range(1000):
+        sounds.last_played.clear()
+        sounds.play("coin")
+    print(f"play(): {(time.perf_counter() - start) / 1000 * 1e6:.1f} us per call")
+
+
+def bench_formation(frames=600):
+    """每幀更新 N 架空中敵人 (移動、瞄準、開火) 的時間：向量化編隊 vs N 個 AerialEnemy
+
+    子彈本身的移動兩邊一樣，不計入"""
+    from formation import EnemyFormation
+    _open_window()
+    target = pygame.Rect(380, 480, 40, 40)
+    print(f"{'enemies':>7} {'formation us':>13} {'per-object us':>14} {'bullets/frame':>14}")
+    for count in (1, 4, 16, 32, 64):
+        game = engine.GameSession()
+        formation = EnemyFormation(count, seed=1)
+        fired = 0
+        elapsed = 0.0
+        for _ in range(frames):
+            start = time.perf_counter()
+            fired += formation.update(target, 5000, game.bullet_pool)
+            elapsed += time.perf_counter() - start
+            game.bullets.update()
+        t_formation = elapsed / frames * 1e6
+
+        game = engine.GameSession()
+        enemies = [engine.AerialEnemy() for _ in range(count)]
+        for i, enemy in enumerate(enemies):
+            enemy.timer = i * 7 % enemy.shoot_cooldown
+        elapsed = 0.0
+        for _ in range(frames):
+            start = time.perf_counter()
+            for enemy in enemies:
+                enemy.update(target, 5000, game.bullets, game.all_sprites)
+            elapsed += time.perf_counter() - start
+            game.bullets.update()
+        t_objects = elapsed / frames * 1e6
+        print(f"{count:>7} {t_formation:>13.1f} {t_objects:>14.1f} {fired / frames:>14.2f}")
+
+
+def bench_capture(frames=600):
+    """以 60 FPS 的節奏跑後期畫面，比較不錄影、PNG、AVI 三種情況的 update+draw 時間、
+    capture() 本身的時間與掉幀數 (寫到暫存資料夾)"""
+    import tempfile
+    from capture import FrameCapture
+    screen = _open_window()
+    print(f"{'mode':>5} {'work ms':>8} {'p99 ms':>7} {'capture ms':>11} {'p99 ms':>7}  result")
+    for fmt in (None, "png", "avi"):
+        game = _late_game_scene()
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = FrameCapture(directory, screen.get_size(), fmt) if fmt else None
+            work, spent = [], []
+            for _ in range(frames):
+                start = time.perf_counter()
+                game.score = max(game.score, 5000)
+                game.step(0)
+                game.draw(screen)
+                drawn = time.perf_counter()
+                if recorder:
+                    recorder.capture(screen)
+                end = time.perf_counter()
+                work.append(drawn - start)
+                spent.append(end - drawn)
+                time.sleep(max(0.0, 1 / 60 - (end - start)))
+            result = recorder.close() if recorder else ""
+        work.sort()
+        spent.sort()
+        p99 = frames * 99 // 100
+        print(f"{fmt or 'off':>5} {sum(work) / frames * 1000:>8.2f} {work[p99] * 1000:>7.2f} "
+              f"{sum(spent) / frames * 1000:>11.3f} {spent[p99] * 1000:>7.3f}  {result}")
+
+
+def bench_startup(runs=5):
+    """以子行程執行 python -m play --headless --frames 1 (含 Python 本身啟動)，
+    比較行程總時間與遊戲自己量到的第一幀時間，後者超過 play.STARTUP_BUDGET_MS 時失敗"""
+    import re
+    import tempfile
+    import subprocess
+    import play
+    root = os.path.dirname(os.path.abspath(__file__))
+    wall, first = [], []
+    with tempfile.TemporaryDirectory() as directory:
+        for variant in ("laser", "flash"):
+            for _ in range(runs):
+                start = time.perf_counter()
+                result = subprocess.run([sys.executable, "-m", "play", "--headless", "--frames", "1", "--profile",
+                                         "--variant", variant, "--db", os.path.join(directory, "runs.db")],
+                                        cwd=root, capture_output=True, text=True)
+                wall.append((time.perf_counter() - start) * 1000)
+                first.append(float(re.search(r"first frame after (\d+) ms", result.stderr).group(1)))
+    wall.sort()
+    first.sort()
+    print(f"process total  median {wall[len(wall) // 2]:.0f} ms  max {wall[-1]:.0f} ms")
+    print(f"first frame    median {first[len(first) // 2]:.0f} ms  max {first[-1]:.0f} ms  "
+          f"(budget {play.STARTUP_BUDGET_MS} ms)")
+    assert first[len(first) // 2] <= play.STARTUP_BUDGET_MS, "啟動時間超過預算"
+
+
+def bench_gc(frames=2400):
+    """後期畫面 (自動駕駛，含死亡重來) 在預設 GC 與 gcmode.GCManager 下的每幀工作時間與 GC 暫停。
+    churn 情境每幀再建立幾個存活數幀、彼此循環參照的小物件，讓回收器真的有事做"""
+    import gc
+    import random
+    import collections
+    from autopilot import Autopilot
+    from gcmode import GCMonitor, GCManager
+    screen = _open_window()
+    budget = 1 / 60
+    print(f"{'scenario':<8} {'gc':<7} {'p50 ms':>7} {'p99':>6} {'p99.9':>6} {'max':>6}  pauses (automatic/scheduled, max automatic)")
+    for churn in (False, True):
+        for managed in (False, True):
+            random.seed(1)
+            game = _late_game_scene()
+            bot = Autopilot(seed=1, max_rollouts=30)
+            recent = collections.deque(maxlen=600)
+            gc.unfreeze()
+            gc.set_threshold(700, 10, 10)
+            gc.collect()
+            monitor = GCMonitor()
+            manager = GCManager(monitor) if managed else None
+            if manager:
+                manager.start()
+            monitor.pauses.clear()
+            work = []
+            for _ in range(frames):
+                start = time.perf_counter()
+                game.score = max(game.score, 5000)
+                game.step(0 if game.is_dead else bot.decide(game))
+                game.draw(screen)
+                if churn:
+                    for _ in range(8):
+                        particle = {"pos": [0, 0], "life": 30}
+                        particle["self"] = particle
+                        recent.append(particle)
+                elapsed = time.perf_counter() - start
+                work.append(elapsed)
+                if manager:
+                    manager.idle(budget - elapsed)
+            automatic = [d for _, d, scheduled in monitor.pauses if not scheduled]
+            scheduled = len(monitor.pauses) - len(automatic)
+            if manager:
+                manager.stop()
+            monitor.close()
+            work.sort()
+            p = lambda q: work[min(len(work) - 1, int(len(work) * q))] * 1000
+            print(f"{'churn' if churn else 'game':<8} {'managed' if managed else 'default':<7} {p(0.5):>7.2f} "
+                  f"{p(0.99):>6.2f} {p(0.999):>6.2f} {work[-1] * 1000:>6.2f}  {len(automatic)}/{scheduled}, "
+                  f"{max(automatic, default=0) * 1000:.2f} ms")
+    gc.set_threshold(700, 10, 10)
+
+
+def bench_metrics(frames=3000):
+    """後期畫面每幀 observe_game + observe_frame 的時間 (遊戲執行緒) 與 render() 一次的時間 (HTTP 執行緒)"""
+    from metrics import GameMetrics
+    _open_window()
+    game = _late_game_scene()
+    metrics = GameMetrics()
+    start = time.perf_counter()
+    for _ in range(frames):
+        metrics.observe_game(game)
+        metrics.observe_frame(0.004)
+    observe_us = (time.perf_counter() - start) / frames * 1e6
+    start = time.perf_counter()
+    for _ in range(100):
+        body = metrics.render()
+    render_ms = (time.perf_counter() - start) / 100 * 1000
+    metrics.close()
+    print(f"observe {observe_us:.2f} us/frame ({observe_us / (1e6 / 60) * 100:.3f}% of a 60 fps frame)")
+    print(f"render {render_ms:.3f} ms per scrape ({len(body)} bytes, on the HTTP thread)")
+
+
+def _forecast_deadly(fc, left, right, frames, band_top):
+    """往前推演的做法：逐幀檢查 autopilot.Forecast 的雷射/尖刺區間與子彈軌跡"""
+    for f in range(1, frames + 1):
+        for l, r in fc.lasers[f]:
+            if left < r and right > l:
+                return True
+        for l, r in fc.spikes[f]:
+            if left < r and right > l:
+                return True
+        for bx, by, vx, vy, reach_x, reach_y in fc.bullets:
+            x = bx + vx * f
+            if by + vy * f > band_top and abs(x - (left + right) / 2) < reach_x:
+                return True
+    return False
+
+
+def bench_hazardmap(frames=1200, queries=20000):
+    """編隊模式後期：sync 每幀的成本，單點/範圍/批次查詢 vs 每次建 Forecast 往前推演"""
+    import random
+    import numpy as np
+    import hazardmap
+    from autopilot import Autopilot, Forecast
+    random.seed(3)
+    game = engine.GameSession(squadron=6)
+    game.start("player")
+    bot = Autopilot(seed=3, max_rollouts=8)
+    hazards = hazardmap.HazardMap()
+    sync_time = 0.0
+    for _ in range(frames):
+        game.score = max(game.score, 6000)
+        game.step(0 if game.is_dead else bot.decide(game))
+        start = time.perf_counter()
+        hazards.sync(game)
+        sync_time += time.perf_counter() - start
+    print(f"sync {sync_time / frames * 1e6:.1f} us/frame ({len(hazards.footprints)} live footprints)")
+
+    rng = random.Random(1)
+    spans = [(x, x + rng.randint(20, 120), rng.randint(1, 60)) for x in (rng.randint(0, 700) for _ in range(queries))]
+    start = time.perf_counter()
+    for left, _, f in spans:
+        hazards.deadly(left, f)
+    point = queries / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for left, right, f in spans:
+        hazards.range_deadly(left, right, f)
+    ranged = queries / (time.perf_counter() - start)
+    lefts, rights, fs = (np.array(column) for column in zip(*spans))
+    start = time.perf_counter()
+    for _ in range(20):
+        hazards._tables.clear()     # 含每幀第一次查詢時重建累積表的成本
+        batch = hazards.range_deadly_many(lefts, rights, fs)
+    batched = queries * 20 / (time.perf_counter() - start)
+    count = queries // 20
+    start = time.perf_counter()
+    for left, right, f in spans[:count]:
+        _forecast_deadly(Forecast(game, 60), left, right, f, hazardmap.BAND_TOP)
+    forecast = count / (time.perf_counter() - start)
+    fc = Forecast(game, 60)
+    start = time.perf_counter()
+    for left, right, f in spans:
+        _forecast_deadly(fc, left, right, f, hazardmap.BAND_TOP)
+    reused = queries / (time.perf_counter() - start)
+    print(f"{'query':<34} {'per second':>12}")
+    for name, rate in (("point deadly(x, frame)", point), ("range_deadly (python loop)", ranged),
+                       ("range_deadly_many (numpy batch)", batched),
+                       ("simulate ahead (Forecast per query)", forecast),
+                       ("simulate ahead (one Forecast/frame)", reused)):
+        print(f"{name:<34} {rate:>12,.0f}")
+    print(f"{int(batch.sum())} of {queries} ranges deadly")
+
+
+def bench_ui(frames=300):
+    """各介面每幀的繪圖時間；rebuilt 每幀讓快取失效，等於改版前每幀重畫全部內容 (但不含舊的逐像素 alpha 遮罩)"""
+    screen = _open_window()
+    game = engine.GameSession()
+    game.start("player")
+    game.high_scores = [("player", 5000, 100, 3600, "laser")] * 5
+    selector = engine.CharacterSelector()
+
+    def invalidate_shop():
+        game.shop.layer_key = None
+
+    def invalidate_death():
+        game.death_layer = None
+
+    def invalidate_hud():
+        game.hud_key = None
+        game.score_label = (None, None)
+
+    def invalidate_selector():
+        selector.layer_key = None
+
+    cases = [
+        ("shop", lambda: game.shop.draw(screen), invalidate_shop),
+        ("death screen", lambda: game.draw_death_screen(screen), invalidate_death),
+        ("hud", lambda: game.draw_hud(screen), invalidate_hud),
+        ("character selector", lambda: selector.draw(screen), invalidate_selector),
+    ]
+    game.shop.is_open = True
+    print(f"{'screen':<20} {'cached ms':>10} {'rebuilt ms':>11}")
+    for name, draw, invalidate in cases:
+        draw()
+        start = time.perf_counter()
+        for _ in range(frames):
+            draw()
+        cached = (time.perf_counter() - start) / frames * 1000
+        start = time.perf_counter()
+        for _ in range(frames):
+            invalidate()
+            draw()
+        rebuilt = (time.perf_counter() - start) / frames * 1000
+        print(f"{name:<20} {cached:>10.3f} {rebuilt:>11.3f}")
+
+
+def bench_pipeline(frames=900, warmup=120):
+    """後期畫面 (自動駕駛) 全速跑：一般主迴圈 (自動駕駛 + step + draw + flip 依序) vs pipeline.Pipeline
+    (模擬執行緒推進下一個 tick，主執行緒畫上一個 tick 的快照)。藏起來的時間 = 模擬執行緒的 CPU 時間
+    - 主執行緒的停頓 (工作時間 - 自己的 CPU 時間)；只有一個核心時藏不住"""
+    import random
+    from autopilot import Autopilot
+    from pipeline import Pipeline
+    screen = _open_window()
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    print(f"{cores} CPU core(s) available")
+    print(f"{'loop':<10} {'frame ms':>9} {'p99':>6} {'fps':>6} {'sim ms':>7} {'stall ms':>9} {'hidden ms':>10}")
+    for pipelined in (False, True):
+        random.seed(1)
+        game = _late_game_scene()
+        bot = Autopilot(seed=1, max_rollouts=30)
+
+        def simulate(controls):
+            game.score = max(game.score, 5000)
+            if not game.is_dead:
+                controls |= bot.decide(game)
+            game.step(controls)
+
+        pipeline = Pipeline(game, simulate) if pipelined else None
+        times = []
+        for frame in range(warmup + frames):
+            if frame == warmup:
+                # 暖機時縮放/圖層快取都建好了，之後才開始計時
+                begin = time.perf_counter()
+                times.clear()
+                if pipeline:
+                    pipeline.report_lines()
+            start = time.perf_counter()
+            if pipeline:
+                view = pipeline.sync()
+                pipeline.advance(0)
+            else:
+                simulate(0)
+                view = game
+            view.draw(screen)
+            pygame.display.flip()
+            elapsed = time.perf_counter() - start
+            times.append(elapsed)
+            if pipeline:
+                pipeline.observe_frame(elapsed)
+        total = time.perf_counter() - begin
+        times.sort()
+        columns = ""
+        if pipeline:
+            sim, stall, _, hidden = pipeline.hidden()
+            pipeline.close()
+            columns = f"{sim:>7.3f} {stall:>9.3f} {hidden:>10.3f}"
+        print(f"{'pipeline' if pipelined else 'serial':<10} {total / frames * 1000:>9.3f} "
+              f"{times[frames * 99 // 100] * 1000:>6.2f} {frames / total:>6.1f} {columns}")
+
+
+def bench_versus(frames=1200):
+    """後期 (全部危險物解鎖) 每幀 step 與 draw 的時間：單人、共用世界的雙人 (versus.VersusSession)、
+    兩局各自的 GameSession。玩家不會死 (on_death 不做事) 並以固定種子隨機操作，三種情況的負載一樣；
+    另外列出每種情況新建的資源快取數 (圖片變體、遮罩、縮小版)"""
+    import random
+    from versus import VersusSession
+    screen = _open_window()
+    rm = engine.resource_manager
+
+    def immortal(seat):
+        seat.on_death = lambda player, cause: None
+        seat.has_cleared_penalty = True
+
+    def single():
+        game = engine.GameSession()
+        game.start("player")
+        immortal(game)
+        return [game], [game]
+
+    def shared():
+        game = VersusSession(seats=2)
+        game.start(["player", "player2"])
+        for seat in game.seats:
+            immortal(seat)
+        return [game], game.seats
+
+    def separate():
+        games = []
+        for character in ("player", "player2"):
+            game = engine.GameSession()
+            game.start(character)
+            immortal(game)
+            games.append(game)
+        return games, games
+
+    cases = [("1 player", single, 1), ("2 players, shared", shared, 2), ("2 sessions", separate, 2)]
+    print(f"{'case':<18} {'step ms':>8} {'draw ms':>8} {'total':>7} {'vs 1P':>7} {'coins':>5} {'bullets':>7} "
+          f"{'new cache entries':>17}")
+    baseline = None
+    for name, build, players in cases:
+        random.seed(1)
+        inputs = random.Random(2)
+        cached = len(rm.variants) + len(rm.masks) + len(rm.rescaled)
+        games, seats = build()
+        step_time = draw_time = 0.0
+        coins = bullets = 0
+        for frame in range(frames):
+            for seat in seats:
+                seat.score = max(seat.score, 5000)
+            controls = [inputs.choice((0, engine.INPUT_LEFT, engine.INPUT_RIGHT, engine.INPUT_JUMP))
+                        for _ in range(players)]
+            start = time.perf_counter()
+            if len(games) == 1 and players > 1:
+                games[0].step(controls)
+            else:
+                for game, bits in zip(games, controls):
+                    game.step(bits)
+            middle = time.perf_counter()
+            for game in games:
+                game.draw(screen)
+            end = time.perf_counter()
+            step_time += middle - start
+            draw_time += end - middle
+            coins += sum(len(game.coins) for game in games)
+            bullets += sum(len(game.bullets) for game in games)
+        step_ms, draw_ms = step_time / frames * 1000, draw_time / frames * 1000
+        total = step_ms + draw_ms
+        if baseline is None:
+            baseline = total
+        created = len(rm.variants) + len(rm.masks) + len(rm.rescaled) - cached
+        print(f"{name:<18} {step_ms:>8.3f} {draw_ms:>8.3f} {total:>7.3f} {total - baseline:>+7.3f} "
+              f"{coins / frames:>5.1f} {bullets / frames:>7.1f} {created:>17}")
+
+
+def bench_savegame(runs=5):
+    """savegame 的打包 (主執行緒)、寫檔 (背景執行緒，含 fsync)、接續的時間與存檔大小，
+    場上金幣/子彈數從一般遊戲到遠超過實際會出現的量 (編隊 64 架、雷射預警中有粒子)。
+    pickle 欄是同樣狀態的數值 (statehash.field_values) 直接 pickle 的時間與大小，只當參考"""
+    import pickle
+    import random
+    import tempfile
+    import savegame
+    import statehash
+    _open_window()
+    print(f"{'coins':>6} {'bullets':>7} {'size KB':>8} {'B/entity':>8} {'encode ms':>9} {'write ms':>8} "
+          f"{'load ms':>8} {'pickle ms':>9} {'pickle KB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "savegame.bin")
+        for count in (0, 100, 1000, 10000):
+            random.seed(1)
+            game = engine.GameSession(squadron=64)
+            game.start("player")
+            game.score = 5000
+            for _ in range(20):
+                game.step(0)    # 解鎖危險物、雷射預警粒子
+            for i in range(count):
+                coin = engine.Coin(i % len(engine.COIN_STYLES))
+                coin.rect.y = (i * 7) % engine.SCREEN_HEIGHT
+                game.coins.add(coin)
+                game.all_sprites.add(coin)
+                if i % 2:
+                    game.bullet_pool.fire((i * 13) % engine.SCREEN_WIDTH, (i * 11) % engine.SCREEN_HEIGHT, 1.5, 4.2)
+                else:
+                    bullet = engine.Bullet((i * 13) % engine.SCREEN_WIDTH, 100, 400, 600)
+                    game.bullets.add(bullet)
+                    game.all_sprites.add(bullet)
+
+            start = time.perf_counter()
+            for _ in range(runs):
+                data = savegame.encode(game)
+            encode_ms = (time.perf_counter() - start) / runs * 1000
+            start = time.perf_counter()
+            for _ in range(runs):
+                savegame._write(path, data)
+            write_ms = (time.perf_counter() - start) / runs * 1000
+            load_ms = 0.0
+            for _ in range(runs):
+                restored = engine.GameSession()
+                start = time.perf_counter()
+                savegame.load(path, restored)
+                load_ms += time.perf_counter() - start
+            load_ms = load_ms / runs * 1000
+            assert statehash.state_hashes(restored) == statehash.state_hashes(game), "接續後狀態不同"
+            values = statehash.field_values(game)
+            start = time.perf_counter()
+            for _ in range(runs):
+                pickled = pickle.dumps(values)
+            pickle_ms = (time.perf_counter() - start) / runs * 1000
+            entities = len(game.coins) + len(game.bullets)
+            print(f"{len(game.coins):>6} {len(game.bullets):>7} {len(data) / 1024:>8.1f} "
+                  f"{(len(data) / entities if entities else 0):>8.1f} {encode_ms:>9.3f} {write_ms:>8.3f} "
+                  f"{load_ms:>8.3f} {pickle_ms:>9.3f} {len(pickled) / 1024:>9.1f}")
+
+
+ALLOC_BUDGET = 16 * 1024    # 每幀 update + draw 的配置量上限 (位元組)
+
+
+def bench_alloc(budget=ALLOC_BUDGET, warmup=300, frames=600):
+    """自動駕駛玩後期畫面，用 tracemalloc 量穩定後每幀 update/draw 的配置量並檢查預算"""
+    from autopilot import Autopilot
+    from memprofile import AllocationTracker
+    screen = _open_window()
+    game = _late_game_scene()
+    game.is_in_penalty_mode = False
+    bot = Autopilot(1.0, seed=1)
+    tracker = None
+    for frame in range(warmup + frames):
+        if frame == warmup:
+            # 暖機期間圖層/縮放快取都建好了，之後才開始計算
+            tracker = AllocationTracker(top=8)
+        game.score = max(game.score, 5000) # 維持所有危險物都解鎖
+        controls = 0 if game.is_dead else bot.decide(game)
+        if tracker: tracker.mark("autopilot")
+        game.step(controls)
+        if tracker: tracker.mark("update")
+        game.draw(screen)
+        if tracker: tracker.mark("draw")
+        if tracker: tracker.end_frame()
+    steady = {phase: tracker.allocated[phase] / frames for phase in ("update", "draw")}
+    for line in tracker.report_lines():
+        print(line)
+    per_frame = sum(steady.values())
+    print(f"steady-state update+draw: {per_frame / 1024:.1f} KiB/frame (budget {budget / 1024:.1f} KiB)")
+    assert per_frame <= budget, f"每幀配置 {per_frame:.0f} 位元組超過預算 {budget}"
+
+
+BENCHMARKS = {
+    "blit": bench_blit,
+    "atlas": bench_atlas,
+    "quality": bench_quality,
+    "scale": bench_scale,
+    "collision": bench_collision,
+    "sound": bench_sound,
+    "formation": bench_formation,
+    "capture": bench_capture,
+    "startup": bench_startup,
+    "gc": bench_gc,
+    "metrics": bench_metrics,
+    "hazardmap": bench_hazardmap,
+    "ui": bench_ui,
+    "pipeline": bench_pipeline,
+    "versus": bench_versus,
+    "savegame": bench_savegame,
+    "alloc": bench_alloc,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="效能基準測試")
+    parser.add_argument("names", nargs="*", metavar="NAME", help=", ".join(BENCHMARKS))
+    parser.add_argument("--alloc-budget", type=int, default=ALLOC_BUDGET, metavar="BYTES",
+                        help="alloc：每幀配置量上限")
+    args = parser.parse_args()
+    for name in args.names or list(BENCHMARKS):
+        if name not in BENCHMARKS:
+            print(f"未知的基準測試: {name}，可用: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        print(f"== {name} ==")
+        if name == "alloc":
+            BENCHMARKS[name](args.alloc_budget)
+        else:
+            BENCHMARKS[name]()
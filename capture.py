@@ -0,0 +1,185 @@
+"""遊戲畫面錄影 (--capture)
+
+主迴圈每幀只做一件事：把畫面的像素 (Surface.get_view("2")，每個像素一個 32 位元整數)
+複製進預先配置好的環狀緩衝區其中一格，不配置新的像素記憶體。背景執行緒把填好的格子
+轉成 RGB 並壓縮寫檔 (zlib 壓縮時會釋放 GIL)，寫完再把格子還回來。
+
+*   png：frame_000123.png 圖片序列，檔名是遊戲幀號，掉幀的地方幀號會跳過
+*   avi：未壓縮 24 位元 AVI，掉的幀寫成空的影格 (播放器會重複前一格)，時間軸不會縮短
+
+編碼跟不上時環狀緩衝區會滿，這時直接丟掉這一幀並計數，絕不讓主迴圈等待。
+在 Linux 上背景執行緒會調低自己的排程優先權 (nice)，只有一個 CPU 核心時編碼也只用
+遊戲剩下的時間，代價是掉更多幀而不是遊戲變慢。
+"""
+import os
+import zlib
+import queue
+import struct
+import threading
+
+import numpy as np
+
+RING_SIZE = 16
+ENCODER_NICE = 10
+
+
+class FrameCapture:
+    def __init__(self, directory, surface_size, fmt="png", fps=60, ring_size=RING_SIZE, png_level=1):
+        if fmt not in ("png", "avi"):
+            raise ValueError(f"不支援的格式: {fmt}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.width, self.height = surface_size
+        self.fmt = fmt
+        self.png_level = png_level
+        self.frame = 0
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        self.shifts = None
+        # (寬, 高) 的 Fortran 順序與 get_view("2") 的記憶體排列相同，複製時是連續的
+        self.ring = [np.empty((self.width, self.height), np.uint32, order="F") for _ in range(ring_size)]
+        self.free = queue.SimpleQueue()
+        for index in range(ring_size):
+            self.free.put(index)
+        self.pending = queue.SimpleQueue()    # (格子編號或 None 表示掉幀, 幀號)，None 整個表示結束
+        self.writer = AviWriter(os.path.join(directory, "capture.avi"), self.width, self.height, fps) \
+            if fmt == "avi" else None
+        self.thread = threading.Thread(target=self._run, name="frame-capture", daemon=True)
+        self.thread.start()
+
+    def capture(self, surface):
+        """主迴圈每幀呼叫一次 (flip 之前)；緩衝區滿時回傳 False 表示這幀被丟掉"""
+        self.frame += 1
+        try:
+            index = self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            self.pending.put((None, self.frame))
+            return False
+        if self.shifts is None:
+            self.shifts = surface.get_shifts()[:3]
+        np.copyto(self.ring[index], surface.get_view("2"), casting="unsafe")
+        self.pending.put((index, self.frame))
+        self.captured += 1
+        return True
+
+    def _run(self):
+        try:
+            # Linux 上對執行緒 id 設定 priority 只影響這個執行緒
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), ENCODER_NICE)
+        except (AttributeError, OSError):
+            pass
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            index, frame = item
+            if index is None:
+                if self.writer:
+                    self.writer.write_dropped()
+                continue
+            rgb = self._to_rgb(self.ring[index])
+            self.free.put(index)
+            if self.writer:
+                self.writer.write_frame(rgb)
+            else:
+                with open(os.path.join(self.directory, f"frame_{frame:06d}.png"), "wb") as f:
+                    f.write(encode_png(rgb, self.png_level))
+            self.written += 1
+
+    def _to_rgb(self, pixels):
+        """32 位元像素 -> (高, 寬, 3) 的 RGB"""
+        rows = pixels.T     # (高, 寬)，C 順序
+        rgb = np.empty((self.height, self.width, 3), np.uint8)
+        for channel, shift in enumerate(self.shifts):
+            rgb[:, :, channel] = rows >> shift
+        return rgb
+
+    def close(self):
+        """等背景執行緒寫完所有已擷取的幀，回傳統計字串"""
+        self.pending.put(None)
+        self.thread.join()
+        if self.writer:
+            self.writer.close()
+        return self.stats()
+
+    def stats(self):
+        return f"{self.captured} captured, {self.written} written, {self.dropped} dropped"
+
+
+def encode_png(rgb, level=1):
+    """(高, 寬, 3) uint8 -> PNG 位元組 (每列 filter 0，zlib 壓縮)"""
+    height, width, _ = rgb.shape
+    raw = np.zeros((height, width * 3 + 1), np.uint8)
+    raw[:, 1:] = rgb.reshape(height, width * 3)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + \
+        chunk(b"IDAT", zlib.compress(raw.tobytes(), level)) + chunk(b"IEND", b"")
+
+
+class AviWriter:
+    """未壓縮 (BI_RGB 24 位元、由下往上) 的 AVI；大小與幀數在 close() 時補寫"""
+
+    def __init__(self, path, width, height, fps):
+        self.file = open(path, "wb")
+        self.width, self.height = width, height
+        self.row_bytes = (width * 3 + 3) // 4 * 4
+        self.frame_bytes = self.row_bytes * height
+        self.index = []     # (相對 movi 的位移, 大小)
+        f = self.file
+
+        f.write(b"RIFF\0\0\0\0AVI ")
+        f.write(b"LIST" + struct.pack("<I", 4 + 64 + 12 + 64 + 48) + b"hdrl")
+        f.write(b"avih" + struct.pack("<I", 56))
+        self.avih_frames = f.tell() + 16
+        f.write(struct.pack("<IIIIIIIIII4I", 1000000 // fps, self.frame_bytes * fps, 0, 0x10, 0, 0, 1,
+                            self.frame_bytes, width, height, 0, 0, 0, 0))
+        f.write(b"LIST" + struct.pack("<I", 4 + 64 + 48) + b"strl")
+        f.write(b"strh" + struct.pack("<I", 56))
+        self.strh_length = f.tell() + 32
+        f.write(b"vidsDIB " + struct.pack("<IHHIIIIIIIIhhhh", 0, 0, 0, 0, 1, fps, 0, 0,
+                                          self.frame_bytes, 0xFFFFFFFF, 0, 0, 0, width, height))
+        f.write(b"strf" + struct.pack("<I", 40))
+        f.write(struct.pack("<IiiHHIIiiII", 40, width, height, 1, 24, 0, self.frame_bytes, 0, 0, 0, 0))
+        self.movi_start = f.tell()
+        f.write(b"LIST\0\0\0\0movi")
+        self.padding = b"\0" * (self.row_bytes - width * 3)
+
+    def write_frame(self, rgb):
+        bgr = rgb[::-1, :, ::-1]    # 由下往上、BGR
+        if self.padding:
+            data = b"".join(row.tobytes() + self.padding for row in bgr)
+        else:
+            data = np.ascontiguousarray(bgr).tobytes()
+        self._chunk(data)
+
+    def write_dropped(self):
+        self._chunk(b"")
+
+    def _chunk(self, data):
+        f = self.file
+        self.index.append((f.tell() - self.movi_start - 8, len(data)))
+        f.write(b"00db" + struct.pack("<I", len(data)))
+        f.write(data)
+
+    def close(self):
+        f = self.file
+        movi_end = f.tell()
+        f.write(b"idx1" + struct.pack("<I", 16 * len(self.index)))
+        for offset, size in self.index:
+            f.write(b"00db" + struct.pack("<III", 0x10, offset, size))
+        end = f.tell()
+        f.seek(4)
+        f.write(struct.pack("<I", end - 8))
+        f.seek(self.movi_start + 4)
+        f.write(struct.pack("<I", movi_end - self.movi_start - 8))
+        f.seek(self.avih_frames)
+        f.write(struct.pack("<I", len(self.index)))
+        f.seek(self.strh_length)
+        f.write(struct.pack("<I", len(self.index)))
+        f.close()
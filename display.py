@@ -0,0 +1,62 @@
+"""視窗與邏輯畫布
+
+遊戲一律用邏輯座標 (engine.SCREEN_WIDTH x SCREEN_HEIGHT) 畫在 canvas 上，
+present() 每幀把 canvas 等比例放大一次到視窗 (或全螢幕) 中央，多出來的部分留黑邊。
+視窗大小剛好等於邏輯大小時 canvas 就是螢幕本身，不需要縮放。
+
+render_scale < 1 是效能模式：世界圖層以較低解析度繪製 (見 GameSession.draw)，
+在大螢幕上可以用它換取幀率。
+"""
+import pygame
+
+from engine import SCREEN_WIDTH, SCREEN_HEIGHT
+
+
+class Display:
+    def __init__(self, window_size=None, fullscreen=False, smooth=False, render_scale=1.0):
+        self.smooth = smooth            # smoothscale 較平滑但比較慢
+        self.render_scale = render_scale
+        if fullscreen:
+            self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.screen = pygame.display.set_mode(window_size or (SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
+        self.canvas = None
+        self.resize()
+
+    def resize(self):
+        """視窗大小改變後重新計算放大後的位置 (VIDEORESIZE 時呼叫)"""
+        self.screen = pygame.display.get_surface()
+        width, height = self.screen.get_size()
+        if (width, height) == (SCREEN_WIDTH, SCREEN_HEIGHT):
+            self.canvas = self.screen
+            self.viewport = self.screen.get_rect()
+            self.target = None
+            return
+        if self.canvas is None or self.canvas is self.screen:
+            self.canvas = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert(self.screen)
+        factor = min(width / SCREEN_WIDTH, height / SCREEN_HEIGHT)
+        self.viewport = pygame.Rect(0, 0, int(SCREEN_WIDTH * factor), int(SCREEN_HEIGHT * factor))
+        self.viewport.center = (width // 2, height // 2)
+        self.screen.fill((0, 0, 0))
+        self.target = self.screen.subsurface(self.viewport)
+
+    @property
+    def scaled(self):
+        return self.target is not None
+
+    def present(self):
+        """把 canvas 放大到視窗；flip 另外呼叫，方便分開計時"""
+        if self.target is None:
+            return
+        if self.smooth:
+            pygame.transform.smoothscale(self.canvas, self.viewport.size, self.target)
+        else:
+            pygame.transform.scale(self.canvas, self.viewport.size, self.target)
+
+    def to_logical(self, pos):
+        """視窗座標 (滑鼠) 轉成邏輯座標"""
+        if self.target is None:
+            return pos
+        x = (pos[0] - self.viewport.x) * SCREEN_WIDTH / self.viewport.width
+        y = (pos[1] - self.viewport.y) * SCREEN_HEIGHT / self.viewport.height
+        return int(x), int(y)
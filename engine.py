@@ -0,0 +1,1472 @@
+"""遊戲核心：常數、資源、所有遊戲實體與 GameSession
+
+本模組匯入時不會開啟視窗，可以在沒有螢幕的情況下 (伺服器、機器人、測試)
+建立任意多個 GameSession 各自模擬 (圖片第一次用到時以原始格式載入，
+碰撞遮罩與有視窗時相同)。有視窗的遊戲在 set_mode 之後呼叫
+init_display() 重新載入轉換好格式的圖片與字型，再用 GameSession.draw() 繪製。
+"""
+import pygame
+import random
+import os
+import math
+import itertools
+import collections
+import telemetry
+import statehash
+from sound import SoundEngine
+
+# --- 遊戲設定 ---
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+
+# --- 顏色定義 (RGB) ---
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+YELLOW = (255, 255, 0)
+GRAY = (100, 100, 100)
+BLUE = (50, 50, 200)
+GOLD = (255, 215, 0)
+DARK_GRAY = (30, 30, 30)
+RED = (255, 0, 0)
+SHIELD_COLOR = (100, 200, 255, 180)
+BLOCK_COLOR = (50, 50, 50, 150)
+LASER_RED = (255, 50, 50)
+LASER_GLOW = (255, 150, 150, 150)
+WARNING_COLOR = (255, 0, 0, 80)
+SPIKE_COLOR = (150, 150, 150)
+SPIKE_DARK = (60, 60, 60)
+SPIKE_GLOW = (255, 100, 100)
+
+# --- 全域常數 ---
+PLAYER_SPEED = 7
+COIN_SPEED = 5
+NORMAL_COIN_FREQUENCY = 45
+PENALTY_COIN_FREQUENCY = 1
+GRAVITY = 0.8
+JUMP_STRENGTH = -15
+PENALTY_DURATION = 300
+FLASH_COOLDOWN = 1800   # 閃現冷卻 (30 秒)
+
+# --- 玩家輸入 (位元遮罩，鍵盤、機器人與網路客戶端共用) ---
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_JUMP = 4      # 按下的那一幀 (空白鍵)
+INPUT_SHIELD = 8    # 按下的那一幀 (X)
+INPUT_BLOCK = 16    # 按住 (F)
+
+# 金幣與子彈的編號，網路同步時用來對應實體
+_entity_ids = itertools.count(1)
+
+# 繪圖特效 (火花、震動、碎石) 用自己的亂數：有沒有繪圖、畫質等級、在哪條執行緒繪圖
+# 都不會改變模擬的亂數序列
+fx_random = random.Random()
+
+# --- 畫質等級 (quality.QualityGovernor 依幀時間切換，或由命令列固定) ---
+# 依序捨棄：雷射光暈層數 -> 粒子數量上限 -> 裝飾火花/碎石 -> 世界圖層的內部解析度
+# 只影響繪圖，不影響模擬
+QualityLevel = collections.namedtuple("QualityLevel", "glow_layers max_particles sparks render_scale")
+QUALITY_LEVELS = (
+    QualityLevel(5, 20, True, 1.0),
+    QualityLevel(2, 20, True, 1.0),
+    QualityLevel(2, 6, True, 1.0),
+    QualityLevel(2, 6, False, 1.0),
+    QualityLevel(2, 6, False, 0.75),
+    QualityLevel(2, 6, False, 0.5),
+)
+quality = QUALITY_LEVELS[0]
+
+def set_quality_level(level):
+    global quality
+    quality = QUALITY_LEVELS[level]
+
+# --- 像素格式最佳化 ---
+COLORKEY = (255, 0, 255) # 透明色，圖片本身不會用到的洋紅色
+
+def optimize_surface(surf):
+    """依透明度選最快的格式：完全不透明 convert()、只有全透明/全不透明用 colorkey + RLE，
+    其餘才用 convert_alpha()。還沒有視窗時無法轉換，原樣回傳"""
+    if pygame.display.get_surface() is None:
+        return surf
+    total = surf.get_width() * surf.get_height()
+    opaque = pygame.mask.from_surface(surf, 254).count()
+    if opaque == total:
+        return surf.convert()
+    visible = pygame.mask.from_surface(surf, 0).count()
+    if visible == opaque:
+        keyed = pygame.Surface(surf.get_size()).convert()
+        keyed.fill(COLORKEY)
+        keyed.blit(surf, (0, 0))
+        keyed.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        return keyed
+    return surf.convert_alpha()
+
+def surface_format(surf):
+    """回傳 'alpha' / 'colorkey-rle' / 'colorkey' / 'opaque'，給基準測試與除錯用"""
+    if surf.get_flags() & pygame.SRCALPHA:
+        return "alpha"
+    if surf.get_colorkey() is not None:
+        return "colorkey-rle" if surf.get_flags() & pygame.RLEACCEL else "colorkey"
+    return "opaque"
+
+# --- 程序化精靈圖 (找不到圖片時的替代圖形) ---
+def draw_bullet_sprite():
+    image = pygame.Surface((24, 24), pygame.SRCALPHA)
+    pygame.draw.circle(image, RED, (12, 12), 12)
+    pygame.draw.circle(image, WHITE, (12, 12), 6)
+    return image
+
+def draw_coin_sprite(size, penalty):
+    image = pygame.Surface([size, size], pygame.SRCALPHA)
+    c = RED if penalty else GOLD
+    pygame.draw.circle(image, c, (size//2, size//2), size//2)
+    pygame.draw.circle(image, WHITE, (size//2, size//2), size//2, 3)
+    return image
+
+def draw_enemy_sprite(size):
+    image = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.rect(image, RED, (0, 0, size, size), border_radius=15)
+    pygame.draw.circle(image, WHITE, (size//2, size//2), size//3)
+    return image
+
+def draw_player_sprite(size, level):
+    image = pygame.Surface([size, size], pygame.SRCALPHA)
+    color = WHITE if level == 1 else (0, 255, 0)
+    pygame.draw.rect(image, color, (20, 20, size-40, size-40), border_radius=20)
+    return image
+
+# --- 資源管理器 ---
+class ResourceManager:
+    """圖片資源與所有縮放/程序化變體的快取；同一種圖只建一次，所有實體共用"""
+
+    def __init__(self):
+        self.assets = {}
+        self.variants = {} # (名稱, 寬, 高) 或程序化的 key -> 已轉好格式的 Surface
+        self.sources = {}  # 圖集區塊 (subsurface) -> (圖集頁, 區塊 Rect)，繪圖時從大圖直接取
+        self.rescaled = {} # (Surface, 縮放比例) -> 低解析度繪圖用的縮小版
+        self.masks = {}    # Surface -> (碰撞用的像素遮罩, 不透明像素的外框)，同一張圖的所有實體共用
+        # 快取名稱 -> [命中, 未命中]，metrics.py 匯出命中率
+        self.cache_stats = {"scaled": [0, 0], "rescaled": [0, 0], "mask": [0, 0], "procedural": [0, 0]}
+        self.use_atlas = True
+        self.loaded = False
+
+    def load_assets(self):
+        # 有視窗時轉成最快的像素格式並載入圖集；沒有視窗 (伺服器、機器人) 時保留原始格式，
+        # 只用來產生與有視窗時完全相同的碰撞遮罩
+        self.loaded = True
+        self.variants.clear()
+        self.sources.clear()
+        self.rescaled.clear()
+        self.masks.clear()
+        asset_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+        if not os.path.exists(asset_path):
+            return
+        valid_extensions = (".png", ".jpg", ".jpeg")
+        for filename in os.listdir(asset_path):
+            if filename.lower().endswith(valid_extensions):
+                name = os.path.splitext(filename)[0]
+                full_path = os.path.join(asset_path, filename)
+                try:
+                    image = pygame.image.load(full_path)
+                    if pygame.display.get_surface() is not None:
+                        # jpg 沒有 alpha 通道，不需要 convert_alpha
+                        image = image.convert_alpha() if image.get_flags() & pygame.SRCALPHA else image.convert()
+                    self.assets[name] = image
+                except pygame.error:
+                    pass
+
+        if self.use_atlas and self.assets and pygame.display.get_surface() is not None:
+            import atlas
+            try:
+                atlas.load(self, asset_path)
+            except (OSError, ValueError, pygame.error):
+                # 圖集寫不進去或損壞時，退回逐張縮放
+                self.variants.clear()
+                self.sources.clear()
+
+    def add_atlas_region(self, name, size, page, rect):
+        image = page.subsurface(rect)
+        self.variants[(name, size[0], size[1])] = image
+        self.sources[image] = (page, rect)
+
+    def blit(self, surface, image, pos):
+        """圖集區塊從整頁大圖 blit (subsurface 會失去 RLE 加速)"""
+        source = self.sources.get(image)
+        if source:
+            surface.blit(source[0], pos, source[1])
+        else:
+            surface.blit(image, pos)
+
+    def draw_sprites(self, surface, sprites, scale=1.0):
+        """取代 Group.draw：整組精靈一次 Surface.blits，圖集區塊用 (大圖, 位置, 區塊)"""
+        if scale != 1.0:
+            batch = [(self.at_scale(spr.image, scale), (int(spr.rect.x * scale), int(spr.rect.y * scale)))
+                     for spr in sprites]
+            surface.blits(batch, doreturn=False)
+            return
+        sources = self.sources
+        batch = []
+        for spr in sprites:
+            source = sources.get(spr.image)
+            batch.append((source[0], spr.rect, source[1]) if source else (spr.image, spr.rect))
+        surface.blits(batch, doreturn=False)
+
+    def at_scale(self, image, scale):
+        """低解析度繪圖用：image 縮小 scale 倍的版本，每種圖只縮一次"""
+        key = (image, scale)
+        small = self.rescaled.get(key)
+        if small is not None:
+            self.cache_stats["rescaled"][0] += 1
+        else:
+            self.cache_stats["rescaled"][1] += 1
+            w, h = image.get_size()
+            # 最近鄰縮放：不會在邊緣產生半透明像素，縮小後仍可用 colorkey + RLE
+            size = (max(1, int(w * scale)), max(1, int(h * scale)))
+            small = pygame.Surface(((size[0] + 7) // 8 * 8, size[1]), pygame.SRCALPHA)
+            # 寬度補齊到 8 的倍數 (右邊透明)：奇數寬的 alpha 圖 blit 會慢將近一倍
+            small.blit(pygame.transform.scale(image, size), (0, 0))
+            small = self.rescaled[key] = optimize_surface(small)
+        return small
+
+    def get(self, name):
+        if not self.loaded:
+            self.load_assets()
+        return self.assets.get(name)
+
+    def scaled(self, name, size):
+        """回傳縮放到 size 並轉成最佳格式的圖片，找不到圖片時回傳 None"""
+        key = (name, size[0], size[1])
+        image = self.variants.get(key)
+        if image is not None:
+            self.cache_stats["scaled"][0] += 1
+        else:
+            self.cache_stats["scaled"][1] += 1
+            source = self.get(name)
+            if source is None:
+                return None
+            image = self.variants[key] = optimize_surface(pygame.transform.scale(source, size))
+        return image
+
+    def mask(self, image):
+        """image 的像素遮罩 (alpha >= 128 或非 colorkey 的像素) 與不透明部分的外框，每張圖只算一次"""
+        entry = self.masks.get(image)
+        if entry is not None:
+            self.cache_stats["mask"][0] += 1
+        else:
+            self.cache_stats["mask"][1] += 1
+            mask = pygame.mask.from_surface(image)
+            box = mask.get_bounding_rects()
+            box = box[0].unionall(box[1:]) if box else pygame.Rect(0, 0, 0, 0)
+            entry = self.masks[image] = (mask, box)
+        return entry
+
+    def procedural(self, key, builder, *args):
+        """程序化圖形只畫一次：key 加上參數當快取索引"""
+        cache_key = (key,) + args
+        image = self.variants.get(cache_key)
+        if image is not None:
+            self.cache_stats["procedural"][0] += 1
+        else:
+            self.cache_stats["procedural"][1] += 1
+            image = self.variants[cache_key] = optimize_surface(builder(*args))
+        return image
+
+resource_manager = ResourceManager()
+
+# --- 介面圖層 ---
+HUD_RECT = (10, 10, 260, 140)
+DEATH_TEXT_RECT = (0, SCREEN_HEIGHT // 2 - 60, SCREEN_WIDTH, 290)    # GAME OVER 與最多 6 行高分榜
+# 商店、死亡畫面、HUD 與角色選擇畫面的內容很少變：畫一次存成圖層，內容的 key 改變時才重畫，
+# 每幀只 blit。半透明的全螢幕色層用整面 alpha 的不透明 Surface，比逐像素 alpha 快約 3 倍
+_tints = {}
+
+def draw_tint(surface, color, alpha):
+    """整個 surface 蓋上一層 alpha 透明度的 color (每種顏色只建一次)"""
+    key = (color, alpha, surface.get_size())
+    tint = _tints.get(key)
+    if tint is None:
+        tint = _tints[key] = pygame.Surface(surface.get_size(), 0, surface)
+        tint.fill(color)
+        tint.set_alpha(alpha)
+    surface.blit(tint, (0, 0))
+
+_scratch = {}   # 是否透明 -> 畫圖層用的全畫面 Surface (重複使用)
+
+def build_layer(rect, draw, alpha=False):
+    """draw(surface) 以邏輯座標畫在 rect 範圍內，回傳 (圖層, 左上角)。只清除與取出 rect 範圍，
+    重畫的成本跟內容大小成正比 (不經過 optimize_surface 的遮罩分析)：
+    alpha=False 是不透明的面板，面板外 (圓角) 用 colorkey + RLE；
+    alpha=True 是直接疊在畫面上的反鋸齒文字，裁掉透明的邊後保留逐像素 alpha"""
+    scratch = _scratch.get(alpha)
+    if scratch is None:
+        display = pygame.display.get_surface()
+        if alpha:
+            scratch = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        else:
+            scratch = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), 0, display) if display else \
+                pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        _scratch[alpha] = scratch
+    rect = pygame.Rect(rect)
+    scratch.fill((0, 0, 0, 0) if alpha else COLORKEY, rect)
+    scratch.set_clip(rect)
+    draw(scratch)
+    scratch.set_clip(None)
+    region = scratch.subsurface(rect)
+    if not alpha:
+        layer = region.copy()
+        layer.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        return layer, rect.topleft
+    box = region.get_bounding_rect()
+    layer = region.subsurface(box).copy()
+    if pygame.display.get_surface() is not None:
+        layer = layer.convert_alpha()
+    return layer, (rect.x + box.x, rect.y + box.y)
+
+def pixels_collide(a, b):
+    """兩個精靈的像素是否重疊：先比 rect，再比不透明外框，都重疊時才比快取的遮罩"""
+    ra, rb = a.rect, b.rect
+    if not ra.colliderect(rb):
+        return False
+    mask_a, box_a = resource_manager.mask(a.image)
+    mask_b, box_b = resource_manager.mask(b.image)
+    dx, dy = rb.x - ra.x, rb.y - ra.y
+    if box_b.x + dx >= box_a.right or box_b.right + dx <= box_a.x or \
+       box_b.y + dy >= box_a.bottom or box_b.bottom + dy <= box_a.y:
+        return False
+    return mask_a.overlap(mask_b, (dx, dy)) is not None
+
+def get_font(size, bold=False):
+    fonts = ['SimHei', 'Microsoft JhengHei', 'Arial Unicode MS', 'Arial']
+    for f in fonts:
+        try:
+            return pygame.font.SysFont(f, size, bold)
+        except:
+            continue
+    return pygame.font.SysFont(None, size)
+
+# 字型在 init_display() 建立，只有繪圖時才會用到
+font = None
+big_font = None
+shop_font = None
+
+def init_display():
+    """set_mode 之後呼叫：載入圖片與字型"""
+    global font, big_font, shop_font
+    resource_manager.load_assets()
+    font = get_font(36)
+    big_font = get_font(72, True)
+    shop_font = get_font(22)
+
+# --- 子彈類別 ---
+BULLET_SPEED = 6
+
+class Bullet(pygame.sprite.Sprite):
+    def __init__(self, x, y, target_x, target_y, pool=None):
+        super().__init__()
+        self.pool = pool
+        self.image = resource_manager.procedural("bullet", draw_bullet_sprite)
+        self.rect = self.image.get_rect()
+        self.speed = BULLET_SPEED
+
+        angle = math.atan2(target_y - y, target_x - x)
+        self.launch(x, y, math.cos(angle) * self.speed, math.sin(angle) * self.speed)
+
+    def launch(self, x, y, vx, vy):
+        """(重新) 發射：每次都是新的 net_id，網路同步時當成新子彈"""
+        self.net_id = next(_entity_ids)
+        self.rect.center = (x, y)
+        self.vx = vx
+        self.vy = vy
+
+    def kill(self):
+        if self.pool is not None and self.alive():
+            self.pool.free.append(self)
+        super().kill()
+
+    def update(self):
+        self.rect.x += self.vx
+        self.rect.y += self.vy
+        if self.rect.top > SCREEN_HEIGHT or self.rect.bottom < 0 or \
+           self.rect.left > SCREEN_WIDTH or self.rect.right < 0:
+            self.kill()
+
+class BulletPool:
+    """子彈池：出界或被擋掉的子彈回收再用，不必每發都建立新的 Sprite"""
+
+    def __init__(self, *groups):
+        self.groups = groups
+        self.free = []
+
+    def fire(self, x, y, vx, vy):
+        if self.free:
+            bullet = self.free.pop()
+        else:
+            bullet = Bullet(x, y, x + vx, y + vy, pool=self)
+        bullet.launch(x, y, vx, vy)
+        bullet.add(*self.groups)
+        return bullet
+
+# --- 空中敵人類別 ---
+class AerialEnemy(pygame.sprite.Sprite):
+    def __init__(self):
+        super().__init__()
+        self.base_size = 200
+        self.image = resource_manager.scaled('player_jump', (self.base_size, self.base_size)) or \
+            resource_manager.procedural("enemy", draw_enemy_sprite, self.base_size)
+
+        self.rect = self.image.get_rect()
+        self.rect.y = 20
+        self.rect.x = -self.rect.width
+        self.speed = 4
+        self.direction = 1
+        self.shoot_cooldown = 120
+        self.timer = 0
+        self.active = False
+
+    def update(self, player_hitbox, current_score, bullet_group, all_group):
+        if current_score >= 3000:
+            self.active = True
+        else:
+            self.active = False
+            return
+
+        self.rect.x += self.speed * self.direction
+        if self.rect.right >= SCREEN_WIDTH:
+            self.direction = -1
+        elif self.rect.left <= 0:
+            self.direction = 1
+
+        self.timer += 1
+        if self.timer >= self.shoot_cooldown:
+            self.timer = 0
+            b = Bullet(self.rect.centerx, self.rect.centery, player_hitbox.centerx, player_hitbox.centery)
+            bullet_group.add(b)
+            all_group.add(b)
+
+    def draw(self, surface, scale=1.0):
+        if not self.active:
+            return
+        if scale != 1.0:
+            surface.blit(resource_manager.at_scale(self.image, scale), (int(self.rect.x * scale), int(self.rect.y * scale)))
+        else:
+            resource_manager.blit(surface, self.image, self.rect)
+
+# --- 雷射炮管理系統 (美化版) ---
+class LaserCannon:
+    _layer_cache = {}   # 預警面/光暈圖層，所有雷射炮共用
+
+    def __init__(self, unlock_score=2000):
+        self.active = False
+        self.unlock_score = unlock_score
+        self.cooldown = 300
+        self.timer = random.randint(0, 100)
+        self.warning_duration = 120
+        self.fire_duration = 40
+        self.width = 140
+        self.x = 0
+        self.is_firing = False
+        self.is_warning = False
+        self.energy_particles = [] # 預警時的匯聚粒子
+
+    def update(self, current_score):
+        if current_score >= self.unlock_score:
+            self.active = True
+        else:
+            self.active = False
+            self.reset_cycle()
+            return
+
+        self.timer += 1
+        cycle_time = self.timer % self.cooldown
+
+        if cycle_time == 1:
+            self.x = random.randint(0, SCREEN_WIDTH - self.width)
+            self.is_warning = True
+            self.is_firing = False
+            self.energy_particles = []
+        elif cycle_time == self.warning_duration:
+            self.is_warning = False
+            self.is_firing = True
+        elif cycle_time == self.warning_duration + self.fire_duration:
+            self.is_firing = False
+
+        if self.is_warning:
+            # 產生能量匯聚粒子特效
+            if len(self.energy_particles) < 20:
+                px = self.x + random.randint(0, self.width)
+                py = random.randint(50, 150)
+                self.energy_particles.append({'x': px, 'y': py, 'life': 1.0})
+
+            for p in self.energy_particles[:]:
+                p['y'] -= 2 # 向上移動
+                p['life'] -= 0.02
+                if p['life'] <= 0:
+                    self.energy_particles.remove(p)
+
+    def check_collision(self, target_hitbox, shield_active, shield_rect):
+        if self.is_firing:
+            laser_rect = pygame.Rect(self.x + 20, 0, self.width - 40, SCREEN_HEIGHT)
+            if shield_active:
+                if laser_rect.colliderect(shield_rect):
+                    return False
+            return laser_rect.colliderect(target_hitbox)
+        return False
+
+    def draw(self, surface, scale=1.0):
+        if not self.active:
+            return
+        k = scale
+        x, w, h = self.x * k, self.width * k, SCREEN_HEIGHT * k
+
+        # 繪製雷射炮台本體
+        cannon_body = pygame.Rect(x, 0, w, 35 * k)
+        radius = max(1, int(10 * k))
+        pygame.draw.rect(surface, (40, 40, 50), cannon_body, border_bottom_left_radius=radius, border_bottom_right_radius=radius)
+        pygame.draw.rect(surface, GRAY, cannon_body, max(1, int(2 * k)), border_bottom_left_radius=radius, border_bottom_right_radius=radius)
+
+        # 繪製核心能量球
+        core_color = RED if self.is_warning else (255, 255, 255)
+        if self.is_firing: core_color = (255, 255, 200)
+        pygame.draw.circle(surface, core_color, (x + w // 2, 15 * k), 8 * k)
+
+        if self.is_warning:
+            # 1. 預警掃描線 (整張單色，用 surface alpha 閃爍)
+            warn_surf = self._layer_cache.get(("warn", self.width, k)) or self._cache_layer(("warn", self.width, k))
+            warn_surf.set_alpha(int(abs(math.sin(self.timer * 0.1)) * 60 + 20))
+            surface.blit(warn_surf, (x, 0))
+
+            # 2. 邊界閃爍線
+            if (self.timer // 15) % 2 == 0:
+                line_w = max(1, int(2 * k))
+                pygame.draw.line(surface, RED, (x, 0), (x, h), line_w)
+                pygame.draw.line(surface, RED, (x + w, 0), (x + w, h), line_w)
+
+            # 3. 匯聚粒子
+            for p in self.energy_particles[:quality.max_particles]:
+                p_alpha = int(p['life'] * 255)
+                pygame.draw.circle(surface, (255, 50, 50, p_alpha), (p['x'] * k, p['y'] * k), max(1, 3 * k))
+
+        if self.is_firing:
+            # 1. 外層大發光 (柔和邊緣，層數依畫質等級)
+            if quality.glow_layers:
+                key = ("glow", self.width, quality.glow_layers, k)
+                surface.blit(self._layer_cache.get(key) or self._cache_layer(key), (x + 10 * k, 0))
+
+            # 2. 主雷射束 (中間最亮)
+            main_beam_w = (40 + math.sin(self.timer * 0.5) * 10) * k # 粗細震盪感
+            main_beam_x = x + (w - main_beam_w) // 2
+            pygame.draw.rect(surface, LASER_RED, (main_beam_x, 0, main_beam_w, h))
+
+            # 3. 核心白光 (視覺衝擊感)
+            core_beam_w = main_beam_w * 0.4
+            core_beam_x = x + (w - core_beam_w) // 2
+            pygame.draw.rect(surface, WHITE, (core_beam_x, 0, core_beam_w, h))
+
+            # 4. 底部火花特效
+            if quality.sparks:
+                for _ in range(5):
+                    spark_x = fx_random.randint(int(self.x), int(self.x + self.width))
+                    spark_y = fx_random.randint(SCREEN_HEIGHT - 30, SCREEN_HEIGHT)
+                    pygame.draw.circle(surface, YELLOW, (spark_x * k, spark_y * k), fx_random.randint(2, 4) * k)
+
+    def _cache_layer(self, key):
+        """預警掃描面與光暈每幀都一樣，只畫一次；key 為 ("warn", 寬, 縮放) 或 ("glow", 寬, 層數, 縮放)"""
+        k = key[-1]
+        h = int(SCREEN_HEIGHT * k)
+        if key[0] == "warn":
+            layer = pygame.Surface((int(self.width * k), h))
+            layer.fill((255, 0, 0))
+        else:
+            glow_w = self.width - 20
+            layer = pygame.Surface((glow_w, SCREEN_HEIGHT), pygame.SRCALPHA)
+            for i in range(key[2]): # 多層漸層
+                alpha = 100 - (i * 20)
+                offset = i * 4
+                pygame.draw.rect(layer, (255, 0, 0, alpha), (offset, 0, glow_w - offset*2, SCREEN_HEIGHT))
+            if k != 1.0:
+                layer = pygame.transform.smoothscale(layer, (max(1, int(glow_w * k)), h))
+        if pygame.display.get_surface() is not None:
+            layer = layer.convert_alpha() if key[0] == "glow" else layer.convert()
+        self._layer_cache[key] = layer
+        return layer
+
+    def reset_cycle(self):
+        self.timer = random.randint(0, 100)
+        self.is_firing = False
+        self.is_warning = False
+        self.energy_particles = []
+
+# --- 地底尖刺系統 (強化版特效) ---
+SPIKE_RISE_FRAMES = 6   # 尖刺升起需要的幀數，之後維持最高
+SPIKE_COUNT = 6
+SPIKE_TIP_PAD = 4       # 尖端白點會超出尖刺高度，預留空間
+SPIKE_DEBRIS_VARIANTS = 8
+
+def _build_spike_frames(width, height):
+    """預先畫好每一個升起高度的尖刺 (含底部光暈)，攻擊時每幀只需一次 blit"""
+    spike_w = width // SPIKE_COUNT
+    surf_h = height + SPIKE_TIP_PAD
+    ground = surf_h  # 畫面底部在快取圖上的 y
+
+    glow_surf = pygame.Surface((width, 20), pygame.SRCALPHA)
+    pygame.draw.rect(glow_surf, (255, 50, 0, 100), (0, 0, width, 20), border_radius=10)
+
+    frames = []
+    for step in range(SPIKE_RISE_FRAMES + 1):
+        rise_ratio = step / SPIKE_RISE_FRAMES
+        current_h = height * rise_ratio
+        frame = pygame.Surface((width, surf_h), pygame.SRCALPHA)
+        if step > 0:
+            for i in range(SPIKE_COUNT):
+                base_x = i * spike_w
+                points_side = [
+                    (base_x, ground),
+                    (base_x + spike_w // 2, ground - current_h),
+                    (base_x + spike_w * 0.7, ground)
+                ]
+                pygame.draw.polygon(frame, SPIKE_DARK, points_side)
+
+                points_main = [
+                    (base_x + 5, ground),
+                    (base_x + spike_w // 2, ground - current_h),
+                    (base_x + spike_w - 5, ground)
+                ]
+                pygame.draw.polygon(frame, SPIKE_COLOR, points_main)
+
+                if rise_ratio > 0.8:
+                    tip_pos = (base_x + spike_w // 2, ground - current_h)
+                    pygame.draw.circle(frame, WHITE, tip_pos, 3)
+
+                pygame.draw.polygon(frame, WHITE, points_main, 1)
+        frame.blit(glow_surf, (0, ground - 10))
+        frames.append(frame)
+    return frames
+
+def _build_spike_warning(width):
+    """預警用的紅色條 (用整張 alpha 閃爍) 與幾組隨機碎石圖層"""
+    bar = pygame.Surface((width, 15))
+    bar.fill((255, 0, 0))
+    debris = []
+    for _ in range(SPIKE_DEBRIS_VARIANTS):
+        layer = pygame.Surface((width + 6, 26), pygame.SRCALPHA)
+        for _ in range(3):
+            px = fx_random.randint(0, width)
+            py = fx_random.randint(3, 23)
+            pygame.draw.circle(layer, RED, (px + 3, py), fx_random.randint(1, 3))
+        debris.append(layer)
+    return bar, debris
+
+class GroundSpikes:
+    _frame_cache = {}   # (width, height, 縮放) -> 升起動畫幀，同尺寸的尖刺區共用
+    _warning_cache = {} # (width, 縮放) -> (預警條, 碎石圖層)
+
+    def __init__(self, width=300, height=120, unlock_score=2500):
+        self.active = False
+        self.unlock_score = unlock_score
+        self.cooldown = 180
+        self.timer = 0
+        self.warning_duration = 60
+        self.attack_duration = 40
+        self.width = width
+        self.height = height
+        self.x = 0
+        self.is_attacking = False
+        self.is_warning = False
+        # 視覺特效變數
+        self.anim_frame = 0
+
+    def update(self, current_score):
+        if current_score >= self.unlock_score:
+            self.active = True
+        else:
+            self.active = False
+            self.reset_cycle()
+            return
+
+        self.timer += 1
+        cycle_time = self.timer % self.cooldown
+
+        if cycle_time == 1:
+            self.x = random.randint(0, SCREEN_WIDTH - self.width)
+            self.is_warning = True
+            self.is_attacking = False
+            self.anim_frame = 0
+        elif cycle_time == self.warning_duration:
+            self.is_warning = False
+            self.is_attacking = True
+            self.anim_frame = 0 # 重置動畫幀供攻擊使用
+        elif cycle_time == self.warning_duration + self.attack_duration:
+            self.is_attacking = False
+
+        if self.is_attacking or self.is_warning:
+            self.anim_frame += 1
+
+    def check_collision(self, target_hitbox):
+        if self.is_attacking:
+            spike_rect = pygame.Rect(self.x, SCREEN_HEIGHT - self.height, self.width, self.height)
+            return spike_rect.colliderect(target_hitbox)
+        return False
+
+    def draw(self, surface, scale=1.0):
+        if not self.active:
+            return
+        k = scale
+        bottom = SCREEN_HEIGHT * k
+
+        if self.is_warning:
+            bar, debris = self._warning_cache.get((self.width, k)) or self._cache_warning(k)
+            shake_x = fx_random.randint(-2, 2)
+            warn_alpha = abs(math.sin(self.anim_frame * 0.2)) * 150 + 50
+            bar.set_alpha(int(warn_alpha))
+            surface.blit(bar, ((self.x + shake_x) * k, bottom - bar.get_height()))
+            if quality.sparks:
+                surface.blit(fx_random.choice(debris), ((self.x - 3) * k, bottom - 23 * k))
+
+        if self.is_attacking:
+            frames = self._frame_cache.get((self.width, self.height, k)) or self._cache_frames(k)
+            frame = frames[min(self.anim_frame, SPIKE_RISE_FRAMES)]
+            surface.blit(frame, (self.x * k, bottom - frame.get_height()))
+
+    def _cache_frames(self, scale=1.0):
+        frames = self._frame_cache.get((self.width, self.height, 1.0)) or _build_spike_frames(self.width, self.height)
+        self._frame_cache[(self.width, self.height, 1.0)] = frames
+        if scale != 1.0:
+            frames = [resource_manager.at_scale(frame, scale) for frame in frames]
+            self._frame_cache[(self.width, self.height, scale)] = frames
+        return frames
+
+    def _cache_warning(self, scale=1.0):
+        bar, debris = self._warning_cache.get((self.width, 1.0)) or _build_spike_warning(self.width)
+        self._warning_cache[(self.width, 1.0)] = (bar, debris)
+        if scale != 1.0:
+            bar = pygame.transform.scale(bar, (max(1, int(bar.get_width() * scale)), max(1, int(bar.get_height() * scale))))
+            debris = [resource_manager.at_scale(layer, scale) for layer in debris]
+            self._warning_cache[(self.width, scale)] = (bar, debris)
+        return bar, debris
+
+    def reset_cycle(self):
+        self.timer = 0
+        self.is_attacking = False
+        self.is_warning = False
+        self.anim_frame = 0
+
+# --- 角色選擇介面 ---
+class CharacterSelector:
+    def __init__(self, title="Choose Your Character"):
+        self.title = title
+        self.selected_base = "player"
+        self.options = ["player", "player2"]
+        self.is_active = True
+        self.option_rects = []
+        for i in range(len(self.options)):
+            rect = pygame.Rect(150 + i * 300, 250, 200, 200)
+            self.option_rects.append(rect)
+        self.start_btn = pygame.Rect(300, 500, 200, 60)
+        self.layer = None
+        self.layer_key = None
+
+    def draw(self, surface):
+        if self.layer_key != self.selected_base:
+            self.layer = pygame.Surface(surface.get_size(), 0, surface)
+            self.draw_layer(self.layer)
+            self.layer_key = self.selected_base
+        surface.blit(self.layer, (0, 0))
+
+    def draw_layer(self, surface):
+        """整個畫面 (選擇改變時才重畫)"""
+        surface.fill(DARK_GRAY)
+        title = font.render(self.title, True, WHITE)
+        surface.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 100))
+        for i, option in enumerate(self.options):
+            rect = self.option_rects[i]
+            color = GOLD if self.selected_base == option else WHITE
+            pygame.draw.rect(surface, color, rect, 5, border_radius=10)
+            char_img = resource_manager.scaled(option, (180, 180))
+            if char_img:
+                resource_manager.blit(surface, char_img, (rect.x + 10, rect.y + 10))
+            else:
+                pygame.draw.circle(surface, GRAY, rect.center, 60)
+                txt = shop_font.render(option, True, WHITE)
+                surface.blit(txt, (rect.centerx - txt.get_width()//2, rect.bottom + 10))
+
+        pygame.draw.rect(surface, BLUE, self.start_btn, border_radius=10)
+        start_txt = font.render("START", True, WHITE)
+        surface.blit(start_txt, (self.start_btn.centerx - start_txt.get_width()//2, self.start_btn.centery - start_txt.get_height()//2))
+
+    def handle_click(self, pos):
+        for i, rect in enumerate(self.option_rects):
+            if rect.collidepoint(pos):
+                self.selected_base = self.options[i]
+                return
+        if self.start_btn.collidepoint(pos):
+            self.is_active = False
+
+# --- 商店類別 ---
+class Shop:
+    def __init__(self, game):
+        self.game = game
+        self.is_open = False
+        self.items = [
+            {"name": "提升速度 (Speed Up)", "cost": 500, "type": "speed"},
+            {"name": "強力跳躍 (High Jump)", "cost": 800, "type": "jump"},
+            {"name": "終極護盾 (Shield x1) [X]", "cost": 1000, "type": "shield"},
+            {"name": "格擋系統 (BLOCK) [F]", "cost": 1200, "type": "block_skill"}
+        ]
+        self.rect = pygame.Rect(150, 50, 500, 500)
+        self.close_button = pygame.Rect(600, 60, 40, 40)
+        self.double_score_active = False
+        self.shield_count = 0
+        self.has_block_skill = False
+        self.has_flash_step = False
+        self.layer = None
+        self.layer_key = None
+
+    def item_rect(self, index):
+        """第 index 項商品的按鈕；商品多 (例如閃現版) 時縮小間距"""
+        spacing = min(85, 380 // len(self.items))
+        return pygame.Rect(self.rect.x + 50, self.rect.y + 100 + (index * spacing), 400, 70)
+
+    def owns(self, item_type):
+        return (item_type == "block_skill" and self.has_block_skill) or \
+            (item_type == "flash_step" and self.has_flash_step)
+
+    def draw(self, surface):
+        if not self.is_open:
+            return
+        draw_tint(surface, BLACK, 150)
+        # 商品 (閃現版會多加) 或擁有狀態改變 (購買、重來) 時才重畫面板
+        key = tuple((item['name'], item['cost'], self.owns(item['type'])) for item in self.items)
+        if key != self.layer_key:
+            self.layer = build_layer(self.rect, self.draw_panel)
+            self.layer_key = key
+        surface.blit(*self.layer)
+
+    def draw_panel(self, surface):
+        pygame.draw.rect(surface, BLUE, self.rect, border_radius=15)
+        pygame.draw.rect(surface, WHITE, self.rect, 3, border_radius=15)
+        title = font.render("Item Shop", True, GOLD)
+        surface.blit(title, (self.rect.centerx - title.get_width()//2, self.rect.y + 20))
+
+        hint = shop_font.render(f"[ Press {self.game.key_names[1]} to use BLOCK ]", True, WHITE)
+        surface.blit(hint, (self.rect.centerx - hint.get_width()//2, self.rect.y + 55))
+
+        pygame.draw.rect(surface, (200, 0, 0), self.close_button)
+        close_text = shop_font.render("X", True, WHITE)
+        surface.blit(close_text, (self.close_button.centerx - 10, self.close_button.centery - 12))
+
+        for i, item in enumerate(self.items):
+            item_rect = self.item_rect(i)
+            pygame.draw.rect(surface, GRAY, item_rect, border_radius=10)
+
+            display_name = item['name']
+            if self.owns(item['type']):
+                display_name += " (OWNED)"
+
+            name_text = shop_font.render(f"{display_name}", True, WHITE)
+            cost_text = shop_font.render(f"Cost: {item['cost']}", True, YELLOW)
+            surface.blit(name_text, (item_rect.x + 20, item_rect.y + 10))
+            surface.blit(cost_text, (item_rect.x + 20, item_rect.y + 40))
+
+    def handle_click(self, pos, current_player):
+        if not self.is_open: return False
+        if self.close_button.collidepoint(pos):
+            self.is_open = False
+            return True
+        for i in range(len(self.items)):
+            if self.item_rect(i).collidepoint(pos):
+                self.buy(i, current_player)
+                return True
+        return False
+
+    def buy(self, index, current_player):
+        """購買第 index 項商品，分數不足或已擁有時回傳 False"""
+        game = self.game
+        item = self.items[index]
+        if game.score < item['cost']:
+            return False
+        if self.owns(item['type']):
+            return False
+        game.score -= item['cost']
+        self.apply_item(item['type'], current_player)
+        game.run_items.append(item['type'])
+        game.recorder.record(telemetry.SHOP_PURCHASE, item['cost'], game.score, detail=index)
+        game.sound.play("purchase")
+        return True
+
+    def apply_item(self, item_type, current_player):
+        if item_type == "speed": current_player.speed += 2
+        elif item_type == "jump": current_player.jump_strength -= 3
+        elif item_type == "shield": self.shield_count += 1
+        elif item_type == "block_skill": self.has_block_skill = True
+        elif item_type == "flash_step": self.has_flash_step = True
+
+    def reset(self):
+        self.double_score_active = False
+        self.shield_count = 0
+        self.has_block_skill = False
+        self.has_flash_step = False
+
+# --- 玩家類別 ---
+class Player(pygame.sprite.Sprite):
+    def __init__(self, game, base_character):
+        super().__init__()
+        self.game = game
+        self.base_name = base_character
+        self.speed = PLAYER_SPEED
+        self.jump_strength = JUMP_STRENGTH
+        self.velocity_y = 0
+        self.gravity = GRAVITY
+        self.is_jumping = False
+        self.level = 1
+
+        self.shield_active = False
+        self.shield_timer = 0
+        self.shield_duration = 300
+        self.shield_width = 500
+        self.shield_height = 40
+        self.shield_rect = pygame.Rect(0, 0, self.shield_width, self.shield_height)
+
+        self.is_blocking = False
+        self.flash_timer = 0 # 閃現剩餘冷卻幀數
+        self.controls = 0 # 本幀的輸入 (INPUT_* 位元遮罩)，由 GameSession.step 設定
+        self.current_size = 200
+        self.load_player_images()
+        self.image = self.idle_img
+        self.rect = self.image.get_rect()
+
+        self.hit_rect = self.rect.inflate(-self.rect.width * 0.75, -self.rect.height * 0.4)
+        self.rect.centerx = SCREEN_WIDTH // 2
+        self.rect.bottom = SCREEN_HEIGHT - 10
+        self.ground_y = self.rect.bottom
+        self.hit_rect.center = self.rect.center
+
+    def reset_stats(self):
+        self.speed = PLAYER_SPEED
+        self.jump_strength = JUMP_STRENGTH
+        self.level = 1
+        self.shield_active = False
+        self.is_blocking = False
+        self.load_player_images()
+
+    def load_player_images(self):
+        if self.game.is_in_penalty_mode or self.level >= 2:
+            idle_name, jump_name = self.base_name + '2', self.base_name + '2_jump'
+        else:
+            idle_name, jump_name = self.base_name, self.base_name + '_jump'
+
+        size = (self.current_size, self.current_size)
+        if not resource_manager.get(idle_name): idle_name = self.base_name
+        if not resource_manager.get(jump_name): jump_name = idle_name
+
+        self.idle_img = resource_manager.scaled(idle_name, size) or \
+            resource_manager.procedural("player", draw_player_sprite, self.current_size, self.level)
+        # 圖片共用，不會被修改，所以不需要 copy
+        self.jump_img = resource_manager.scaled(jump_name, size) or self.idle_img
+
+    def check_evolution(self, current_score):
+        game = self.game
+        state_changed = False
+
+        if current_score < 0 and not game.is_dead:
+            self.trigger_death(telemetry.CAUSE_BANKRUPT)
+            return
+
+        if current_score >= 1500 and not game.is_in_penalty_mode and not game.has_cleared_penalty:
+            game.is_in_penalty_mode = True
+            game.penalty_timer = PENALTY_DURATION
+            state_changed = True
+
+        if game.is_in_penalty_mode:
+            game.penalty_timer -= 1
+            if game.penalty_timer <= 0:
+                game.is_in_penalty_mode = False
+                game.has_cleared_penalty = True
+                self.level = 1
+                state_changed = True
+
+        if not game.is_in_penalty_mode and not game.is_dead:
+            if self.level == 1 and current_score >= 100:
+                self.level = 2
+                state_changed = True
+
+        if state_changed:
+            self.load_player_images()
+            old_center = self.rect.center
+            self.image = self.jump_img if self.is_jumping else self.idle_img
+            new_rect = self.image.get_rect()
+            new_rect.center = old_center
+            self.rect = new_rect
+            self.hit_rect = self.rect.inflate(-self.rect.width * 0.75, -self.rect.height * 0.4)
+
+    def trigger_death(self, cause=telemetry.CAUSE_NONE):
+        if not self.game.is_dead:
+            self.game.on_death(self, cause)
+
+    def jump(self):
+        if not self.is_jumping and not self.is_blocking:
+            self.velocity_y = self.jump_strength
+            self.is_jumping = True
+            self.image = self.jump_img
+
+    def activate_shield(self):
+        shop = self.game.shop
+        if shop.shield_count > 0 and not self.shield_active:
+            shop.shield_count -= 1
+            self.shield_active = True
+            self.shield_timer = self.shield_duration
+            self.game.recorder.record(telemetry.SHIELD_USED, 0, self.game.score,
+                                      detail=min(shop.shield_count, 255))   # detail 只有 1 byte
+            self.game.sound.play("shield")
+
+    def flash_step(self, pos):
+        """瞬移到 pos (邏輯座標，不會低於地面)；需要買過閃現且冷卻結束"""
+        if not self.game.shop.has_flash_step or self.flash_timer > 0:
+            return False
+        self.rect.center = pos
+        if self.rect.bottom > self.ground_y:
+            self.rect.bottom = self.ground_y
+        self.hit_rect.center = self.rect.center
+        self.flash_timer = FLASH_COOLDOWN
+        return True
+
+    def update(self):
+        controls = self.controls
+        if controls & INPUT_BLOCK and self.game.shop.has_block_skill:
+            if not self.is_blocking:
+                self.game.recorder.record(telemetry.BLOCK_USED, 0, self.game.score)
+                self.game.sound.play("block")
+            self.is_blocking = True
+        else:
+            self.is_blocking = False
+
+        move_speed = self.speed
+        if self.is_blocking:
+            move_speed = 2
+
+        if controls & INPUT_LEFT: self.rect.x -= move_speed
+        if controls & INPUT_RIGHT: self.rect.x += move_speed
+        if self.flash_timer > 0: self.flash_timer -= 1
+
+        self.velocity_y += self.gravity
+        self.rect.y += self.velocity_y
+
+        if self.shield_active:
+            self.shield_rect.centerx = self.rect.centerx
+            self.shield_rect.bottom = self.rect.top - 10
+            self.shield_timer -= 1
+            if self.shield_timer <= 0:
+                self.shield_active = False
+
+        if self.rect.bottom >= self.ground_y:
+            self.rect.bottom = self.ground_y
+            self.velocity_y = 0
+            if self.is_jumping:
+                self.is_jumping, self.image = False, self.idle_img
+
+        self.hit_rect.center = self.rect.center
+
+        if self.hit_rect.left < 0:
+            self.rect.left -= self.hit_rect.left
+            self.hit_rect.left = 0
+        if self.hit_rect.right > SCREEN_WIDTH:
+            self.rect.right -= (self.hit_rect.right - SCREEN_WIDTH)
+            self.hit_rect.right = SCREEN_WIDTH
+
+    def draw_shield(self, surface, scale=1.0):
+        k = scale
+        if self.shield_active:
+            w, h = int(self.shield_width * k), int(self.shield_height * k)
+            shield_surf = pygame.Surface((w, h), pygame.SRCALPHA)
+            pygame.draw.rect(shield_surf, SHIELD_COLOR, (0, 0, w, h), border_radius=int(15 * k))
+            pygame.draw.rect(shield_surf, WHITE, (0, 0, w, h), max(1, int(2 * k)), border_radius=int(15 * k))
+            surface.blit(shield_surf, (self.shield_rect.x * k, self.shield_rect.y * k))
+
+        if self.is_blocking:
+            w, h = int(self.rect.width * k), int(self.rect.height * k)
+            block_surf = pygame.Surface((w, h), pygame.SRCALPHA)
+            pygame.draw.circle(block_surf, (255, 255, 255, 80), (w//2, h//2), 100 * k, max(1, int(10 * k)))
+            surface.blit(block_surf, (self.rect.x * k, self.rect.y * k))
+
+# --- 金幣類別 ---
+# 各階段金幣的 (顯示大小, 護盾判定大小, 圖片)；接到金幣用像素遮罩判定。網路同步時只傳索引
+COIN_STYLES = [
+    (70, 60, 'flag'),
+    (90, 80, 'flag2'),
+    (120, 100, 'player_jump'),
+    (80, 70, 'flag'),
+    (180, 100, 'flag3'),    # 懲罰金幣
+]
+PENALTY_STYLE = 4
+
+def coin_style_for(game):
+    if game.is_in_penalty_mode:
+        return PENALTY_STYLE
+    elif game.has_cleared_penalty:
+        return 3
+    elif game.score >= 500:
+        return 2
+    elif game.score >= 100:
+        return 1
+    return 0
+
+class Coin(pygame.sprite.Sprite):
+    def __init__(self, style):
+        super().__init__()
+        self.net_id = next(_entity_ids)
+        self.style = style
+        size, hit, asset = COIN_STYLES[style]
+        self.type = "penalty" if style == PENALTY_STYLE else "normal"
+
+        self.speed = COIN_SPEED
+        self.image = resource_manager.scaled(asset, (size, size)) or \
+            resource_manager.procedural("coin", draw_coin_sprite, size, self.type == "penalty")
+
+        self.rect = self.image.get_rect()
+        self.rect.x = random.randrange(0, SCREEN_WIDTH - self.rect.width)
+        self.rect.y = -self.rect.height
+        self.hit_rect = pygame.Rect(0, 0, hit, hit)
+
+    def update(self):
+        self.rect.y += self.speed
+        self.hit_rect.center = self.rect.center
+
+# --- 一個玩家的狀態 ---
+class Seat:
+    """一個玩家自己的狀態：分數、懲罰/死亡、本局紀錄、商店與 HUD。Player 與 Shop 透過
+    .game 讀寫的就是這些欄位；GameSession 是一個 Seat 加上整個世界，
+    versus.VersusSession 讓兩個 Seat 共用一個世界"""
+
+    def __init__(self, recorder=None, run_store=None, sound=None):
+        self.recorder = recorder or telemetry.TelemetryRecorder(None)
+        self.sound = sound or SoundEngine(enabled=False)
+        self.run_store = run_store
+
+        # --- 遊戲狀態 ---
+        self.score = 0
+        self.is_in_penalty_mode = False
+        self.has_cleared_penalty = False
+        self.penalty_timer = 0
+        self.is_dead = False
+        self.death_timer = 0
+        self.death_cause = telemetry.CAUSE_NONE
+
+        # --- 本局紀錄 (死亡時寫入高分榜) ---
+        self.peak_score = 0
+        self.run_frames = 0
+        self.run_items = []
+        self.high_scores = []
+        self.death_layer = None # 死亡畫面的文字與高分榜 (第一次繪製時渲染)
+        self.hud_layer = None   # HUD 的框與不常變的文字，hud_key 改變時重畫
+        self.hud_key = None
+        self.score_label = (None, None)     # (分數, 文字 Surface)
+        self.danger_label = (None, None)    # (懲罰剩餘秒數, 文字 Surface)
+        self.key_names = ("X", "F")         # HUD 與商店上顯示的護盾、格擋按鍵
+
+        self.shop = Shop(self)
+        self.player = None
+        self.character = "player"
+
+    def reset_seat(self):
+        """死亡後重來：分數、懲罰與本局紀錄歸零，商店清空"""
+        self.score = 0
+        self.is_in_penalty_mode = False
+        self.has_cleared_penalty = False
+        self.penalty_timer = 0
+        self.is_dead = False
+        self.death_cause = telemetry.CAUSE_NONE
+        self.peak_score = 0
+        self.run_frames = 0
+        self.run_items = []
+        self.shop.reset()
+
+    def on_death(self, player, cause):
+        self.is_dead = True
+        self.death_timer = 120
+        self.death_cause = cause
+        self.recorder.record(telemetry.DEATH, 0, self.score, detail=cause)
+        self.sound.play("death")
+        self.recorder.flush()
+        if self.run_store:
+            self.run_store.record_run(player.base_name, self.score, self.peak_score, self.run_frames,
+                                      telemetry.CAUSE_NAMES[cause], self.run_items)
+            # 死亡畫面每幀只需要 blit；高分榜是記憶體裡的那份，已經併入這一局，不等磁碟
+            self.high_scores = self.run_store.leaders()
+            self.death_layer = None
+
+    def draw_hud(self, surface):
+        shop = self.shop
+        key = (shop.shield_count, shop.has_block_skill)
+        if key != self.hud_key:
+            self.hud_layer = build_layer(HUD_RECT, self.draw_hud_panel)
+            self.hud_key = key
+        surface.blit(*self.hud_layer)
+
+        # 分數與懲罰倒數只在數字改變時重新渲染
+        if self.score_label[0] != self.score:
+            self.score_label = (self.score, font.render(f"Credits: {self.score}", True, WHITE))
+        surface.blit(self.score_label[1], (20, 15))
+
+        if self.is_in_penalty_mode:
+            timer_sec = max(0, self.penalty_timer // 60 + 1)
+            if self.danger_label[0] != timer_sec:
+                self.danger_label = (timer_sec, shop_font.render(f"DANGER: {timer_sec}s", True, RED))
+            surface.blit(self.danger_label[1], (20, 50))
+
+    def draw_hud_panel(self, surface):
+        """HUD 不常變的部分：框、護盾數、格擋技能與商店提示"""
+        pygame.draw.rect(surface, DARK_GRAY, HUD_RECT, border_radius=10)
+        pygame.draw.rect(surface, WHITE, HUD_RECT, 2, border_radius=10)
+
+        shop = self.shop
+        shield_key, block_key = self.key_names
+        shield_text = shop_font.render(f"Shields: {shop.shield_count} ({shield_key})", True, BLUE if shop.shield_count > 0 else GRAY)
+        surface.blit(shield_text, (20, 75))
+
+        block_status_color = YELLOW if shop.has_block_skill else GRAY
+        block_text = shop_font.render(f"BLOCK: {f'READY ({block_key})' if shop.has_block_skill else 'NOT OWNED'}", True, block_status_color)
+        surface.blit(block_text, (20, 100))
+
+        shop_hint = shop_font.render("(Click to Shop)", True, GOLD)
+        surface.blit(shop_hint, (20, 122))
+
+    def draw_death_screen(self, surface):
+        """surface 比邏輯畫面窄 (分割畫面的半邊) 時文字置中在 surface 裡"""
+        draw_tint(surface, (150, 0, 0), 180)
+        if self.death_layer is None:
+            self.death_layer = build_layer(DEATH_TEXT_RECT, self.draw_death_text, alpha=True)
+        layer, (x, y) = self.death_layer
+        surface.blit(layer, (x + (surface.get_width() - SCREEN_WIDTH) // 2, y))
+
+    def draw_death_text(self, surface):
+        """GAME OVER 與高分榜 (每次死亡查詢高分榜後重畫)"""
+        death_msg = big_font.render("GAME OVER", True, WHITE)
+        hint_msg = font.render("You are such a failure", True, YELLOW)
+        surface.blit(death_msg, (SCREEN_WIDTH//2 - death_msg.get_width()//2, SCREEN_HEIGHT//2 - 50))
+        surface.blit(hint_msg, (SCREEN_WIDTH//2 - hint_msg.get_width()//2, SCREEN_HEIGHT//2 + 40))
+
+        lines = []
+        if self.high_scores:
+            lines.append(shop_font.render("TOP RUNS", True, GOLD))
+        for rank, (character, peak, final, frames, cause) in enumerate(self.high_scores, 1):
+            line = f"{rank}. {character:<8} {peak:>6}  ({frames // 60}s, {cause})"
+            lines.append(shop_font.render(line, True, WHITE))
+        for i, line in enumerate(lines):
+            surface.blit(line, (SCREEN_WIDTH//2 - 150, SCREEN_HEIGHT//2 + 90 + i * 22))
+
+# --- 一局遊戲的完整狀態 ---
+class GameSession(Seat):
+    """一個玩家的一局遊戲：分數、懲罰/死亡狀態 (Seat)、所有實體，以及每幀的規則"""
+
+    def __init__(self, recorder=None, run_store=None, squadron=0, sound=None):
+        """squadron > 0 時 (困難模式) 以 formation.EnemyFormation 的整隊空中敵人取代單一 AerialEnemy"""
+        super().__init__(recorder, run_store, sound)
+        self.laser_cannons = [LaserCannon(2000), LaserCannon(4000)]
+        self.ground_spikes = GroundSpikes()
+        self.aerial_enemy = AerialEnemy()
+        self.bullets = pygame.sprite.Group()
+        self.all_sprites = pygame.sprite.Group()
+        self.coins = pygame.sprite.Group()
+        self.bullet_pool = BulletPool(self.bullets, self.all_sprites)
+        self.formation = None
+        if squadron:
+            from formation import EnemyFormation
+            self.formation = EnemyFormation(squadron, seed=random.getrandbits(32)) # random.seed 決定編隊
+        self.coin_counter = 0
+        # 版本規則 (variants.py 的 configure 可以改)
+        self.shield_stops_bullets = True        # 護盾擋子彈
+        self.guards_stop_coins = True           # 護盾擋掉、格擋彈開金幣 (不得分)
+        self.miss_penalty_in_penalty = False    # 懲罰模式中漏接一般金幣也扣 5 分
+
+    def start(self, character):
+        """選完角色後開始遊戲"""
+        self.character = character
+        self.player = Player(self, character)
+        self.all_sprites.add(self.player)
+
+    def spawn_coin(self):
+        c = Coin(coin_style_for(self))
+        self.all_sprites.add(c)
+        self.coins.add(c)
+
+    def reset_game(self):
+        self.reset_seat()
+        for lc in self.laser_cannons: lc.reset_cycle()
+        self.ground_spikes.reset_cycle()
+        if self.formation: self.formation.reset()
+        for sprite in self.all_sprites: sprite.kill()
+        self.bullets.empty()
+        if self.player:
+            self.player = Player(self, self.character)
+            self.all_sprites.add(self.player)
+
+    def live_players(self):
+        """這一幀在場上的玩家 (碰撞與護盾繪製)"""
+        return (self.player,) if self.player else ()
+
+    def handle_click(self, pos):
+        if self.is_dead:
+            return
+        if pygame.Rect(0, 0, 250, 150).collidepoint(pos):
+            self.shop.is_open = not self.shop.is_open
+        else:
+            self.shop.handle_click(pos, self.player)
+
+    def step(self, controls):
+        """推進一幀；controls 為 INPUT_* 位元遮罩"""
+        player = self.player
+        if not self.is_dead:
+            if controls & INPUT_JUMP: player.jump()
+            if controls & INPUT_SHIELD: player.activate_shield()
+
+        if not self.shop.is_open and not self.is_dead:
+            player.check_evolution(self.score)
+            players = (player,)
+            self.update_hazards(player.hit_rect)
+            self.check_hazards(players)
+
+            player.controls = controls
+            self.all_sprites.update()
+            self.coin_counter += 1
+            self.recorder.tick()
+            self.sound.tick()
+            self.run_frames += 1
+
+            freq = PENALTY_COIN_FREQUENCY if self.is_in_penalty_mode else NORMAL_COIN_FREQUENCY
+            if self.coin_counter % freq == 0: self.spawn_coin()
+
+            self.collect_coins(players)
+            self.peak_score = max(self.peak_score, self.score)
+            if self.recorder.enabled and self.recorder.frame % statehash.HASH_EVERY == 0:
+                for field, value in enumerate(statehash.state_hashes(self)):
+                    self.recorder.record(telemetry.STATE_HASH, statehash.to_int32(value), self.score, detail=field)
+
+        if self.is_dead:
+            self.death_timer -= 1
+            if self.death_timer <= 0:
+                self.reset_game()
+
+    def update_hazards(self, target):
+        """雷射、尖刺依 self.score 解鎖並前進一幀，空中敵人朝 target (玩家的 hit_rect) 開火"""
+        sound = self.sound
+        for lc in self.laser_cannons:
+            was_warning, was_firing = lc.is_warning, lc.is_firing
+            lc.update(self.score)
+            if lc.is_warning and not was_warning: sound.play("laser_warning")
+            if lc.is_firing and not was_firing: sound.play("laser_fire")
+        was_attacking = self.ground_spikes.is_attacking
+        self.ground_spikes.update(self.score)
+        if self.ground_spikes.is_attacking and not was_attacking: sound.play("spike_rise")
+        bullet_count = len(self.bullets)
+        if self.formation:
+            self.formation.update(target, self.score, self.bullet_pool)
+        else:
+            self.aerial_enemy.update(target, self.score, self.bullets, self.all_sprites)
+        if len(self.bullets) > bullet_count: sound.play("bullet_fire")
+
+    @staticmethod
+    def reach(players):
+        """所有玩家 (含護盾) 的外框聯集：碰不到它的金幣/子彈不必逐一比對玩家"""
+        rects = [rect for player in players
+                 for rect in ((player.rect, player.shield_rect) if player.shield_active else (player.rect,))]
+        return rects[0].unionall(rects[1:])
+
+    def check_hazards(self, players):
+        """雷射、尖刺與子彈對 players 的判定；子彈只走訪一次，每顆再比對碰得到的玩家"""
+        for lc in self.laser_cannons:
+            for player in players:
+                if lc.check_collision(player.hit_rect, player.shield_active, player.shield_rect):
+                    player.trigger_death(telemetry.CAUSE_LASER)
+
+        for player in players:
+            if self.ground_spikes.check_collision(player.hit_rect):
+                player.trigger_death(telemetry.CAUSE_SPIKE)
+
+        reach = self.reach(players)
+        for bullet in self.bullets:
+            if not reach.colliderect(bullet.rect):
+                continue
+            for player in players:
+                if self.shield_stops_bullets and player.shield_active and player.shield_rect.colliderect(bullet.rect):
+                    bullet.kill()
+                    break
+                elif pixels_collide(player, bullet):
+                    if player.is_blocking:
+                        bullet.kill()
+                        break
+                    player.trigger_death(telemetry.CAUSE_BULLET)
+
+    def collect_coins(self, players):
+        """金幣只走訪一次：掉出畫面時不在懲罰模式的玩家各扣 5 分，否則交給第一個碰到的玩家
+        (護盾擋掉、格擋彈開或接到，分數記在該玩家的 Seat)"""
+        sound = self.sound
+        reach = self.reach(players)
+        guards = self.guards_stop_coins
+        for coin in list(self.coins):
+            if coin.rect.top > SCREEN_HEIGHT:
+                if coin.type == "normal":
+                    for player in players:
+                        seat = player.game
+                        if self.miss_penalty_in_penalty or not seat.is_in_penalty_mode:
+                            seat.score -= 5
+                            self.recorder.record(telemetry.COIN_MISSED, -5, seat.score)
+                coin.kill()
+                continue
+            if not reach.colliderect(coin.rect):
+                continue
+            for player in players:
+                if guards and player.shield_active and player.shield_rect.colliderect(coin.hit_rect):
+                    coin.kill()
+                    break
+                elif pixels_collide(player, coin):
+                    if not (guards and player.is_blocking):
+                        seat = player.game
+                        val = -100 if coin.type == "penalty" else 100
+                        if seat.shop.double_score_active and val > 0: val *= 2
+                        seat.score += val
+                        self.recorder.record(telemetry.PENALTY_HIT if coin.type == "penalty" else telemetry.COIN_CAUGHT, val, seat.score)
+                        sound.play("penalty" if coin.type == "penalty" else "coin")
+                    coin.kill()
+                    break
+
+    _canvas_cache = {} # 低解析度世界圖層，依大小共用
+
+    def draw(self, surface, render_scale=1.0):
+        """畫一幀到邏輯大小的 surface
+
+        世界圖層以畫質等級與 render_scale (效能模式) 中較低的解析度繪製，
+        低於 1 時畫到小畫布再放大；介面永遠是邏輯解析度"""
+        scale = min(quality.render_scale, render_scale)
+        if scale == 1.0:
+            self.draw_world(surface)
+        else:
+            size = (int(SCREEN_WIDTH * scale), int(SCREEN_HEIGHT * scale))
+            canvas = self._canvas_cache.get(size)
+            if canvas is None:
+                canvas = self._canvas_cache[size] = pygame.Surface(size).convert(surface)
+            self.draw_world(canvas, scale)
+            pygame.transform.scale(canvas, surface.get_size(), surface)
+        self.draw_ui(surface)
+
+    def draw_ui(self, surface):
+        """HUD、死亡畫面與商店 (邏輯解析度)"""
+        self.draw_hud(surface)
+
+        if self.is_dead:
+            self.draw_death_screen(surface)
+
+        self.shop.draw(surface)
+
+    def draw_world(self, surface, scale=1.0):
+        """背景、精靈與危險物；scale 為 surface 相對邏輯座標 (SCREEN_WIDTH x SCREEN_HEIGHT) 的比例"""
+        surface.fill(BLACK)
+        resource_manager.draw_sprites(surface, self.all_sprites, scale)
+        if self.formation:
+            self.formation.draw(surface, scale)
+        else:
+            self.aerial_enemy.draw(surface, scale)
+
+        for player in self.live_players():
+            player.draw_shield(surface, scale)
+
+        for lc in self.laser_cannons:
+            lc.draw(surface, scale)
+        self.ground_spikes.draw(surface, scale)
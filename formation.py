@@ -0,0 +1,84 @@
+"""空中敵人編隊 (困難模式)
+
+N 架空中敵人的位置、速度 (含方向) 與下一次開火的幀數都存在 numpy 陣列裡，
+每幀一次向量運算移動全部敵人；只有到了最早的開火幀才找出要開火的敵人，
+用一次 arctan2 算出全部瞄準角度，子彈直接從 GameSession.bullet_pool 發射。
+敵人數量到幾十架，更新成本幾乎不變。
+"""
+import numpy as np
+
+import engine
+from engine import SCREEN_WIDTH, BULLET_SPEED, resource_manager
+
+FORMATION_SIZE = 80     # 編隊敵人的顯示大小 (單一 AerialEnemy 是 200)
+UNLOCK_SCORE = 3000     # 與 AerialEnemy 相同
+ROW_HEIGHT = 60
+ROWS = 3
+
+
+class EnemyFormation:
+    def __init__(self, count, seed=None):
+        rng = np.random.default_rng(seed)
+        self.count = count
+        self.size = FORMATION_SIZE
+        self.image = resource_manager.scaled('player_jump', (self.size, self.size)) or \
+            resource_manager.procedural("enemy", engine.draw_enemy_sprite, self.size)
+        # 每架敵人不同的速度與射擊間隔，開局時錯開計時避免同時開火
+        self.speed = rng.uniform(2.5, 6.0, count)
+        self.cooldown = rng.integers(90, 181, count)
+        self.start_timer = rng.integers(0, 90, count)    # 開局時已經累積的冷卻
+        self.start_x = np.linspace(0, SCREEN_WIDTH - self.size, count) if count > 1 else np.zeros(1)
+        self.y = 20 + (np.arange(count) % ROWS) * ROW_HEIGHT
+        self.active = False
+        self.reset()
+
+    def reset(self):
+        self.x = self.start_x.astype(float)
+        self.velocity = np.where(np.arange(self.count) % 2 == 0, self.speed, -self.speed)
+        self.frame = 0
+        self.fire_at = self.cooldown - self.start_timer    # 每架敵人下一次開火的幀
+        self.next_fire = int(self.fire_at.min())
+
+    def update(self, player_hitbox, current_score, bullet_pool):
+        """移動全部敵人並讓冷卻結束的敵人朝玩家開火；回傳這幀發射的子彈數"""
+        self.active = current_score >= UNLOCK_SCORE
+        if not self.active:
+            return 0
+
+        x = self.x
+        x += self.velocity
+        # 碰到左右邊界 (x <= 0 或右緣 >= 畫面寬) 的敵人往畫面中央折返
+        half_range = (SCREEN_WIDTH - self.size) / 2
+        bounced = np.abs(x - half_range) >= half_range
+        if bounced.any():
+            self.velocity[bounced] = np.copysign(self.speed[bounced], half_range - x[bounced])
+
+        self.frame += 1
+        if self.frame < self.next_fire:
+            return 0
+        firing = np.flatnonzero(self.fire_at <= self.frame)
+        self.fire_at[firing] += self.cooldown[firing]
+        self.next_fire = int(self.fire_at.min())
+        cx = x[firing] + self.size / 2
+        cy = self.y[firing] + self.size / 2
+        angles = np.arctan2(player_hitbox.centery - cy, player_hitbox.centerx - cx)
+        vx = np.cos(angles) * BULLET_SPEED
+        vy = np.sin(angles) * BULLET_SPEED
+        for args in zip(cx.tolist(), cy.tolist(), vx.tolist(), vy.tolist()):
+            bullet_pool.fire(*args)
+        return firing.size
+
+    def draw(self, surface, scale=1.0):
+        if not self.active:
+            return
+        if scale != 1.0:
+            image = resource_manager.at_scale(self.image, scale)
+            positions = zip((self.x * scale).astype(int).tolist(), (self.y * scale).astype(int).tolist())
+            surface.blits([(image, pos) for pos in positions], doreturn=False)
+            return
+        source = resource_manager.sources.get(self.image)
+        positions = zip(self.x.astype(int).tolist(), self.y.tolist())
+        if source:
+            surface.blits([(source[0], pos, source[1]) for pos in positions], doreturn=False)
+        else:
+            surface.blits([(self.image, pos) for pos in positions], doreturn=False)
@@ -0,0 +1,191 @@
+"""危險物佔用表：未來每一幀、每一欄 (COLUMN 像素寬) 有沒有致命的危險物
+
+自動駕駛、閃現版找安全落點 (variants.FlashStepVariant) 與之後的 AI 敵人都要問
+「這段 x 範圍在接下來 N 幀內會不會死」。往前模擬整局很貴；危險物的軌跡其實都算得出來：
+
+*   LaserCannon：這一輪的位置在預警開始時就決定了，發射幀由 timer 與週期算出
+    (解鎖時已經過了預警開始的那一幀也會照樣在原位置發射，一樣算得到)
+*   GroundSpikes：同上，只影響地面高度
+*   Bullet：Rect 每幀 += (vx, vy) 會四捨五入，所以每幀移動固定的整數像素，
+    軌跡是直線；只記錄落在地面玩家高度 (BAND_TOP 以下) 的幀
+
+HazardMap 以模擬幀號 (GameSession.coin_counter，危險物只在這些幀前進) 為時間軸，
+每種危險物一層 (HORIZON 幀 x 欄) 的計數，環狀使用。sync(game) 只在危險物換階段時
+更新：雷射/尖刺換一輪、出現新子彈時加上它的整段佔用，子彈消失或危險物重置時
+扣掉還沒過去的部分；過去的幀整列清零。沒有變化的幀只清一列。
+
+查詢：
+*   deadly(x, frame)：某一欄在 frame 幀後是否致命，O(1)
+*   range_deadly(left, right, frames)：[left, right) 在接下來 frames 幀內是否會致命，O(1)
+    (第一次查詢時以 numpy 建一次時間累積 + 欄前綴和的表，之後到下一幀都直接查表)
+*   range_deadly_many(lefts, rights, frames)：numpy 陣列一次查一批
+*   nearest_safe(x, width, frames)：離 x 最近、寬 width 的安全位置
+
+python bench.py hazardmap 比較查詢速度與每幀往前推演的成本。
+"""
+import numpy as np
+
+from engine import SCREEN_WIDTH, SCREEN_HEIGHT
+
+COLUMN = 8                              # 每欄像素
+COLUMNS = SCREEN_WIDTH // COLUMN
+HORIZON = 255                           # 最多往後記錄的幀數 (雷射從預警開始約 160 幀)
+BAND_TOP = SCREEN_HEIGHT - 220          # 子彈低於這個高度才算 (地面上的玩家)
+LASER, SPIKES, BULLETS = 0, 1, 2        # 圖層
+ALL = (LASER, SPIKES, BULLETS)
+LASER_MARGIN = 20                       # 雷射碰撞範圍比圖寬左右各內縮的像素 (LaserCannon.check_collision)
+
+
+def _columns(left, right):
+    """像素範圍 [left, right) 涵蓋的欄 [c0, c1) (保守：碰到一點就算)"""
+    return max(0, int(left) // COLUMN), min(COLUMNS, -(-int(right) // COLUMN))
+
+
+class HazardMap:
+    def __init__(self, horizon=HORIZON):
+        self.horizon = horizon
+        self.size = horizon + 1
+        self.counts = np.zeros((len(ALL), self.size, COLUMNS), np.int16)
+        self.now = 0
+        self.footprints = {}    # key -> (圖層, 幀號陣列, 欄起點陣列, 欄終點陣列)
+        self._tables = {}       # kinds -> 累積表 (到下一次變化前有效)
+
+    # --- 更新 ---
+
+    def sync(self, game):
+        """讓佔用表跟上 game 目前的狀態；同一幀重複呼叫幾乎不花時間"""
+        now = game.coin_counter
+        if now != self.now:
+            self._advance(now)
+        live = set()
+        # 週期性危險物以「這一輪在哪一幀開始」當 key：死亡重來時 reset_cycle 改了 timer 就是新的一輪
+        for i, lc in enumerate(game.laser_cannons):
+            if lc.active:
+                start = lc.warning_duration
+                key = ("laser", i, lc.x, now - lc.timer % lc.cooldown)
+                live.add(key)
+                if key not in self.footprints:
+                    self._add_cycle(key, LASER, lc.timer, lc.cooldown, start, start + lc.fire_duration,
+                                    lc.x + LASER_MARGIN, lc.x + lc.width - LASER_MARGIN)
+        spikes = game.ground_spikes
+        if spikes.active:
+            start = spikes.warning_duration
+            key = ("spikes", spikes.x, now - spikes.timer % spikes.cooldown)
+            live.add(key)
+            if key not in self.footprints:
+                self._add_cycle(key, SPIKES, spikes.timer, spikes.cooldown, start, start + spikes.attack_duration,
+                                spikes.x, spikes.x + spikes.width)
+        for bullet in game.bullets:
+            key = ("bullet", bullet.net_id)
+            live.add(key)
+            if key not in self.footprints:
+                self._add_bullet(key, bullet)
+        for key in [key for key in self.footprints if key not in live]:
+            self._remove(key)
+
+    def _advance(self, now):
+        """時間前進到 now：已經過去的幀整列清零"""
+        if now - self.now >= self.size or now < self.now:
+            self.counts[:] = 0
+            self.footprints.clear()
+        elif now == self.now + 1:
+            self.counts[:, now % self.size] = 0
+        else:
+            self.counts[:, np.arange(self.now + 1, now + 1) % self.size] = 0
+        self.now = now
+        self._tables.clear()
+
+    def _add(self, key, kind, frames, c0, c1):
+        keep = (frames > self.now) & (frames <= self.now + self.horizon) & (c1 > c0)
+        frames, c0, c1 = frames[keep], c0[keep], c1[keep]
+        self.footprints[key] = (kind, frames, c0, c1)
+        if len(frames):
+            cols = np.arange(COLUMNS)
+            self.counts[kind, frames % self.size] += (cols >= c0[:, None]) & (cols < c1[:, None])
+            self._tables.clear()
+
+    def _remove(self, key):
+        kind, frames, c0, c1 = self.footprints.pop(key)
+        future = frames > self.now
+        if future.any():
+            frames, c0, c1 = frames[future], c0[future], c1[future]
+            cols = np.arange(COLUMNS)
+            self.counts[kind, frames % self.size] -= (cols >= c0[:, None]) & (cols < c1[:, None])
+            self._tables.clear()
+
+    def _add_cycle(self, key, kind, timer, cooldown, start, end, left, right):
+        """週期性危險物這一輪剩下的致命幀：(timer + f) % cooldown 在 [start, end)，到下一輪開始 (== 1) 為止"""
+        f = np.arange(1, self.horizon + 1)
+        cycle_time = (timer + f) % cooldown
+        next_cycle = np.flatnonzero(cycle_time == 1)
+        if len(next_cycle):
+            f, cycle_time = f[:next_cycle[0]], cycle_time[:next_cycle[0]]
+        f = f[(cycle_time >= start) & (cycle_time < end)]
+        c0, c1 = _columns(left, right)
+        self._add(key, kind, self.now + f, np.full(len(f), c0), np.full(len(f), c1))
+
+    def _add_bullet(self, key, bullet):
+        rect = bullet.rect
+        # Rect 的 += 會四捨五入，每幀實際移動 floor(v + 0.5) 像素
+        dx, dy = int(np.floor(bullet.vx + 0.5)), int(np.floor(bullet.vy + 0.5))
+        f = np.arange(1, self.horizon + 1)
+        x = rect.x + dx * f
+        y = rect.y + dy * f
+        # Bullet.update 在完全離開畫面那一幀 kill
+        gone = np.flatnonzero((y > SCREEN_HEIGHT) | (y + rect.height < 0) | (x > SCREEN_WIDTH) | (x + rect.width < 0))
+        if len(gone):
+            f, x, y = f[:gone[0]], x[:gone[0]], y[:gone[0]]
+        low = y + rect.height > BAND_TOP
+        f, x = f[low], x[low]
+        self._add(key, BULLETS, self.now + f, np.maximum(x // COLUMN, 0),
+                  np.minimum(-(-(x + rect.width) // COLUMN), COLUMNS))
+
+    # --- 查詢 ---
+
+    def deadly(self, x, frame=1, kinds=ALL):
+        """x 所在的欄在 frame 幀後 (1..horizon) 是否致命"""
+        column = min(max(int(x) // COLUMN, 0), COLUMNS - 1)
+        row = (self.now + frame) % self.size
+        counts = self.counts
+        return any(counts[kind, row, column] for kind in kinds)
+
+    def _table(self, kinds):
+        """[f, c]：到第 f + 1 幀為止，前 c 欄中出過危險的欄數"""
+        table = self._tables.get(kinds)
+        if table is None:
+            rows = (self.now + 1 + np.arange(self.horizon)) % self.size
+            occupied = self.counts[list(kinds)][:, rows].any(axis=0)
+            ever = np.logical_or.accumulate(occupied, axis=0)
+            table = np.zeros((self.horizon, COLUMNS + 1), np.int32)
+            np.cumsum(ever, axis=1, out=table[:, 1:])
+            self._tables[kinds] = table
+        return table
+
+    def range_deadly(self, left, right, frames, kinds=ALL):
+        """像素範圍 [left, right) 在接下來 frames 幀內是否有任何一幀致命"""
+        c0, c1 = _columns(left, right)
+        row = self._table(kinds)[min(max(frames, 1), self.horizon) - 1]
+        return row[c1] > row[c0]
+
+    def range_deadly_many(self, lefts, rights, frames, kinds=ALL):
+        """range_deadly 的批次版：lefts/rights (與 frames) 為 numpy 陣列，回傳布林陣列"""
+        lefts = np.asarray(lefts, np.int64)
+        rights = np.asarray(rights, np.int64)
+        c0 = np.clip(lefts // COLUMN, 0, COLUMNS)
+        c1 = np.clip(-(-rights // COLUMN), 0, COLUMNS)
+        f = np.clip(np.asarray(frames, np.int64), 1, self.horizon) - 1
+        table = self._table(kinds)
+        return table[f, c1] > table[f, np.minimum(c0, c1)]
+
+    def nearest_safe(self, x, width, frames, kinds=ALL):
+        """以 x 為中心、寬 width 的範圍在 frames 幀內安全的最近中心 x；到處都危險時回傳 None"""
+        half = width / 2
+        if not self.range_deadly(x - half, x + half, frames, kinds):
+            return x
+        centers = np.arange(COLUMNS) * COLUMN + COLUMN // 2
+        safe = ~self.range_deadly_many(np.floor(centers - half), np.ceil(centers + half), frames, kinds)
+        safe &= (centers - half >= 0) & (centers + half <= SCREEN_WIDTH)
+        candidates = np.flatnonzero(safe)
+        if not len(candidates):
+            return None
+        return int(centers[candidates[np.argmin(np.abs(centers[candidates] - x))]])
@@ -0,0 +1,114 @@
+"""每幀記憶體配置追蹤 (--trace-alloc)
+
+用 tracemalloc 把配置量算到主迴圈的各個階段，搭配 FrameProfiler 使用：
+FrameProfiler.mark() 時呼叫 AllocationTracker.mark()。每個階段記錄
+
+*   allocated：階段內 tracemalloc 峰值比開始時多出的位元組，
+    也就是暫時配置的量 (Rect、文字 Surface 物件、tuple 等用完即丟的也算在內)
+*   net：階段結束時仍存活的增量 (新金幣/子彈、快取成長)
+*   blocks：sys.getallocatedblocks() 的淨變化，約等於多出來的物件數
+
+每 sample_every 幀對每個階段各拍一次快照，依原始碼行累計增量，
+報告時列出前 top 名的配置位置。注意 Surface 的像素記憶體由 SDL 配置，
+tracemalloc 只看得到 Python 物件本身。
+"""
+import os
+import re
+import sys
+import fnmatch
+import tracemalloc
+
+# 不追蹤量測工具自己 (tracemalloc 與它比對檔名用的 fnmatch/re、本模組、FrameProfiler) 與匯入機制
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, fnmatch.__file__),
+    tracemalloc.Filter(False, os.path.join(os.path.dirname(re.__file__), "*")),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiler.py")),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class AllocationTracker:
+    def __init__(self, top=10, sample_every=60, traceback_frames=1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(traceback_frames)
+        self.top = top
+        self.sample_every = sample_every
+        self.frame = 0
+        self.frames = 0                 # 這個報告週期的幀數
+        self.allocated = {}             # 階段 -> 累計位元組
+        self.net = {}
+        self.blocks = {}
+        self.sites = {}                 # (階段, 檔案:行) -> [位元組, 個數]
+        self.frame_allocated = []       # 每幀所有階段的配置量，給預算檢查用
+        self._frame_total = 0
+        self._snapshot = None
+        self._begin_phase()
+
+    def _begin_phase(self):
+        tracemalloc.reset_peak()
+        self._start_bytes = tracemalloc.get_traced_memory()[0]
+        self._start_blocks = sys.getallocatedblocks()
+
+    @property
+    def sampling(self):
+        return self.frame % self.sample_every == 0
+
+    def mark(self, phase):
+        current, peak = tracemalloc.get_traced_memory()
+        blocks = sys.getallocatedblocks()
+        allocated = peak - self._start_bytes
+        self.allocated[phase] = self.allocated.get(phase, 0) + allocated
+        self.net[phase] = self.net.get(phase, 0) + current - self._start_bytes
+        self.blocks[phase] = self.blocks.get(phase, 0) + blocks - self._start_blocks
+        self._frame_total += allocated
+        if self.sampling:
+            self._sample(phase)
+        self._begin_phase()
+
+    def _sample(self, phase):
+        snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+        if self._snapshot is not None:
+            for stat in snapshot.compare_to(self._snapshot, "lineno"):
+                if stat.size_diff <= 0:
+                    continue
+                frame = stat.traceback[0]
+                site = self.sites.setdefault((phase, f"{frame.filename}:{frame.lineno}"), [0, 0])
+                site[0] += stat.size_diff
+                site[1] += max(stat.count_diff, 0)
+        self._snapshot = snapshot
+
+    def end_frame(self):
+        self.frame_allocated.append(self._frame_total)
+        self._frame_total = 0
+        self.frame += 1
+        self.frames += 1
+        # 只比較同一幀內相鄰的階段；要取樣的幀先拍一張起點
+        self._snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS) if self.sampling else None
+        self._begin_phase()
+
+    def steady_state(self, skip=0):
+        """略過前 skip 幀 (暖機、快取建立) 後每幀的平均配置量"""
+        samples = self.frame_allocated[skip:]
+        return sum(samples) / len(samples) if samples else 0.0
+
+    def report_lines(self):
+        frames = self.frames or 1
+        lines = [f"  {'alloc/frame':<10} {'KiB':>8} {'net KiB':>8} {'blocks':>7}"]
+        for phase, total in self.allocated.items():
+            lines.append(f"  {phase:<10} {total / frames / 1024:>8.1f} {self.net[phase] / frames / 1024:>8.2f} "
+                         f"{self.blocks[phase] / frames:>7.1f}")
+        ranked = sorted(self.sites.items(), key=lambda item: -item[1][0])[:self.top]
+        if ranked:
+            lines.append(f"  top {len(ranked)} allocation sites (sampled every {self.sample_every} frames):")
+            for (phase, where), (size, count) in ranked:
+                lines.append(f"    {size / 1024:>8.1f} KiB {count:>6} blocks  [{phase}] {where}")
+        self.allocated.clear()
+        self.net.clear()
+        self.blocks.clear()
+        self.sites.clear()
+        self.frames = 0
+        return lines
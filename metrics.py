@@ -0,0 +1,181 @@
+"""即時指標 (--metrics)：Prometheus 文字格式的 HTTP 端點
+
+    python -m play --metrics                 # http://127.0.0.1:9464/metrics
+    python -m play --metrics 0.0.0.0:9100    # 明確指定才會聽其他介面
+
+GameMetrics 只由遊戲執行緒寫入：每幀 observe_frame(工作時間) 與 observe_game(game)
+把數值存成一般的 int/float 屬性與 list 元素 (約 2 µs，不配置物件)。MetricsServer
+在背景執行緒回應 GET /metrics，讀取這些值時不加鎖：單一屬性的讀寫在 CPython 是
+原子的，最多看到差一幀的直方圖與總和，對儀表板沒有影響。資源快取與音效的命中/
+略過次數本來就是各自的計數器，產生回應時直接讀取。
+
+每秒 tick 數不在這裡算：以抓取間隔算會被多個抓取端 (或手動 curl) 互相切碎，
+由抓取端對單調遞增的 sim_ticks_total 取 rate() 即可，例如
+rate(coin_game_sim_ticks_total[1m])。
+"""
+import gc
+import time
+import bisect
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+DEFAULT_ADDRESS = "127.0.0.1:9464"
+FRAME_BUCKETS = (0.001, 0.002, 0.004, 0.008, 0.012, 0.0167, 0.025, 0.0333, 0.05, 0.1)   # 秒
+PREFIX = "coin_game_"
+
+
+def parse_address(text):
+    """'PORT' 或 'HOST:PORT'，沒有 host 時只聽 loopback"""
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class GameMetrics:
+    def __init__(self):
+        self.frame_buckets = [0] * (len(FRAME_BUCKETS) + 1)     # 各區間 (非累積) 的幀數，最後一格是 +Inf
+        self.frame_sum = 0.0
+        self.frame_count = 0
+        self.ticks = 0
+        self.score = 0
+        self.penalty = 0
+        self.dead = 0
+        self.deaths = 0
+        self.coins = 0
+        self.bullets = 0
+        self.particles = 0
+        self.lasers_warning = 0
+        self.lasers_firing = 0
+        self.spikes_attacking = 0
+        self.enemies_active = 0
+        self.laser_shots = 0    # 雷射開始發射的次數
+        self.spike_attacks = 0
+        self.gc_collections = [0, 0, 0]
+        self.gc_seconds = [0.0, 0.0, 0.0]
+        self.game = None        # 快取與音效計數器的來源
+        self._gc_start = 0.0
+        gc.callbacks.append(self._gc_callback)
+
+    def _gc_callback(self, phase, info):
+        if phase == "start":
+            self._gc_start = time.perf_counter()
+        else:
+            generation = info["generation"]
+            self.gc_collections[generation] += 1
+            self.gc_seconds[generation] += time.perf_counter() - self._gc_start
+
+    def observe_frame(self, seconds):
+        self.frame_buckets[bisect.bisect_left(FRAME_BUCKETS, seconds)] += 1
+        self.frame_sum += seconds
+        self.frame_count += 1
+
+    def observe_game(self, game):
+        """每次 GameSession.step 之後呼叫"""
+        self.game = game
+        self.ticks += 1
+        self.score = game.score
+        self.penalty = int(game.is_in_penalty_mode)
+        if game.is_dead and not self.dead:
+            self.deaths += 1
+        self.dead = int(game.is_dead)
+        self.coins = len(game.coins)
+        self.bullets = len(game.bullets)
+        warning = firing = particles = 0
+        for lc in game.laser_cannons:
+            warning += lc.is_warning
+            firing += lc.is_firing
+            particles += len(lc.energy_particles)
+        if firing > self.lasers_firing:
+            self.laser_shots += firing - self.lasers_firing
+        self.lasers_warning, self.lasers_firing, self.particles = warning, firing, particles
+        attacking = int(game.ground_spikes.is_attacking)
+        if attacking and not self.spikes_attacking:
+            self.spike_attacks += 1
+        self.spikes_attacking = attacking
+        formation = game.formation
+        self.enemies_active = (len(formation.x) if formation.active else 0) if formation \
+            else int(game.aerial_enemy.active)
+
+    def close(self):
+        gc.callbacks.remove(self._gc_callback)
+
+    def render(self):
+        """Prometheus 文字格式 (0.0.4)"""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {PREFIX}{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{PREFIX}{name}{labels} {value}")
+
+        buckets = list(self.frame_buckets)
+        cumulative = 0
+        samples = []
+        for bound, count in zip(FRAME_BUCKETS + ("+Inf",), buckets):
+            cumulative += count
+            samples.append((f'_bucket{{le="{bound}"}}', cumulative))
+        samples += [("_sum", f"{self.frame_sum:.6f}"), ("_count", cumulative)]
+        metric("frame_work_seconds", "histogram", "Frame work time excluding the wait for the next frame.", samples)
+        metric("sim_ticks_total", "counter", "Simulation steps (steps per second: rate() on the scraper).",
+               [("", self.ticks)])
+        metric("score", "gauge", "Current credits.", [("", self.score)])
+        metric("penalty_mode", "gauge", "1 while penalty mode is active.", [("", self.penalty)])
+        metric("dead", "gauge", "1 while the death screen is shown.", [("", self.dead)])
+        metric("deaths_total", "counter", "Deaths.", [("", self.deaths)])
+        metric("coins", "gauge", "Live coins.", [("", self.coins)])
+        metric("bullets", "gauge", "Live bullets.", [("", self.bullets)])
+        metric("particles", "gauge", "Laser energy particles.", [("", self.particles)])
+        metric("hazards_active", "gauge", "Hazards currently in each phase.", [
+            ('{hazard="laser",phase="warning"}', self.lasers_warning),
+            ('{hazard="laser",phase="firing"}', self.lasers_firing),
+            ('{hazard="spikes",phase="attacking"}', self.spikes_attacking),
+            ('{hazard="enemy",phase="active"}', self.enemies_active)])
+        metric("hazard_attacks_total", "counter", "Laser shots and spike attacks.", [
+            ('{hazard="laser"}', self.laser_shots), ('{hazard="spikes"}', self.spike_attacks)])
+        metric("gc_collections_total", "counter", "Garbage collections per generation.",
+               [(f'{{generation="{g}"}}', count) for g, count in enumerate(list(self.gc_collections))])
+        metric("gc_pause_seconds_total", "counter", "Time spent in garbage collection per generation.",
+               [(f'{{generation="{g}"}}', f"{seconds:.6f}") for g, seconds in enumerate(list(self.gc_seconds))])
+        import engine
+        lookups = []
+        for cache, (hits, misses) in list(engine.resource_manager.cache_stats.items()):
+            lookups += [(f'{{cache="{cache}",result="hit"}}', hits), (f'{{cache="{cache}",result="miss"}}', misses)]
+        metric("cache_lookups_total", "counter", "Resource cache lookups (hit rate = hit / (hit + miss)).", lookups)
+        sound = self.game.sound if self.game else None
+        if sound and sound.enabled:
+            metric("sounds_total", "counter", "Sound effect requests by outcome.", [
+                ('{result="played"}', sound.played), ('{result="rate_limited"}', sound.dropped_rate),
+                ('{result="no_channel"}', sound.dropped_busy)])
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """在背景執行緒以 HTTP 提供 GameMetrics.render()"""
+
+    def __init__(self, metrics, address=DEFAULT_ADDRESS):
+        self.metrics = metrics
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = server.metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = HTTPServer(parse_address(address), Handler)
+        self.address = "%s:%d" % self.httpd.server_address[:2]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
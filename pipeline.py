@@ -0,0 +1,188 @@
+"""模擬與繪圖分開在兩條執行緒 (--pipeline)
+
+一般的主迴圈每幀依序做完自動駕駛、GameSession.step 與 draw，時間全部相加。管線模式下
+模擬執行緒推進第 N+1 個 tick 的同時，主執行緒畫第 N 個 tick 的快照：
+
+    主執行緒    sync ─ 事件 ─ advance ─ 畫快照 N ──────── flip ─ 等待 ─┐ sync ─ ...
+    模擬執行緒                 └ 自動駕駛 + step (N+1) + 拍快照 ──┘
+
+*   交接是雙緩衝：模擬執行緒把每個 tick 的快照寫進後緩衝，sync() 等它做完後前後交換，
+    主執行緒只畫前緩衝，模擬執行緒之後不會再改動它 (也就不需要鎖)
+*   快照 (snapshot) 是 GameSession 的淺拷貝，繪圖會讀的可變部分 (精靈的圖與位置、雷射的
+    粒子、敵人/編隊的位置、玩家與商店) 換成拷貝；draw()、draw_ui 與版本的 draw_overlay
+    直接用在快照上。HUD/商店/死亡畫面的快取圖層由前一張快照接手 (carry_caches)
+*   滑鼠、按鍵 (商店、閃現) 只在 sync() 之後、advance() 之前碰真正的 GameSession，
+    那時模擬執行緒是閒著的
+*   輸入到畫面多一幀延遲 (第 N 幀的輸入在第 N+1 幀才畫出來)
+
+pygame 的 blit、fill、transform 與 SDL 的 flip 執行時會釋放 GIL，這些時間模擬執行緒可以
+真的同時跑；其餘時間兩條執行緒輪流拿 GIL。被藏起來的時間這樣算 (FrameProfiler 的報告)：
+
+    模擬   = 模擬執行緒每個 tick 的 CPU 時間 (time.thread_time)
+    停頓   = 主執行緒每幀的工作時間 (不含等待下一幀) - 主執行緒自己的 CPU 時間
+             (在 sync 等模擬、等 GIL、或只有一個核心時 CPU 被模擬執行緒拿走)
+    藏起來 = 模擬 - 停頓
+
+只有一個 CPU 核心時，模擬只能藏在等待下一幀的空檔裡。比較：python bench.py pipeline
+"""
+import copy
+import time
+import threading
+
+SEAT_CACHES = ("hud_layer", "hud_key", "score_label", "danger_label")
+_STOP = object()
+
+
+class SpriteView:
+    """快照裡的精靈：只有繪圖需要的圖與位置"""
+    __slots__ = ("image", "rect")
+
+    def __init__(self, sprite):
+        self.image = sprite.image
+        self.rect = sprite.rect.copy()
+
+
+def _seats(game):
+    return getattr(game, "seats", None) or [game]
+
+
+def _player_view(player):
+    if player is None:
+        return None
+    view = copy.copy(player)    # 只讀，不要對它呼叫 kill()
+    view.rect = player.rect.copy()
+    view.shield_rect = player.shield_rect.copy()
+    return view
+
+
+def _seat_view(seat, view):
+    view.shop = copy.copy(seat.shop)
+    view.player = _player_view(seat.player)
+    return view
+
+
+def snapshot(game):
+    """game 目前這個 tick 的快照：之後模擬怎麼推進都不會改到它"""
+    view = copy.copy(game)
+    view.all_sprites = [SpriteView(sprite) for sprite in game.all_sprites]
+    view.coins = view.bullets = ()
+    lasers = []
+    for lc in game.laser_cannons:
+        laser = copy.copy(lc)
+        laser.energy_particles = [dict(p) for p in lc.energy_particles]
+        lasers.append(laser)
+    view.laser_cannons = lasers
+    view.ground_spikes = copy.copy(game.ground_spikes)
+    view.aerial_enemy = copy.copy(game.aerial_enemy)
+    view.aerial_enemy.rect = game.aerial_enemy.rect.copy()
+    if game.formation:
+        view.formation = copy.copy(game.formation)
+        view.formation.x = game.formation.x.copy()
+    if hasattr(game, "seats"):
+        view.seats = [_seat_view(seat, copy.copy(seat)) for seat in game.seats]
+        leader = view.seats[game.seats.index(game.leader)]
+        view.leader, view.player, view.shop = leader, leader.player, leader.shop
+    else:
+        _seat_view(game, view)
+    return view
+
+
+def carry_caches(previous, view):
+    """快照上的介面快取 (HUD、商店面板、死亡畫面、名牌) 交給下一張快照；內容變了時各自的 key 會讓它重畫"""
+    for old, new in zip(_seats(previous), _seats(view)):
+        for name in SEAT_CACHES:
+            setattr(new, name, getattr(old, name))
+        if new.high_scores is old.high_scores:  # 死亡時 on_death 換成新查詢的高分榜
+            new.death_layer = old.death_layer
+        new.shop.layer, new.shop.layer_key = old.shop.layer, old.shop.layer_key
+    if getattr(previous, "labels", None) is not None:
+        view.labels = previous.labels
+
+
+class Pipeline:
+    def __init__(self, game, simulate):
+        """simulate(controls) 在模擬執行緒推進 game 一個 tick (自動駕駛、step、指標)"""
+        self.game = game
+        self.simulate = simulate
+        self.front = snapshot(game)     # 主執行緒正在畫的
+        self.back = None                # 模擬執行緒下一個交出的
+        # 以下到報告後歸零
+        self.sim_seconds = 0.0          # 模擬執行緒的 CPU 時間
+        self.wait_seconds = 0.0         # 主執行緒在 sync() 等待的時間
+        self.stall_seconds = 0.0        # 主執行緒工作時間中沒有用到 CPU 的部分 (含 sync)
+        self.ticks = 0
+        self.frames = 0
+        self._main_cpu = time.thread_time()
+        self.error = None
+        self._controls = None
+        self._start = threading.Event()
+        self._done = threading.Event()
+        self._done.set()
+        self.thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            self._start.wait()
+            self._start.clear()
+            controls = self._controls
+            if controls is _STOP:
+                break
+            start = time.thread_time()
+            try:
+                self.simulate(controls)
+                self.back = snapshot(self.game)
+            except BaseException as error:
+                self.error = error
+            self.sim_seconds += time.thread_time() - start
+            self.ticks += 1
+            self._done.set()
+
+    def sync(self):
+        """等模擬執行緒做完上一個 tick 並交換緩衝區；回傳要畫的快照。之後到 advance() 之前可以改動 game"""
+        start = time.perf_counter()
+        self._done.wait()
+        self.wait_seconds += time.perf_counter() - start
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        if self.back is not None:
+            carry_caches(self.front, self.back)
+            self.front, self.back = self.back, None
+        return self.front
+
+    def advance(self, controls):
+        """在模擬執行緒開始下一個 tick"""
+        self._controls = controls
+        self._done.clear()
+        self._start.set()
+
+    def observe_frame(self, work):
+        """主執行緒每幀結束時呼叫 (FrameProfiler.end_frame)；work 為這幀的工作秒數"""
+        now = time.thread_time()
+        self.stall_seconds += max(0.0, work - (now - self._main_cpu))
+        self._main_cpu = now
+        self.frames += 1
+
+    def hidden(self):
+        """(每 tick 模擬毫秒, 每幀停頓毫秒, 每幀 sync 等待毫秒, 每幀藏起來的毫秒)"""
+        sim = self.sim_seconds / max(1, self.ticks) * 1000
+        frames = max(1, self.frames)
+        stall = self.stall_seconds / frames * 1000
+        return sim, stall, self.wait_seconds / frames * 1000, max(0.0, sim - stall)
+
+    def report_lines(self):
+        lines = []
+        if self.ticks and self.frames:
+            sim, stall, waited, hidden = self.hidden()
+            lines.append(f"  pipeline   sim {sim:.3f} ms/tick on the simulation thread, main stalled {stall:.3f} ms "
+                         f"(sync {waited:.3f}) -> {hidden:.3f} ms hidden ({hidden / sim * 100 if sim else 0:.0f}%)")
+        self.sim_seconds = self.wait_seconds = self.stall_seconds = 0.0
+        self.ticks = self.frames = 0
+        return lines
+
+    def close(self):
+        self._done.wait()
+        self._controls = _STOP
+        self._start.set()
+        self.thread.join()
@@ -0,0 +1,341 @@
+"""接金幣遊戲進入點
+
+    python -m play                      雷射特效美化版
+    python -m play --variant flash      閃現版 (variants.py)
+    python -m play --players 2          分割畫面雙人對戰 (versus.py)
+    python -m play --save               自動存檔，下次啟動時接續這一局 (savegame.py)
+    python -m play --headless --autopilot --warp --frames 36000 --seed 1
+
+棨竣gemini.py 與 test.py 只是分別以兩個版本呼叫 main()。重量級但選用的子系統
+(自動駕駛、錄影、共享記憶體輸出、記憶體追蹤、角色選擇畫面、模擬執行緒、存檔) 只在用到時才匯入/建立。
+從匯入本模組到第一個可操作的畫面 flip 的時間就是啟動時間，--profile 時輸出，
+超過 STARTUP_BUDGET_MS 時警告；python bench.py startup 以子行程量測。
+"""
+import time
+
+_START = time.perf_counter()
+
+import os
+import sys
+import random
+import argparse
+
+import variants
+
+STARTUP_BUDGET_MS = 500
+
+
+def _window_size(text):
+    return tuple(int(v) for v in text.lower().split("x"))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m play", description="接金幣遊戲")
+    parser.add_argument("--variant", choices=sorted(variants.VARIANTS), default="laser", help="遊戲版本")
+    parser.add_argument("--headless", action="store_true",
+                        help="不開視窗、不出聲，沒有 --autopilot 時自動駕駛；沒有錄影/輸出時也不繪圖")
+    parser.add_argument("--seed", type=int, default=None, help="亂數種子 (危險物、金幣、編隊、自動駕駛)")
+    parser.add_argument("--fps", type=int, default=60, help="目標幀率")
+    parser.add_argument("--warp", action="store_true", help="不限制幀率，模擬盡快推進 (搭配 --headless)")
+    parser.add_argument("--frames", type=int, default=None, metavar="N", help="N 幀後結束")
+    parser.add_argument("--telemetry", nargs="?", const="telemetry", default=None, metavar="DIR",
+                        help="記錄遊戲事件到 DIR (預設 telemetry/)")
+    parser.add_argument("--db", default="runs.db", help="高分榜與遊玩紀錄的 SQLite 檔案")
+    parser.add_argument("--autopilot", nargs="?", type=float, const=2.0, default=None, metavar="MS",
+                        help="由自動駕駛機器人操控，每幀思考 MS 毫秒 (預設 2)")
+    parser.add_argument("--rollouts", type=int, default=None, metavar="N",
+                        help="自動駕駛每幀固定推演 N 個方案、不看時間 (可重現)；有 --seed 時預設 40")
+    parser.add_argument("--no-sound", action="store_true", help="關閉音效")
+    parser.add_argument("--sound-buffer", type=int, default=None, metavar="SAMPLES",
+                        help="混音緩衝區大小 (預設 512)，越小延遲越低 (太小可能會有雜音)")
+    parser.add_argument("--players", type=int, choices=(1, 2), default=1,
+                        help="2：分割畫面雙人對戰，共用一個鍵盤 (A/D/W/X/F 與方向鍵/右 Ctrl)")
+    parser.add_argument("--save", nargs="?", const="savegame.bin", default=None, metavar="PATH",
+                        help="存檔 PATH (預設 savegame.bin)：啟動時有存檔就直接接續那一局，遊戲中自動存檔，結束時再存一次")
+    # 與 savegame.AUTOSAVE_SECONDS 相同 (解析參數時還不匯入 pygame)
+    parser.add_argument("--autosave", type=float, default=10, metavar="SECONDS", help="--save 的自動存檔間隔 (秒)")
+    parser.add_argument("--squadron", type=int, default=0, metavar="N",
+                        help="困難模式：N 架空中敵人組成的編隊 (需要 numpy)")
+    parser.add_argument("--profile", action="store_true", help="每兩秒在 stderr 輸出各階段的幀時間")
+    parser.add_argument("--gc", action="store_true",
+                        help="管理垃圾回收：載入後 gc.freeze()、調高自動門檻、在每幀的空檔回收年輕世代")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="模擬 (自動駕駛 + step) 在另一條執行緒推進下一個 tick，主執行緒同時畫上一個 tick 的快照")
+    parser.add_argument("--trace-alloc", nargs="?", type=int, const=10, default=None, metavar="N",
+                        help="用 tracemalloc 統計各階段每幀的記憶體配置並列出前 N 名 (較慢，隱含 --profile)")
+    # 等級數與 engine.QUALITY_LEVELS 相同 (解析參數時還不匯入 pygame)
+    parser.add_argument("--quality", type=int, choices=range(6), default=None,
+                        metavar="LEVEL", help="固定畫質等級 (0 最高)，預設依幀時間自動調整")
+    parser.add_argument("--window", type=_window_size, default=None,
+                        metavar="WxH", help="視窗大小，例如 1600x1200 (畫面等比例放大)")
+    parser.add_argument("--fullscreen", action="store_true", help="全螢幕 (桌面解析度)")
+    parser.add_argument("--render-scale", type=float, default=1.0, metavar="S",
+                        help="效能模式：世界圖層的內部解析度比例，例如 0.5")
+    parser.add_argument("--smooth", action="store_true", help="放大時用平滑縮放 (較慢)")
+    parser.add_argument("--export-shm", nargs="?", const="coin_game", default=None, metavar="NAME",
+                        help="每幀把畫面與狀態寫進名為 NAME 的共享記憶體 (python shmexport.py watch NAME 讀取)")
+    parser.add_argument("--metrics", nargs="?", const="127.0.0.1:9464", default=None, metavar="[HOST:]PORT",
+                        help="在背景執行緒以 Prometheus 文字格式提供 /metrics (預設只聽 127.0.0.1:9464)")
+    parser.add_argument("--capture", default=None, metavar="DIR", help="錄影到 DIR (背景執行緒編碼，跟不上時掉幀)")
+    parser.add_argument("--capture-format", choices=("png", "avi"), default="png",
+                        help="錄影格式：PNG 圖片序列或未壓縮 AVI")
+    args = parser.parse_args(argv)
+    if args.players > 1 and (args.headless or args.autopilot is not None or args.variant != "laser"):
+        parser.error("--players 2 needs the keyboard and the default variant (no --headless/--autopilot/--variant)")
+    if args.pipeline and (args.export_shm or args.trace_alloc is not None):
+        parser.error("--pipeline cannot be combined with --export-shm or --trace-alloc")
+    if args.headless:
+        args.no_sound = True
+        if args.autopilot is None:
+            args.autopilot = 2.0
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.headless:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    import pygame
+    import sound
+    import engine
+    import telemetry
+    from run_store import RunStore
+    from profiler import FrameProfiler
+    from quality import QualityGovernor
+    from display import Display
+    from engine import GameSession, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP, INPUT_SHIELD, INPUT_BLOCK
+
+    # --- 初始化 Pygame ---
+    if not args.no_sound:
+        sound.pre_init(args.sound_buffer or sound.BUFFER)
+    pygame.init()
+
+    # --- 遊戲設定 ---
+    variant = variants.VARIANTS[args.variant]()
+    display = Display(args.window, args.fullscreen, args.smooth, args.render_scale)
+    pygame.display.set_caption(variant.caption)
+    engine.init_display()
+
+    clock = pygame.time.Clock()
+    allocations = None
+    if args.trace_alloc is not None:
+        from memprofile import AllocationTracker
+        allocations = AllocationTracker(args.trace_alloc)
+    gc_monitor = gc_manager = None
+    if args.profile or args.gc:
+        from gcmode import GCMonitor, GCManager
+        gc_monitor = GCMonitor()
+        if args.gc:
+            gc_manager = GCManager(gc_monitor)
+    profiler = FrameProfiler(args.profile, allocations=allocations, gc=gc_monitor)
+    governor = QualityGovernor(args.fps, level=args.quality)
+    profiler.set_value("quality", governor.level)
+    recorder = telemetry.TelemetryRecorder(args.telemetry)
+    run_store = RunStore(args.db)
+
+    sounds = sound.SoundEngine(not args.no_sound)
+    versus = args.players > 1
+    if versus:
+        from versus import VersusSession
+        game = VersusSession(recorder, run_store, squadron=args.squadron, sound=sounds, seats=args.players)
+    else:
+        game = GameSession(recorder, run_store, squadron=args.squadron, sound=sounds)
+    variant.configure(game)
+    saver = None
+    resumed = False
+    if args.save:
+        import savegame
+        if os.path.exists(args.save):
+            try:
+                savegame.load(args.save, game, args.variant)
+                resumed = True
+            except ValueError as error:
+                print(f"save: {args.save} not resumed ({error})", file=sys.stderr)
+        saver = savegame.AutoSaver(args.save, args.autosave, args.variant)
+    bot = None
+    selector = None
+    characters = []     # 雙人時依序由每個玩家的角色選擇畫面選出
+    if args.autopilot is not None:
+        from autopilot import Autopilot
+        rollouts = args.rollouts
+        if rollouts is None and args.seed is not None:
+            from statehash import CHECK_ROLLOUTS
+            rollouts = CHECK_ROLLOUTS   # 時間預算會隨機器負載改變決策，同一個種子就不可重現
+        bot = Autopilot(args.autopilot, seed=args.seed, max_rollouts=rollouts)
+        if not resumed:
+            game.start("player")
+    elif not resumed:
+        selector = engine.CharacterSelector("Player 1: Choose Your Character") if versus else engine.CharacterSelector()
+    capture = None
+    if args.capture:
+        from capture import FrameCapture
+        capture = FrameCapture(args.capture, display.canvas.get_size(), args.capture_format, fps=args.fps)
+    exporter = None
+    if args.export_shm:
+        from shmexport import FrameExporter
+        exporter = FrameExporter(args.export_shm, display.canvas.get_size(), display.canvas.get_shifts())
+    metrics = metrics_server = None
+    if args.metrics:
+        from metrics import GameMetrics, MetricsServer
+        metrics = GameMetrics()
+        metrics_server = MetricsServer(metrics, args.metrics)
+        print(f"metrics: http://{metrics_server.address}/metrics", file=sys.stderr)
+    # 沒有視窗也沒有人要畫面時不繪圖
+    rendering = not args.headless or capture is not None or exporter is not None
+    frame_rate = 0 if args.warp else args.fps
+    frame_budget = 1.0 / args.fps
+    if gc_manager:
+        gc_manager.start()
+        profiler.mark("gc")
+
+    def simulate(controls):
+        """管線模式 (--pipeline) 在模擬執行緒推進一個 tick"""
+        if bot and not game.is_dead:
+            controls |= bot.decide(game)
+        game.step(controls)
+        if metrics:
+            metrics.observe_game(game)
+
+    # --- 主遊戲迴圈 ---
+    pipeline = None
+    running = True
+    frame = 0
+    startup_ms = None
+    while running:
+        if selector and selector.is_active:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                if event.type == pygame.VIDEORESIZE:
+                    display.resize()
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    selector.handle_click(display.to_logical(event.pos))
+            profiler.mark("events")
+            selector.draw(display.canvas)
+            profiler.mark("draw")
+            if not selector.is_active:
+                characters.append(selector.selected_base)
+                if len(characters) < args.players:
+                    selector = engine.CharacterSelector(f"Player {len(characters) + 1}: Choose Your Character")
+                else:
+                    game.start(characters if versus else characters[0])
+
+        else:
+            shown = game
+            if args.pipeline:
+                if pipeline is None:
+                    from pipeline import Pipeline
+                    pipeline = profiler.pipeline = Pipeline(game, simulate)
+                shown = pipeline.sync()     # 上一個 tick 的快照；模擬執行緒閒著，可以改動 game
+                profiler.mark("sync")
+            controls = 0
+            key_downs = []
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                if event.type == pygame.VIDEORESIZE:
+                    display.resize()
+                if not game.is_dead:
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_SPACE: controls |= INPUT_JUMP
+                        if event.key == pygame.K_x: controls |= INPUT_SHIELD
+                        key_downs.append(event.key)
+                        variant.handle_key(game, event.key, display.to_logical(pygame.mouse.get_pos()))
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        game.handle_click(display.to_logical(event.pos))
+
+            if versus:
+                controls = game.read_controls(key_downs, pygame.key.get_pressed())
+            elif not args.headless:
+                keys = pygame.key.get_pressed()
+                if keys[pygame.K_LEFT]: controls |= INPUT_LEFT
+                if keys[pygame.K_RIGHT]: controls |= INPUT_RIGHT
+                if keys[pygame.K_f]: controls |= INPUT_BLOCK
+            profiler.mark("events")
+            if saver:
+                saver.maybe_save(game)      # 兩個 tick 之間 (管線模式時模擬執行緒正閒著)
+                profiler.mark("save")
+            if pipeline:
+                pipeline.advance(controls)
+            else:
+                if bot and not game.is_dead:
+                    controls |= bot.decide(game)
+                    profiler.mark("autopilot")
+
+                game.step(controls)
+                if metrics:
+                    metrics.observe_game(game)
+                profiler.mark("update")
+            if rendering:
+                shown.draw(display.canvas, display.render_scale)
+                variant.draw_overlay(shown, display.canvas)
+                profiler.mark("draw")
+            if exporter:
+                exporter.publish(display.canvas, game)
+                profiler.mark("export")
+
+        if capture:
+            capture.capture(display.canvas)
+            profiler.mark("capture")
+            profiler.set_value("dropped", capture.dropped)
+        if rendering:
+            if display.scaled:
+                display.present()
+                profiler.mark("present")
+            pygame.display.flip()
+            profiler.mark("flip")
+        if startup_ms is None:
+            startup_ms = (time.perf_counter() - _START) * 1000
+            if args.profile or startup_ms > STARTUP_BUDGET_MS:
+                print(f"[startup] first frame after {startup_ms:.0f} ms (budget {STARTUP_BUDGET_MS} ms)",
+                      file=sys.stderr, flush=True)
+        if gc_manager:
+            gc_manager.idle(frame_budget - profiler.frame_work())
+            profiler.mark("gc")
+        clock.tick(frame_rate)
+        profiler.mark("wait")
+        work_ms = profiler.end_frame()
+        if metrics:
+            metrics.observe_frame(work_ms / 1000)
+        change = governor.observe(work_ms)
+        if change:
+            profiler.note(f"quality {change[0]} -> {change[1]} ({governor.describe()})")
+            profiler.set_value("quality", governor.level)
+        frame += 1
+        if args.frames is not None and frame >= args.frames:
+            running = False
+
+    if pipeline:
+        pipeline.close()
+    if saver:
+        saver.save(game)
+        saver.close()
+        if args.profile:
+            print(f"[profile] save: {saver.saves} saves ({saver.skipped} superseded), last {saver.size} bytes "
+                  f"encoded in {saver.encode_ms:.2f} ms", file=sys.stderr)
+    if args.profile and sounds.enabled:
+        print(f"[profile] sound: {sounds.stats()}", file=sys.stderr)
+    if capture:
+        print(f"capture: {capture.close()}", file=sys.stderr)
+    if exporter:
+        exporter.close()
+    if metrics_server:
+        metrics_server.close()
+        metrics.close()
+    if gc_manager:
+        gc_manager.stop()
+    if gc_monitor:
+        gc_monitor.close()
+    recorder.close()
+    run_store.close()
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""每幀分段計時 (--profile)
+
+主迴圈在每個階段結束時呼叫 mark("階段")，從上一次 mark 到現在的時間就算在
+那個階段；end_frame() 結束一幀並回傳本幀的工作時間 (不含等待下一幀的時間)。
+計時一直開著 (畫質調整需要幀時間)，只有 enabled 時才累計並每 report_every
+幀輸出一次各階段平均/最大毫秒數、FPS、附加狀態 (例如畫質等級) 與期間的事件。
+給了 memprofile.AllocationTracker 時同時輸出各階段的記憶體配置 (追蹤本身的
+時間不算進任何階段，但 tracemalloc 會讓整體變慢)；給了 gcmode.GCMonitor 時輸出
+期間每個世代的 GC 次數與暫停時間；設定了 pipeline (pipeline.Pipeline，--pipeline) 時輸出
+模擬執行緒的工作時間、主執行緒等它的時間，以及被繪圖藏起來的部分。
+"""
+import sys
+import time
+
+IDLE_PHASES = ("wait", "gc") # clock.tick 等待下一幀與利用空檔的 GC，不算工作時間
+
+
+class FrameProfiler:
+    def __init__(self, enabled=False, report_every=120, out=None, allocations=None, gc=None, pipeline=None):
+        self.enabled = enabled or allocations is not None
+        self.allocations = allocations
+        self.gc = gc
+        self.pipeline = pipeline    # 遊戲開始後才建立，主迴圈那時再設定
+        self.report_every = report_every
+        self.out = out or sys.stderr
+        self.frame = 0
+        self.work_ms = 0.0      # 上一幀的工作時間
+        self.values = {}        # 報告附帶的狀態，set_value 設定
+        self.notes = []         # 這個報告週期內發生的事件
+        self.totals = {}        # 階段 -> 累計秒數
+        self.maxima = {}        # 階段 -> 單幀最大秒數
+        self.work_total = 0.0
+        self.work_max = 0.0
+        self.work_frames = []   # 這個報告週期每幀的工作時間 (算百分位數)
+        self.window_frames = 0
+        self._frame_work = 0.0
+        self._last = time.perf_counter()
+        self._window_start = self._last
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self._last = now
+        if phase not in IDLE_PHASES:
+            self._frame_work += elapsed
+        if self.enabled:
+            self.totals[phase] = self.totals.get(phase, 0.0) + elapsed
+            if elapsed > self.maxima.get(phase, 0.0):
+                self.maxima[phase] = elapsed
+        if self.allocations:
+            self.allocations.mark(phase)
+            self._last = time.perf_counter()
+
+    def frame_work(self):
+        """本幀到目前為止的工作秒數"""
+        return self._frame_work + (time.perf_counter() - self._last)
+
+    def end_frame(self):
+        """結束一幀，回傳工作時間 (毫秒)"""
+        work = self._frame_work
+        self._frame_work = 0.0
+        self.work_ms = work * 1000
+        self.frame += 1
+        if self.allocations:
+            self.allocations.end_frame()
+            self._last = time.perf_counter()
+        if self.pipeline:
+            self.pipeline.observe_frame(work)
+        if self.enabled:
+            self.work_total += work
+            self.work_max = max(self.work_max, work)
+            self.work_frames.append(work)
+            self.window_frames += 1
+            if self.window_frames >= self.report_every:
+                self.report()
+        return self.work_ms
+
+    def set_value(self, key, value):
+        self.values[key] = value
+
+    def note(self, text):
+        if self.enabled:
+            self.notes.append(f"frame {self.frame}: {text}")
+
+    def report(self):
+        frames = self.window_frames
+        if not frames:
+            return
+        elapsed = self._last - self._window_start
+        status = "  ".join(f"{key} {value}" for key, value in self.values.items())
+        work = sorted(self.work_frames)
+        lines = [f"[profile] {frames} frames  fps {frames / elapsed:.1f}  "
+                 f"work {self.work_total / frames * 1000:.2f} ms (p50 {work[frames // 2] * 1000:.2f} "
+                 f"p99 {work[frames * 99 // 100] * 1000:.2f} max {self.work_max * 1000:.2f})  {status}"]
+        for phase, total in self.totals.items():
+            lines.append(f"  {phase:<10} {total / frames * 1000:>7.3f} ms  (max {self.maxima[phase] * 1000:.2f})")
+        if self.allocations:
+            lines.extend(self.allocations.report_lines())
+        if self.gc:
+            lines.extend(self.gc.report_lines())
+        if self.pipeline:
+            lines.extend(self.pipeline.report_lines())
+        lines.extend("  " + note for note in self.notes)
+        print("\n".join(lines), file=self.out, flush=True)
+
+        self.totals.clear()
+        self.maxima.clear()
+        self.notes.clear()
+        self.work_total = self.work_max = 0.0
+        self.work_frames.clear()
+        self.window_frames = 0
+        self._window_start = self._last
@@ -0,0 +1,67 @@
+"""自動畫質調整
+
+QualityGovernor 看最近 window 幀的平均工作時間：接近一幀的預算時往下降一級
+(engine.QUALITY_LEVELS：光暈層數 -> 粒子上限 -> 裝飾火花 -> 內部解析度)，
+餘裕夠大時升回一級。升級後很快又被迫降級表示那一級撐不住，下次要等更久才再試。
+命令列固定等級時 (level 不是 None) 不會自動調整。
+"""
+import collections
+
+import engine
+
+DEGRADE_RATIO = 0.85    # 平均工作時間超過預算的這個比例就降級
+RESTORE_RATIO = 0.5     # 低於這個比例才升級
+RESTORE_HOLD = 4        # 升級前至少要觀察 window 的幾倍幀數
+MAX_RESTORE_HOLD = 64
+
+
+class QualityGovernor:
+    def __init__(self, target_fps=60, window=60, level=None):
+        self.budget_ms = 1000.0 / target_fps
+        self.window = window
+        self.samples = collections.deque(maxlen=window)
+        self.total = 0.0
+        self.forced = level is not None
+        self.level = level or 0
+        self.max_level = len(engine.QUALITY_LEVELS) - 1
+        self.restore_hold = RESTORE_HOLD
+        self.since_change = 0
+        self.last_change = None
+        engine.set_quality_level(self.level)
+
+    def observe(self, work_ms):
+        """餵入一幀的工作時間 (毫秒)，等級改變時回傳 (舊等級, 新等級)"""
+        if self.forced:
+            return None
+        if len(self.samples) == self.window:
+            self.total -= self.samples[0]
+        self.samples.append(work_ms)
+        self.total += work_ms
+        self.since_change += 1
+        if len(self.samples) < self.window:
+            return None
+
+        average = self.total / self.window
+        if average > self.budget_ms * DEGRADE_RATIO and self.level < self.max_level:
+            # 剛升級就撐不住：下次升級前等更久
+            if self.last_change == "up" and self.since_change < self.window * self.restore_hold * 2:
+                self.restore_hold = min(self.restore_hold * 2, MAX_RESTORE_HOLD)
+            return self._set(self.level + 1, "down")
+        if average < self.budget_ms * RESTORE_RATIO and self.level > 0 and \
+                self.since_change >= self.window * self.restore_hold:
+            return self._set(self.level - 1, "up")
+        return None
+
+    def _set(self, level, direction):
+        old, self.level = self.level, level
+        engine.set_quality_level(level)
+        self.samples.clear()
+        self.total = 0.0
+        self.since_change = 0
+        self.last_change = direction
+        return old, level
+
+    def describe(self):
+        q = engine.quality
+        return (f"glow {q.glow_layers}, particles {q.max_particles}, "
+                f"sparks {'on' if q.sparks else 'off'}, scale {q.render_scale}")
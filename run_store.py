@@ -0,0 +1,178 @@
+"""SQLite 高分榜與遊玩紀錄
+
+每一局結束 (死亡) 時呼叫 record_run()，資料只會丟進佇列，
+由背景執行緒以 WAL 模式、批次交易寫入，遊戲迴圈不會碰到磁碟。
+死亡畫面的前五名 (leaders()) 在啟動時查一次，之後每一局在 record_run() 時直接併進記憶體裡
+那份 (排序後只留前五)，不必等背景寫入，剛結束的這一局也一定在榜上。
+寫入失敗 (資料庫鎖住、磁碟滿、不合法的資料) 時逐筆重寫，寫不進去的紀錄丟棄並在 stderr 警告，
+寫入執行緒繼續 (close() 不會卡住)。
+
+基準測試：python run_store.py bench
+"""
+import os
+import sys
+import time
+import queue
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    character TEXT NOT NULL,
+    final_credits INTEGER NOT NULL,
+    peak_credits INTEGER NOT NULL,
+    survival_frames INTEGER NOT NULL,
+    death_cause TEXT NOT NULL,
+    items TEXT NOT NULL,
+    ended_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_peak ON runs (peak_credits DESC);
+CREATE INDEX IF NOT EXISTS runs_by_character ON runs (character, peak_credits DESC);
+"""
+
+LEADERS = 5   # 死亡畫面高分榜的名次數
+
+INSERT = ("INSERT INTO runs (character, final_credits, peak_credits, survival_frames, "
+          "death_cause, items, ended_at) VALUES (?, ?, ?, ?, ?, ?, ?)")
+
+
+def _connect(path, check_same_thread=True):
+    conn = sqlite3.connect(path, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class RunStore:
+    """遊玩紀錄儲存：寫入在背景執行緒批次完成，查詢走獨立的唯讀連線"""
+
+    def __init__(self, path="runs.db", batch_size=64):
+        self.path = path
+        self.batch_size = batch_size
+        conn = _connect(path)
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="run-store-writer", daemon=True)
+        self._writer.start()
+        # 讀取連線同一時間只有一條執行緒使用 (--pipeline 時是模擬執行緒，與主執行緒輪流)；
+        # WAL 模式下讀不會被背景寫入擋住
+        self._reader = _connect(path, check_same_thread=False)
+        # 重複使用同一個游標：Connection.execute 每次建立新游標，連線對每個游標留一個
+        # weakref，要累積到 200 個才清理 (soak.py 在長時間測試中抓到的緩慢成長)
+        self._cursor = self._reader.cursor()
+        self._leaders = self.top_runs(LEADERS)
+
+    def record_run(self, character, final_credits, peak_credits, survival_frames, death_cause, items):
+        """記錄一局 (不等待寫入)，items 為購買過的商品類型列表"""
+        self._queue.put((character, final_credits, peak_credits, survival_frames,
+                         death_cause, ",".join(items), time.time()))
+        leaders = self._leaders + [(character, peak_credits, final_credits, survival_frames, death_cause)]
+        leaders.sort(key=lambda row: row[1], reverse=True)
+        self._leaders = leaders[:LEADERS]
+
+    def leaders(self):
+        """死亡畫面的前 LEADERS 名 (記憶體裡的那份，不查資料庫)，格式同 top_runs"""
+        return list(self._leaders)
+
+    def top_runs(self, limit=5, character=None):
+        """回傳 [(character, peak_credits, final_credits, survival_frames, death_cause), ...]"""
+        if character is None:
+            sql = ("SELECT character, peak_credits, final_credits, survival_frames, death_cause "
+                   "FROM runs ORDER BY peak_credits DESC LIMIT ?")
+            return self._cursor.execute(sql, (limit,)).fetchall()
+        sql = ("SELECT character, peak_credits, final_credits, survival_frames, death_cause "
+               "FROM runs WHERE character = ? ORDER BY peak_credits DESC LIMIT ?")
+        return self._cursor.execute(sql, (character, limit)).fetchall()
+
+    def close(self):
+        """送出剩餘紀錄並等待寫入完成"""
+        self._queue.put(None)
+        self._writer.join()
+        self._cursor.close()
+        self._reader.close()
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        cursor = conn.cursor()
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            # 把佇列裡已經排隊的紀錄一起放進同一個交易
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            taken = len(batch)
+            if None in batch:
+                running = False
+                batch = [row for row in batch if row is not None]
+            try:
+                self._write_batch(conn, cursor, batch)
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+        conn.close()
+
+    @staticmethod
+    def _write_batch(conn, cursor, batch):
+        if not batch:
+            return
+        try:
+            with conn:
+                cursor.executemany(INSERT, batch)
+            return
+        except sqlite3.Error:
+            pass
+        # 整批失敗時逐筆重寫，只丟掉寫不進去的那幾筆
+        for row in batch:
+            try:
+                with conn:
+                    cursor.execute(INSERT, row)
+            except sqlite3.Error as error:
+                print(f"run_store: run not written ({error})", file=sys.stderr)
+
+
+def bench(path="bench_runs.db", runs=100_000):
+    import random
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    store = RunStore(path, batch_size=1000)
+    causes = ["laser", "spike", "bullet", "bankrupt"]
+    start = time.perf_counter()
+    for _ in range(runs):
+        peak = random.randint(0, 20000)
+        store.record_run(random.choice(["player", "player2"]), peak - random.randint(0, 500), peak,
+                         random.randint(60, 60 * 600), random.choice(causes), ["speed"])
+    enqueue = time.perf_counter() - start
+    store.close()
+    write = time.perf_counter() - start
+
+    store = RunStore(path)
+    start = time.perf_counter()
+    for _ in range(100):
+        store.top_runs(10)
+    top = (time.perf_counter() - start) / 100
+    start = time.perf_counter()
+    for _ in range(100):
+        store.top_runs(10, "player2")
+    per_char = (time.perf_counter() - start) / 100
+    store.close()
+
+    print(f"{runs} runs: enqueue {enqueue * 1e6 / runs:.2f} us/run, total write {write:.2f} s")
+    print(f"top 10: {top * 1000:.3f} ms   top 10 per character: {per_char * 1000:.3f} ms   (frame = 16.7 ms)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench()
+    else:
+        store = RunStore(sys.argv[1] if len(sys.argv) > 1 else "runs.db")
+        for row in store.top_runs(10):
+            print(*row)
+        store.close()
@@ -0,0 +1,359 @@
+"""進行中一局的存檔與接續 (--save)
+
+程式結束 (或當掉) 時一局的狀態不會全部消失：AutoSaver 每隔幾秒把整局狀態打包成
+struct 的二進位存檔 (不用 pickle)，下次以同一個 --save 啟動時直接接續，不經過角色選擇。
+
+*   打包 (encode) 在主執行緒、兩個 tick 之間做，讀到的是一致的狀態；寫檔 (暫存檔、fsync、
+    os.replace 換上) 在背景執行緒，寫入跟不上時只寫最新的一份
+*   接續後的模擬與沒中斷時逐位元相同：實體依原本的順序重建，最後才還原 random 的狀態
+    (建立 Coin 本身會抽亂數)；statehash.state_hashes 在存檔前後一致
+
+檔案格式 (little-endian)：
+    檔頭   MAGIC(4s) 版本(H) pad(2) 內容長度(I) 內容的 CRC32(I) 存檔時間(d)
+    內容   版本名稱 (字串)、WORLD、每個座位 (SEAT、角色、購買項目、SHOP、PLAYER)、
+           每座雷射 (LASER + 粒子)、SPIKES、ENEMY、編隊 (FORMATION + numpy 陣列)、
+           金幣 (數量 + int16 x/y/hit x/hit y/樣式)、子彈 (數量 + int16 x/y/子彈池 + float64 vx/vy)、
+           random 的狀態 (RNG)
+    字串 = 長度(H) + UTF-8；陣列不另存長度，由前面的數量決定。金幣與子彈離開畫面就被移除，
+    座標用 int16 就夠；子彈速度要逐位元相同，用 float64
+
+版本號 (VERSION) 在格式改變時加一，讀到其他版本的存檔時不接續。
+
+基準測試：python bench.py savegame
+"""
+import os
+import sys
+import time
+import zlib
+import array
+import queue
+import random
+import struct
+import threading
+
+import numpy as np
+import pygame
+
+from engine import Player, Coin, Bullet
+
+MAGIC = b"CGSV"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxIId")
+TEXT = struct.Struct("<H")
+COUNT = struct.Struct("<I")
+
+WORLD = struct.Struct("<IBB?")                # coin_counter, 座位數, 雷射數, 有沒有編隊
+SEAT = struct.Struct("<iiiiIB???")            # 分數, 最高分, 懲罰計時, 死亡計時, 本局幀數, 死因, 懲罰中, 已過懲罰, 死亡
+SHOP = struct.Struct("<???H?")                # 開著, 雙倍分數, 格擋技能, 護盾數, 閃現
+PLAYER = struct.Struct("<?4i4i2idii?B?i?i")   # 在場上, rect, hit_rect, 護盾位置, 垂直速度, 速度, 跳躍力,
+                                              # 跳躍中, 等級, 護盾中, 護盾計時, 格擋中, 閃現冷卻
+LASER = struct.Struct("<?ii??H")              # 解鎖, 計時, x, 預警, 發射, 粒子數
+SPIKES = struct.Struct("<?iii??")             # 解鎖, 計時, x, 動畫幀, 預警, 攻擊
+ENEMY = struct.Struct("<?iiii")               # 出現, x, y, 方向, 計時
+FORMATION = struct.Struct("<Iiq?")            # 架數, 幀, 下一次開火的幀, 出現
+RNG = struct.Struct("<i625I?d")               # random.getstate()：版本, 內部狀態, 有沒有暫存的 gauss 值
+
+COIN_FIELDS = 5     # x, y, hit x, hit y, 樣式
+BULLET_INTS = 3     # x, y, 是否屬於子彈池
+BULLET_FLOATS = 2   # vx, vy
+
+AUTOSAVE_SECONDS = 10
+
+
+def _seats(game):
+    return getattr(game, "seats", None) or [game]
+
+
+def started(game):
+    """選完角色開始玩了 (角色選擇畫面時沒有東西可存)"""
+    return all(seat.player is not None for seat in _seats(game))
+
+
+class _Writer:
+    def __init__(self):
+        self.parts = []
+
+    def pack(self, fmt, *values):
+        self.parts.append(fmt.pack(*values))
+
+    def text(self, value):
+        data = value.encode()
+        self.parts += [TEXT.pack(len(data)), data]
+
+    def array(self, typecode, values):
+        data = array.array(typecode, values)
+        if sys.byteorder == "big":
+            data.byteswap()
+        self.parts.append(data.tobytes())
+
+    def numpy(self, dtype, values):
+        self.parts.append(np.asarray(values, dtype).tobytes())
+
+
+class _Reader:
+    def __init__(self, data):
+        self.view = memoryview(data)
+        self.offset = 0
+
+    def take(self, size):
+        if self.offset + size > len(self.view):
+            raise ValueError("存檔內容不完整")
+        chunk = self.view[self.offset:self.offset + size]
+        self.offset += size
+        return chunk
+
+    def unpack(self, fmt):
+        return fmt.unpack(self.take(fmt.size))
+
+    def text(self):
+        size, = self.unpack(TEXT)
+        return bytes(self.take(size)).decode()
+
+    def array(self, typecode, count):
+        data = array.array(typecode)
+        data.frombytes(self.take(count * data.itemsize))
+        if sys.byteorder == "big":
+            data.byteswap()
+        return data
+
+    def numpy(self, dtype, count):
+        dtype = np.dtype(dtype)
+        return np.frombuffer(self.take(count * dtype.itemsize), dtype).copy()
+
+
+# --- 打包 ---
+
+def encode(game, variant="laser"):
+    """整局狀態 -> 存檔內容 (含檔頭)"""
+    out = _Writer()
+    out.text(variant)
+    seats = _seats(game)
+    out.pack(WORLD, game.coin_counter, len(seats), len(game.laser_cannons), game.formation is not None)
+    for seat in seats:
+        _encode_seat(out, seat)
+    for lc in game.laser_cannons:
+        particles = lc.energy_particles
+        out.pack(LASER, lc.active, lc.timer, lc.x, lc.is_warning, lc.is_firing, len(particles))
+        out.array("i", [v for p in particles for v in (p['x'], p['y'])])
+        out.array("d", [p['life'] for p in particles])
+    spikes = game.ground_spikes
+    out.pack(SPIKES, spikes.active, spikes.timer, spikes.x, spikes.anim_frame, spikes.is_warning, spikes.is_attacking)
+    enemy = game.aerial_enemy
+    out.pack(ENEMY, enemy.active, enemy.rect.x, enemy.rect.y, enemy.direction, enemy.timer)
+    formation = game.formation
+    if formation:
+        out.pack(FORMATION, formation.count, formation.frame, formation.next_fire, formation.active)
+        for dtype, values in (("<f8", formation.speed), ("<i8", formation.cooldown), ("<i8", formation.start_timer),
+                              ("<f8", formation.x), ("<f8", formation.velocity), ("<i8", formation.fire_at)):
+            out.numpy(dtype, values)
+
+    coins = game.coins.sprites()
+    out.pack(COUNT, len(coins))
+    out.array("h", [v for c in coins for v in (c.rect.x, c.rect.y, c.hit_rect.x, c.hit_rect.y, c.style)])
+    bullets = game.bullets.sprites()
+    out.pack(COUNT, len(bullets))
+    out.array("h", [v for b in bullets for v in (b.rect.x, b.rect.y, b.pool is not None)])
+    out.array("d", [v for b in bullets for v in (b.vx, b.vy)])
+
+    version, state, gauss = random.getstate()
+    out.pack(RNG, version, *state, gauss is not None, gauss or 0.0)
+
+    payload = b"".join(out.parts)
+    return HEADER.pack(MAGIC, VERSION, len(payload), zlib.crc32(payload), time.time()) + payload
+
+
+def _encode_seat(out, seat):
+    out.pack(SEAT, seat.score, seat.peak_score, seat.penalty_timer, seat.death_timer, seat.run_frames,
+             seat.death_cause, seat.is_in_penalty_mode, seat.has_cleared_penalty, seat.is_dead)
+    out.text(seat.character)
+    out.text(",".join(seat.run_items))
+    shop = seat.shop
+    out.pack(SHOP, shop.is_open, shop.double_score_active, shop.has_block_skill, shop.shield_count,
+             shop.has_flash_step)
+    p = seat.player
+    out.pack(PLAYER, p.alive(), *p.rect, *p.hit_rect, *p.shield_rect.topleft, p.velocity_y, p.speed,
+             p.jump_strength, p.is_jumping, p.level, p.shield_active, p.shield_timer, p.is_blocking, p.flash_timer)
+
+
+# --- 接續 ---
+
+def decode(data, game, variant="laser"):
+    """把存檔內容套進剛建立 (variant.configure 過、還沒 start) 的 game；格式不符時 ValueError 且 game 不變"""
+    if len(data) < HEADER.size:
+        raise ValueError("不是存檔")
+    magic, version, size, crc, _ = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("不是存檔")
+    if version != VERSION:
+        raise ValueError(f"存檔格式版本 {version} 不是目前的 {VERSION}")
+    payload = memoryview(data)[HEADER.size:]
+    if len(payload) != size or zlib.crc32(payload) != crc:
+        raise ValueError("存檔損毀 (長度或 CRC 不符)")
+
+    src = _Reader(payload)
+    saved_variant = src.text()
+    if saved_variant != variant:
+        raise ValueError(f"存檔是 {saved_variant} 版本的一局")
+    coin_counter, seat_count, laser_count, has_formation = src.unpack(WORLD)
+    seats = _seats(game)
+    if seat_count != len(seats):
+        raise ValueError(f"存檔是 {seat_count} 人的一局")
+    if laser_count != len(game.laser_cannons):
+        raise ValueError("存檔的雷射數量不符")
+
+    # 檢查完才開始改動 game
+    for sprite in game.all_sprites:
+        sprite.kill()
+    game.coin_counter = coin_counter
+    for seat in seats:
+        _decode_seat(src, seat, game)
+    for lc in game.laser_cannons:
+        lc.active, lc.timer, lc.x, lc.is_warning, lc.is_firing, count = src.unpack(LASER)
+        xy = src.array("i", count * 2)
+        life = src.array("d", count)
+        lc.energy_particles = [{'x': xy[i * 2], 'y': xy[i * 2 + 1], 'life': life[i]} for i in range(count)]
+    spikes = game.ground_spikes
+    spikes.active, spikes.timer, spikes.x, spikes.anim_frame, spikes.is_warning, spikes.is_attacking = \
+        src.unpack(SPIKES)
+    enemy = game.aerial_enemy
+    enemy.active, enemy.rect.x, enemy.rect.y, enemy.direction, enemy.timer = src.unpack(ENEMY)
+    if has_formation:
+        count, frame, next_fire, active = src.unpack(FORMATION)
+        formation = game.formation
+        if formation is None or formation.count != count:
+            from formation import EnemyFormation
+            formation = game.formation = EnemyFormation(count)
+        formation.speed = src.numpy("<f8", count)
+        formation.cooldown = src.numpy("<i8", count)
+        formation.start_timer = src.numpy("<i8", count)
+        formation.x = src.numpy("<f8", count)
+        formation.velocity = src.numpy("<f8", count)
+        formation.fire_at = src.numpy("<i8", count)
+        formation.frame, formation.next_fire, formation.active = frame, next_fire, active
+    else:
+        game.formation = None
+
+    count, = src.unpack(COUNT)
+    values = src.array("h", count * COIN_FIELDS)
+    for i in range(0, len(values), COIN_FIELDS):
+        x, y, hit_x, hit_y, style = values[i:i + COIN_FIELDS]
+        coin = Coin(style)
+        coin.rect.topleft = (x, y)
+        coin.hit_rect.topleft = (hit_x, hit_y)
+        game.all_sprites.add(coin)
+        game.coins.add(coin)
+    count, = src.unpack(COUNT)
+    ints = src.array("h", count * BULLET_INTS)
+    floats = src.array("d", count * BULLET_FLOATS)
+    for i in range(count):
+        x, y, pooled = ints[i * BULLET_INTS:(i + 1) * BULLET_INTS]
+        vx, vy = floats[i * BULLET_FLOATS:(i + 1) * BULLET_FLOATS]
+        if pooled:
+            bullet = game.bullet_pool.fire(0, 0, vx, vy)
+        else:
+            bullet = Bullet(0, 0, 1, 0)
+            bullet.vx, bullet.vy = vx, vy
+            game.bullets.add(bullet)
+            game.all_sprites.add(bullet)
+        bullet.rect.topleft = (x, y)
+
+    # 最後才還原亂數：上面建立 Coin 時會抽亂數
+    version, *state, has_gauss, gauss = src.unpack(RNG)
+    random.setstate((version, tuple(state), gauss if has_gauss else None))
+    if hasattr(game, "follow_leader"):
+        game.follow_leader()
+
+
+def _decode_seat(src, seat, game):
+    (seat.score, seat.peak_score, seat.penalty_timer, seat.death_timer, seat.run_frames, seat.death_cause,
+     seat.is_in_penalty_mode, seat.has_cleared_penalty, seat.is_dead) = src.unpack(SEAT)
+    seat.character = src.text()
+    items = src.text()
+    seat.run_items = items.split(",") if items else []
+    shop = seat.shop
+    shop.is_open, shop.double_score_active, shop.has_block_skill, shop.shield_count, shop.has_flash_step = \
+        src.unpack(SHOP)
+
+    in_world, *values = src.unpack(PLAYER)
+    p = seat.player = Player(seat, seat.character)
+    (p.velocity_y, p.speed, p.jump_strength, p.is_jumping, p.level, p.shield_active, p.shield_timer,
+     p.is_blocking, p.flash_timer) = values[10:]
+    p.load_player_images()  # 依等級與懲罰狀態
+    p.image = p.jump_img if p.is_jumping else p.idle_img
+    p.rect = pygame.Rect(values[0:4])
+    p.hit_rect = pygame.Rect(values[4:8])
+    p.shield_rect.topleft = values[8:10]
+    if in_world:
+        game.all_sprites.add(p)
+    if seat.is_dead and seat.run_store:
+        seat.high_scores = seat.run_store.leaders()   # 死亡畫面的高分榜 (on_death 時取的那份沒有存)
+
+
+def save(game, path, variant="laser"):
+    """同步存檔 (先寫暫存檔再換上，寫到一半當掉也不會壞掉舊的存檔)"""
+    _write(path, encode(game, variant))
+
+
+def load(path, game, variant="laser"):
+    with open(path, "rb") as f:
+        decode(f.read(), game, variant)
+
+
+def _write(path, data):
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+class AutoSaver:
+    """每 interval 秒在呼叫端 (主執行緒) 打包一次，寫檔交給背景執行緒"""
+
+    def __init__(self, path, interval=AUTOSAVE_SECONDS, variant="laser"):
+        self.path = path
+        self.interval = interval
+        self.variant = variant
+        self.saves = 0              # 已交給寫入執行緒的存檔數
+        self.skipped = 0            # 寫入跟不上、被較新的一份取代的存檔數
+        self.encode_ms = 0.0        # 最近一次打包的時間 (主執行緒的成本)
+        self.size = 0               # 最近一次的存檔大小
+        self._due = time.monotonic() + interval
+        self._pending = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="save-writer", daemon=True)
+        self._writer.start()
+
+    def maybe_save(self, game):
+        """每幀呼叫；時間到了才存"""
+        if time.monotonic() >= self._due:
+            self.save(game)
+
+    def save(self, game):
+        """立刻打包並交給寫入執行緒 (不等待寫入完成)"""
+        self._due = time.monotonic() + self.interval
+        if not started(game):
+            return
+        start = time.perf_counter()
+        data = encode(game, self.variant)
+        self.encode_ms = (time.perf_counter() - start) * 1000
+        self.size = len(data)
+        self.saves += 1
+        self._pending.put(data)
+
+    def close(self):
+        """等待剩下的存檔寫完"""
+        self._pending.put(None)
+        self._writer.join()
+
+    def _write_loop(self):
+        while True:
+            jobs = [self._pending.get()]
+            while not self._pending.empty():
+                jobs.append(self._pending.get_nowait())
+            data = [job for job in jobs if job is not None]
+            if data:
+                self.skipped += len(data) - 1
+                _write(self.path, data[-1])
+            if None in jobs:
+                break
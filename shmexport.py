@@ -0,0 +1,237 @@
+"""畫面與狀態的共享記憶體輸出 (--export-shm)
+
+分析工具與機器人跑在別的 Python 行程時，用 pipe 傳 pickle 過的畫面比模擬一幀還貴。
+FrameExporter 每幀把 800x600 的畫面 (直接從 Surface.get_view("2") 複製) 與打包好的
+狀態紀錄寫進 multiprocessing.shared_memory 的雙緩衝區，讀取端 map 同一塊記憶體，
+不用複製也不用鎖。
+
+記憶體配置 (little-endian)：
+    檔頭   MAGIC(4s) 版本(H) pad(2) seq(Q) 寬(I) 高(I) R/G/B shift(3B) pad(1) 每格大小(I)
+    兩格   begin(Q) end(Q) 狀態 STATE(struct) 金幣 (MAX_COINS, 3) int32 子彈 (MAX_BULLETS, 4) float32
+          像素 (高, 寬) uint32，第 seq % 2 格是第 seq 幀
+
+寫入端 (序列鎖)：先寫 begin = seq，寫資料，再寫 end = seq，最後更新檔頭的 seq。
+讀取端取檔頭 seq，用第 seq % 2 格，確認 begin == end == seq；用完資料後 begin 仍是
+seq 就表示讀到的是完整的一幀 (寫入端要再寫兩幀才會覆寫同一格)。
+
+讀取範例：
+    python shmexport.py watch coin_game
+"""
+import sys
+import time
+import struct
+
+import numpy as np
+from multiprocessing import shared_memory
+
+MAGIC = b"CGSM"
+VERSION = 1
+HEADER = struct.Struct("<4sH2xQIIBBBxI")
+SEQ = struct.Struct("<Q")
+SEQ_OFFSET = 8
+SLOT_SEQ = struct.Struct("<QQ")     # begin, end
+MAX_COINS = 256
+MAX_BULLETS = 128
+
+# 狀態紀錄：幀號、玩家 rect 與垂直速度、分數、計時、旗標、雷射 x2 與尖刺的 (x, 計時, 階段)、金幣/子彈數
+STATE = struct.Struct("<Q4id4iB3x6i3iHH")
+STATE_FIELDS = ("frame", "x", "y", "width", "height", "velocity_y", "score", "peak_score",
+                "penalty_timer", "death_timer", "flags",
+                "laser0_x", "laser0_timer", "laser0_phase", "laser1_x", "laser1_timer", "laser1_phase",
+                "spikes_x", "spikes_timer", "spikes_phase", "coin_count", "bullet_count")
+
+# 旗標位元
+PENALTY = 1
+DEAD = 2
+SHIELD = 4
+BLOCKING = 8
+JUMPING = 16
+SHOP_OPEN = 32
+
+# 危險物階段
+LOCKED, IDLE, WARNING, FIRING = range(4)
+
+
+def _phase(active, warning, firing):
+    if not active:
+        return LOCKED
+    return FIRING if firing else WARNING if warning else IDLE
+
+
+def _layout(width, height):
+    """回傳 (狀態, 金幣, 子彈, 像素) 在一格裡的位移與每格大小"""
+    state = SLOT_SEQ.size
+    coins = (state + STATE.size + 15) // 16 * 16
+    bullets = coins + MAX_COINS * 3 * 4
+    pixels = (bullets + MAX_BULLETS * 4 * 4 + 63) // 64 * 64
+    slot_size = (pixels + width * height * 4 + 63) // 64 * 64
+    return state, coins, bullets, pixels, slot_size
+
+
+class _Slot:
+    """一格的 numpy 視圖"""
+
+    def __init__(self, buf, offset, width, height):
+        state, coins, bullets, pixels, _ = _layout(width, height)
+        self.offset = offset
+        self.state_offset = offset + state
+        self.coins = np.ndarray((MAX_COINS, 3), np.int32, buf, offset + coins)
+        self.bullets = np.ndarray((MAX_BULLETS, 4), np.float32, buf, offset + bullets)
+        self.pixels = np.ndarray((height, width), np.uint32, buf, offset + pixels)
+
+
+class FrameExporter:
+    """遊戲端：建立共享記憶體並每幀 publish()"""
+
+    def __init__(self, name, size, shifts):
+        width, height = size
+        slot_size = _layout(width, height)[-1]
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER.size + 2 * slot_size)
+        self.buf = self.shm.buf
+        HEADER.pack_into(self.buf, 0, MAGIC, VERSION, 0, width, height, *shifts[:3], slot_size)
+        self.slots = [_Slot(self.buf, HEADER.size + i * slot_size, width, height) for i in range(2)]
+        self.seq = 0
+
+    def publish(self, surface, game):
+        seq = self.seq + 1
+        slot = self.slots[seq % 2]
+        buf = self.buf
+        SLOT_SEQ.pack_into(buf, slot.offset, seq, 0)
+
+        np.copyto(slot.pixels.T, surface.get_view("2"), casting="unsafe")
+
+        coins = [(c.rect.x, c.rect.y, c.style) for c in game.coins][:MAX_COINS]
+        if coins:
+            slot.coins[:len(coins)] = coins
+        bullets = [(b.rect.x, b.rect.y, b.vx, b.vy) for b in game.bullets][:MAX_BULLETS]
+        if bullets:
+            slot.bullets[:len(bullets)] = bullets
+
+        player = game.player
+        rect = player.rect
+        flags = (PENALTY if game.is_in_penalty_mode else 0) | (DEAD if game.is_dead else 0) | \
+            (SHIELD if player.shield_active else 0) | (BLOCKING if player.is_blocking else 0) | \
+            (JUMPING if player.is_jumping else 0) | (SHOP_OPEN if game.shop.is_open else 0)
+        lasers = []
+        for lc in game.laser_cannons[:2]:
+            lasers += (lc.x, lc.timer, _phase(lc.active, lc.is_warning, lc.is_firing))
+        spikes = game.ground_spikes
+        STATE.pack_into(buf, slot.state_offset, game.run_frames, rect.x, rect.y, rect.width, rect.height,
+                        player.velocity_y, game.score, game.peak_score, game.penalty_timer, game.death_timer,
+                        flags, *lasers, spikes.x, spikes.timer,
+                        _phase(spikes.active, spikes.is_warning, spikes.is_attacking), len(coins), len(bullets))
+
+        SLOT_SEQ.pack_into(buf, slot.offset, seq, seq)
+        SEQ.pack_into(buf, SEQ_OFFSET, seq)
+        self.seq = seq
+
+    def close(self):
+        self.slots = None
+        self.buf = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+class Frame:
+    """讀取端拿到的一幀：pixels/coins/bullets 都是共享記憶體上的視圖"""
+
+    def __init__(self, reader, seq, slot):
+        self.reader = reader
+        self.seq = seq
+        self.slot = slot
+        self.state = dict(zip(STATE_FIELDS, STATE.unpack_from(reader.buf, slot.state_offset)))
+        self.pixels = slot.pixels
+        self.coins = slot.coins[:self.state["coin_count"]]
+        self.bullets = slot.bullets[:self.state["bullet_count"]]
+
+    def valid(self):
+        """用完資料後呼叫：False 表示讀的時候寫入端已經覆寫這一格，應該捨棄"""
+        return SLOT_SEQ.unpack_from(self.reader.buf, self.slot.offset)[0] == self.seq
+
+    def rgb(self):
+        """(高, 寬, 3) 的 RGB 複本 (需要複製時才用)"""
+        rgb = np.empty(self.pixels.shape + (3,), np.uint8)
+        for channel, shift in enumerate(self.reader.shifts):
+            rgb[:, :, channel] = self.pixels >> shift
+        return rgb
+
+
+class FrameReader:
+    """分析端：連到遊戲建立的共享記憶體"""
+
+    def __init__(self, name):
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python 3.13 以前讀取端也會被 resource_tracker 追蹤，結束時把共享記憶體刪掉
+            from multiprocessing import resource_tracker
+            self.shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.buf = self.shm.buf
+        magic, version, _, width, height, r, g, b, slot_size = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"不是可讀取的共享記憶體: {name}")
+        self.size = (width, height)
+        self.shifts = (r, g, b)
+        self.slots = [_Slot(self.buf, HEADER.size + i * slot_size, width, height) for i in range(2)]
+
+    @property
+    def seq(self):
+        return SEQ.unpack_from(self.buf, SEQ_OFFSET)[0]
+
+    def latest(self, since=0):
+        """最新一幀的 Frame；還沒有比 since 新的幀、或剛好碰上寫入時回傳 None"""
+        seq = self.seq
+        if seq <= since:
+            return None
+        slot = self.slots[seq % 2]
+        if SLOT_SEQ.unpack_from(self.buf, slot.offset) != (seq, seq):
+            return None
+        return Frame(self, seq, slot)
+
+    def close(self):
+        self.slots = None
+        self.buf = None
+        self.shm.close()
+
+
+def watch(name, seconds=None):
+    """每秒印一次讀到的幀數、被覆寫而捨棄的幀數與目前狀態"""
+    reader = FrameReader(name)
+    frame = None
+    seen = torn = 0
+    last = 0
+    start = report = time.perf_counter()
+    try:
+        while seconds is None or time.perf_counter() - start < seconds:
+            frame = reader.latest(last)
+            if frame is None:
+                time.sleep(0.001)
+                continue
+            state = frame.state
+            height, width = frame.pixels.shape
+            center = int(frame.pixels[min(max(state["y"] + state["height"] // 2, 0), height - 1),
+                                      min(max(state["x"] + state["width"] // 2, 0), width - 1)])
+            if frame.valid():
+                seen += 1
+                last = frame.seq
+            else:
+                torn += 1
+            now = time.perf_counter()
+            if now - report >= 1.0:
+                print(f"seq {last}  frames {seen}  torn {torn}  score {state['score']}  "
+                      f"coins {state['coin_count']}  bullets {state['bullet_count']}  "
+                      f"player ({state['x']}, {state['y']})  pixel {center:08x}")
+                seen = torn = 0
+                report = now
+    except KeyboardInterrupt:
+        pass
+    del frame
+    reader.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "watch":
+        print("用法: python shmexport.py watch [名稱]")
+        sys.exit(1)
+    watch(sys.argv[2] if len(sys.argv) > 2 else "coin_game")
@@ -0,0 +1,205 @@
+"""長時間測試 (soak test)：無視窗、由自動駕駛連續玩好幾個小時，找記憶體洩漏與無上限的成長
+
+    python soak.py --hours 4 --seed 1
+    python soak.py --hours 1 --squadron 6 --csv soak.csv
+
+模擬以最快速度推進 (1 小時 = 216000 幀)，包含死亡後的 reset_game()、商店購買
+(buy_policy)、高分榜與遙測寫檔。每 SAMPLE_EVERY 模擬秒取樣一次：
+
+*   gc 追蹤中的物件依型別計數 (Player、Coin、Bullet、dict、list ...)
+*   all_sprites / coins / bullets 的大小、子彈池的備用數、雷射的匯聚粒子
+*   ResourceManager 與各類別的繪圖快取大小
+*   RSS (Linux 讀 /proc/self/statm，其他平台略過)
+*   step + draw 的平均時間 (不含自動駕駛思考)，看幀時間是否漂移
+
+結束時對暖機之後的樣本做檢查 (find_growth)：一路只增不減而且總增量超過門檻的
+序列、後三分之一的最小值仍高於前三分之一最大值的 RSS、以及幀時間漂移，
+都列為可疑並以結束碼 1 離開 (可以放進 CI)。
+"""
+import os
+import gc
+import sys
+import time
+import random
+import argparse
+import tempfile
+import collections
+
+SAMPLE_EVERY = 60           # 取樣間隔 (模擬秒)
+WARMUP = 0.25               # 前 25% 的樣本當暖機 (快取建立、高分榜填滿)，不檢查
+MIN_GROWTH = 50             # 計數類序列至少增加這麼多才算成長
+MIN_RSS_GROWTH = 4 << 20    # RSS 至少增加 4 MiB 才算成長
+MAX_DRIFT = 1.25            # 後四分之一的 step + draw 平均時間 / 前四分之一
+SOAK_ROLLOUTS = 12          # 自動駕駛每幀的推演數 (固定，結果可重現)
+PURCHASE_RESERVE = 2500     # 購買後至少留下的分數 (留在有雷射與尖刺的難度)
+PURCHASE_LIMIT = {"speed": 2, "jump": 2, "shield": 3}   # 每局最多買幾次 (技能本來就只能買一次)
+
+
+def rss_bytes():
+    """目前的常駐記憶體；平台不支援時回傳 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def buy_policy(game):
+    """買得起 (留下 PURCHASE_RESERVE) 的最便宜商品，每局不超過 PURCHASE_LIMIT；回傳是否買了"""
+    shop = game.shop
+    choices = sorted((item["cost"], index) for index, item in enumerate(shop.items)
+                     if not shop.owns(item["type"]) and game.score >= item["cost"] + PURCHASE_RESERVE
+                     and game.run_items.count(item["type"]) < PURCHASE_LIMIT.get(item["type"], 1))
+    return bool(choices) and shop.buy(choices[0][1], game.player)
+
+
+def sample(game):
+    """一次取樣：{序列名稱: 數值}"""
+    import engine
+    values = {}
+    gc.collect()    # 只留下真的還活著的物件
+    for name, count in collections.Counter(type(o).__name__ for o in gc.get_objects()).items():
+        values["objects." + name] = count
+    values["group.all_sprites"] = len(game.all_sprites)
+    values["group.coins"] = len(game.coins)
+    values["group.bullets"] = len(game.bullets)
+    values["group.bullet_pool"] = len(game.bullet_pool.free)
+    values["particles"] = sum(len(lc.energy_particles) for lc in game.laser_cannons)
+    rm = engine.resource_manager
+    values["cache.variants"] = len(rm.variants)
+    values["cache.rescaled"] = len(rm.rescaled)
+    values["cache.masks"] = len(rm.masks)
+    values["cache.laser_layers"] = len(engine.LaserCannon._layer_cache)
+    values["cache.spike_frames"] = len(engine.GroundSpikes._frame_cache) + len(engine.GroundSpikes._warning_cache)
+    values["run_items"] = len(game.run_items)
+    rss = rss_bytes()
+    if rss is not None:
+        values["rss"] = rss
+    return values
+
+
+def find_growth(samples, warmup=WARMUP):
+    """暖機後的樣本中可疑的序列：[(名稱, 原因)]"""
+    start = int(len(samples) * warmup)
+    steady = samples[start:]
+    if len(steady) < 4:
+        return []
+    findings = []
+    names = set().union(*(s for s in steady)) - {"time", "deaths", "purchases", "frame_ms"}
+    for name in sorted(names):
+        series = [s.get(name, 0) for s in steady]
+        threshold = MIN_RSS_GROWTH if name == "rss" else MIN_GROWTH
+        growth = series[-1] - series[0]
+        if growth >= threshold and all(b >= a for a, b in zip(series, series[1:])):
+            findings.append((name, f"monotonic growth {series[0]} -> {series[-1]}"))
+        elif name == "rss":
+            third = max(1, len(series) // 3)
+            if min(series[-third:]) - max(series[:third]) >= threshold:
+                findings.append((name, f"sustained growth {max(series[:third]) >> 20} MiB -> "
+                                       f"{min(series[-third:]) >> 20} MiB"))
+    quarter = max(1, len(steady) // 4)
+    early = sum(s["frame_ms"] for s in steady[:quarter]) / quarter
+    late = sum(s["frame_ms"] for s in steady[-quarter:]) / quarter
+    if early > 0 and late / early > MAX_DRIFT:
+        findings.append(("frame_ms", f"drift {early:.3f} ms -> {late:.3f} ms"))
+    return findings
+
+
+def soak(hours=1.0, seed=1, squadron=0, draw_every=10, sample_every=SAMPLE_EVERY, fps=60, out=sys.stdout):
+    """跑 hours 模擬小時，回傳 (樣本列表, 可疑序列)"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import pygame
+    import engine
+    import telemetry
+    from run_store import RunStore
+    from autopilot import Autopilot
+
+    random.seed(seed)
+    pygame.init()
+    screen = None
+    if draw_every:
+        screen = pygame.display.set_mode((engine.SCREEN_WIDTH, engine.SCREEN_HEIGHT))
+        engine.init_display()
+    workdir = tempfile.TemporaryDirectory(prefix="soak-")
+    recorder = telemetry.TelemetryRecorder(os.path.join(workdir.name, "telemetry"))
+    run_store = RunStore(os.path.join(workdir.name, "runs.db"))
+    game = engine.GameSession(recorder, run_store, squadron=squadron)
+    game.start("player")
+    bot = Autopilot(seed=seed, max_rollouts=SOAK_ROLLOUTS)
+
+    frames = int(hours * 3600 * fps)
+    interval = sample_every * fps
+    samples = []
+    deaths = purchases = 0
+    work = 0.0
+    print(f"{'sim time':>8} {'deaths':>6} {'buys':>5} {'objects':>8} {'sprites':>7} {'coins':>5} "
+          f"{'bullets':>7} {'parts':>5} {'caches':>6} {'RSS MiB':>8} {'step+draw ms':>12}", file=out)
+    try:
+        for frame in range(1, frames + 1):
+            controls = 0
+            if not game.is_dead:
+                if frame % fps == 0 and buy_policy(game):
+                    purchases += 1
+                controls = bot.decide(game)
+            was_dead = game.is_dead
+            start = time.perf_counter()
+            game.step(controls)
+            if screen is not None and frame % draw_every == 0:
+                game.draw(screen)
+            work += time.perf_counter() - start
+            if game.is_dead and not was_dead:
+                deaths += 1
+            if frame % interval == 0:
+                values = sample(game)
+                values.update(time=frame / fps, deaths=deaths, purchases=purchases, frame_ms=work / interval * 1000)
+                work = 0.0
+                samples.append(values)
+                objects = sum(v for k, v in values.items() if k.startswith("objects."))
+                caches = sum(v for k, v in values.items() if k.startswith("cache."))
+                rss = values.get("rss")
+                print(f"{time.strftime('%H:%M:%S', time.gmtime(frame // fps)):>8} {deaths:>6} {purchases:>5} "
+                      f"{objects:>8} {values['group.all_sprites']:>7} {values['group.coins']:>5} "
+                      f"{values['group.bullets']:>7} {values['particles']:>5} {caches:>6} "
+                      f"{rss / 2 ** 20 if rss else float('nan'):>8.1f} {values['frame_ms']:>12.3f}",
+                      file=out, flush=True)
+    finally:
+        recorder.close()
+        run_store.close()
+        pygame.quit()
+        workdir.cleanup()
+    return samples, find_growth(samples)
+
+
+def write_csv(path, samples):
+    import csv
+    names = sorted(set().union(*samples))
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        for values in samples:
+            writer.writerow([values.get(name, 0) for name in names])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="長時間測試：找記憶體洩漏與無上限的成長")
+    parser.add_argument("--hours", type=float, default=1.0, help="模擬時數 (預設 1)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--squadron", type=int, default=0, metavar="N", help="困難模式的編隊大小")
+    parser.add_argument("--draw-every", type=int, default=10, metavar="N",
+                        help="每 N 幀繪圖一次 (0 不繪圖)，繪圖快取也要檢查")
+    parser.add_argument("--sample-every", type=int, default=SAMPLE_EVERY, metavar="SECONDS",
+                        help="取樣間隔 (模擬秒)")
+    parser.add_argument("--csv", default=None, metavar="PATH", help="把所有樣本寫成 CSV")
+    args = parser.parse_args()
+    samples, findings = soak(args.hours, args.seed, args.squadron, args.draw_every, args.sample_every)
+    if args.csv:
+        write_csv(args.csv, samples)
+    if samples:
+        last = samples[-1]
+        print(f"{last['deaths']} deaths, {last['purchases']} purchases in {last['time'] / 3600:.2f} simulated hours")
+    for name, reason in findings:
+        print(f"SUSPECT {name}: {reason}")
+    if not findings:
+        print("no monotonic growth")
+    sys.exit(1 if findings else 0)
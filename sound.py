@@ -0,0 +1,209 @@
+"""音效引擎
+
+所有音效在 load() 時一次解碼成 pygame.mixer.Sound：assets/sounds/ 下有同名的
+wav/ogg 就用檔案，否則用程式合成，遊戲進行中播放時不會讀檔或解碼。
+
+*   pre_init() 要在 pygame.init() 之前呼叫，設定較小的混音緩衝區 (延遲約 buffer / 頻率)
+*   固定數量的聲道組成聲道池；聲道都在播時，優先權較高的音效搶走優先權最低的聲道，
+    否則這次不播
+*   同一個音效在幾個模擬幀內只播一次 (懲罰模式一幀可能接到好幾個金幣)；以 tick() 數的幀計，
+    --warp 加速時也一樣，不會因為牆上時間太短把音效幾乎都擋掉
+*   合成的音效依混音器實際協商到的格式 (pygame.mixer.get_init()：頻率、樣本格式、聲道數) 產生，
+    頻率不是 44100 Hz 時音高也正確
+
+沒有音效裝置 (伺服器、機器人、CI) 或 enabled=False 時 play() 什麼都不做，
+GameSession 預設就是這種狀態，和 TelemetryRecorder(None) 一樣。
+
+合成要用 numpy，只在 load() 真的需要合成時才匯入 (engine 匯入本模組時不需要)；
+沒有 numpy 時沒有音效檔的音效是一段靜音。
+"""
+import os
+import sys
+import zlib
+import functools
+
+import pygame
+
+FREQUENCY = 44100
+BUFFER = 512        # 樣本數；44100 Hz 下約 11.6 ms
+CHANNELS = 8
+SOUND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "sounds")
+
+LEVEL = 32000 / 32768   # 合成音效的最大振幅 (留一點餘裕)
+
+# 名稱 -> (優先權, 同一音效最短間隔 (模擬幀，60 幀 = 1 秒), 音量)
+SOUNDS = {
+    "coin":          (1, 2, 0.5),
+    "penalty":       (2, 4, 0.6),
+    "block":         (2, 5, 0.6),
+    "purchase":      (3, 0, 0.7),
+    "shield":        (3, 0, 0.7),
+    "bullet_fire":   (3, 2, 0.5),
+    "laser_warning": (4, 6, 0.6),
+    "laser_fire":    (4, 6, 0.8),
+    "spike_rise":    (4, 6, 0.7),
+    "death":         (5, 0, 0.9),
+}
+
+
+def pre_init(buffer=BUFFER):
+    pygame.mixer.pre_init(FREQUENCY, -16, 2, buffer)
+
+
+# --- 合成 (沒有音效檔時) ---
+def _tone(duration, freq_start, freq_end=None, wave="sine", decay=4.0, noise=0.0, rng=None, rate=FREQUENCY):
+    """單聲道 -1..1 的樣本 (numpy 陣列，每秒 rate 個)：頻率線性滑動、指數衰減，可混入雜訊"""
+    import numpy as np
+    freq_end = freq_start if freq_end is None else freq_end
+    count = int(duration * rate)
+    t = np.arange(count) / count
+    phase = np.cumsum((freq_start + (freq_end - freq_start) * t) / rate)
+    if wave == "square":
+        value = np.where(phase % 1.0 < 0.5, 1.0, -1.0)
+    elif wave == "saw":
+        value = 2.0 * (phase % 1.0) - 1.0
+    else:
+        value = np.sin(2 * np.pi * phase)
+    if noise:
+        value = value * (1 - noise) + rng.uniform(-1.0, 1.0, count) * noise
+    return value * np.exp(-decay * t)
+
+
+def _concat(*parts):
+    import numpy as np
+    return np.concatenate(parts)
+
+
+def _mix(*parts):
+    import numpy as np
+    length = max(len(part) for part in parts)
+    total = np.zeros(length)
+    for part in parts:
+        total[:len(part)] += part
+    return total / len(parts)
+
+
+def synthesize(name, rate=FREQUENCY):
+    import numpy as np
+    rng = np.random.default_rng(zlib.crc32(name.encode()))   # 每次合成結果相同
+    tone = functools.partial(_tone, rate=rate)
+    if name == "coin":
+        return _concat(tone(0.05, 988, wave="square", decay=1), tone(0.12, 1319, wave="square"))
+    if name == "penalty":
+        return tone(0.25, 300, 150, wave="square", decay=3)
+    if name == "block":
+        return tone(0.08, 160, 90, decay=6, noise=0.3, rng=rng)
+    if name == "purchase":
+        return _concat(tone(0.07, 523, decay=1), tone(0.07, 659, decay=1), tone(0.2, 784))
+    if name == "shield":
+        return _mix(tone(0.35, 523, 600, decay=3), tone(0.35, 659, 760, decay=3))
+    if name == "bullet_fire":
+        return tone(0.1, 1200, 300, wave="square", decay=5)
+    if name == "laser_warning":
+        return tone(0.5, 400, 900, decay=1.5)
+    if name == "laser_fire":
+        return tone(0.45, 110, 70, wave="saw", decay=3, noise=0.5, rng=rng)
+    if name == "spike_rise":
+        return tone(0.25, 220, 60, wave="saw", decay=4, noise=0.6, rng=rng)
+    if name == "death":
+        return tone(0.9, 600, 80, wave="square", decay=2.5)
+    raise KeyError(name)
+
+
+def _to_sound(samples, mixer):
+    """-1..1 樣本轉成混音器格式 (mixer = pygame.mixer.get_init()，依聲道數複製) 的 Sound"""
+    import numpy as np
+    _, size, channels = mixer
+    samples = np.clip(samples, -1.0, 1.0) * LEVEL
+    bits = abs(size)
+    if bits == 32:      # 32 位元浮點數 (pygame 回報成 -32)
+        pcm = samples.astype(np.float32)
+    elif size < 0:      # 有號整數
+        pcm = (samples * (1 << (bits - 1))).astype(f"i{bits // 8}")
+    else:               # 無號整數，靜音在中間
+        pcm = ((samples + 1.0) * (1 << (bits - 1))).clip(0, (1 << bits) - 1).astype(f"u{bits // 8}")
+    return pygame.mixer.Sound(buffer=np.repeat(pcm, channels).tobytes())
+
+
+def _silence(mixer, seconds=0.1):
+    """混音器格式的靜音 (沒有 numpy 時代替合成的音效)"""
+    frequency, size, channels = mixer
+    width = abs(size) // 8
+    zero = bytes(width) if size < 0 else (1 << (abs(size) - 1)).to_bytes(width, sys.byteorder)
+    return pygame.mixer.Sound(buffer=zero * (channels * int(frequency * seconds)))
+
+
+class SoundEngine:
+    def __init__(self, enabled=True, channels=CHANNELS):
+        self.enabled = enabled and pygame.mixer.get_init() is not None
+        self.sounds = {}            # 名稱 -> (Sound, 優先權, 最短間隔幀數)
+        self.last_played = {}       # 名稱 -> 上次播放的幀
+        self.frame = 0
+        self.played = 0
+        self.dropped_rate = 0       # 因為間隔太短沒播
+        self.dropped_busy = 0       # 聲道都被更重要的音效佔用
+        self.channels = []
+        self.channel_priority = []
+        if self.enabled:
+            pygame.mixer.set_num_channels(channels)
+            self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+            self.channel_priority = [0] * channels
+            self.load()
+
+    def load(self):
+        """解碼/合成所有音效；之後播放不會再讀檔"""
+        mixer = pygame.mixer.get_init()
+        for name, (priority, interval, volume) in SOUNDS.items():
+            sound = None
+            for ext in (".wav", ".ogg"):
+                path = os.path.join(SOUND_DIR, name + ext)
+                if os.path.exists(path):
+                    try:
+                        sound = pygame.mixer.Sound(path)
+                    except pygame.error:
+                        sound = None
+                    break
+            if sound is None:
+                try:
+                    sound = _to_sound(synthesize(name, mixer[0]), mixer)
+                except ImportError:     # 沒有 numpy：0.1 秒的靜音
+                    sound = _silence(mixer)
+            sound.set_volume(volume)
+            self.sounds[name] = (sound, priority, interval)
+
+    def tick(self):
+        """每個模擬幀呼叫一次 (GameSession.step)，限流以這個幀數計"""
+        self.frame += 1
+
+    def play(self, name):
+        if not self.enabled:
+            return False
+        sound, priority, interval = self.sounds[name]
+        now = self.frame
+        last = self.last_played.get(name)
+        if last is not None and now - last < interval:
+            self.dropped_rate += 1
+            return False
+
+        # 先找空聲道，沒有就搶優先權最低 (且比這個音效低) 的聲道
+        victim = None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                victim = i
+                break
+            if self.channel_priority[i] < priority and \
+                    (victim is None or self.channel_priority[i] < self.channel_priority[victim]):
+                victim = i
+        if victim is None:
+            self.dropped_busy += 1
+            return False
+        channel = self.channels[victim]
+        channel.stop()
+        channel.play(sound)
+        self.channel_priority[victim] = priority
+        self.last_played[name] = now
+        self.played += 1
+        return True
+
+    def stats(self):
+        return f"{self.played} played, {self.dropped_rate} rate-limited, {self.dropped_busy} no channel"
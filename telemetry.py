@@ -0,0 +1,260 @@
+"""遊戲事件遙測：固定大小的 struct 緩衝區 + 背景寫入執行緒
+
+遊戲迴圈只做 struct.pack_into 到預先配置好的 bytearray，
+緩衝區寫滿後整塊交給背景執行緒附加寫入檔案，主迴圈永遠不會等待磁碟。
+
+檔案格式 (little-endian)：
+    檔頭   MAGIC(4s) 版本(H) 單筆大小(H) 開始時間(d)
+    紀錄   frame(I) kind(B) detail(B) pad(2) value(i) score(i)   共 16 bytes
+
+讀取：python telemetry.py summary telemetry/
+比較兩次遊玩的狀態雜湊：python telemetry.py desync a.bin b.bin
+"""
+import os
+import sys
+import time
+import struct
+import queue
+import threading
+from collections import Counter
+
+# --- 檔案格式 ---
+MAGIC = b"CGTL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHd")
+RECORD = struct.Struct("<IBBxxii")
+
+# --- 事件種類 (kind) ---
+COIN_CAUGHT = 1     # 接到金幣，value = 得分
+COIN_MISSED = 2     # 漏接金幣，value = -5
+PENALTY_HIT = 3     # 接到懲罰金幣，value = -100
+SHIELD_USED = 4     # 啟動護盾，detail = 剩餘護盾數 (detail 只有 1 byte，超過 255 記成 255)
+BLOCK_USED = 5      # 開始格擋
+SHOP_PURCHASE = 6   # 商店購買，detail = 商品索引，value = 花費
+DEATH = 7           # 死亡，detail = 死因
+STATE_HASH = 8      # 狀態雜湊 (statehash.py)，detail = 欄位索引，value = CRC32 (有號)
+
+EVENT_NAMES = {
+    COIN_CAUGHT: "coin_caught",
+    COIN_MISSED: "coin_missed",
+    PENALTY_HIT: "penalty_hit",
+    SHIELD_USED: "shield_used",
+    BLOCK_USED: "block_used",
+    SHOP_PURCHASE: "shop_purchase",
+    DEATH: "death",
+    STATE_HASH: "state_hash",
+}
+
+# --- 死因 (DEATH 事件的 detail) ---
+CAUSE_NONE = 0
+CAUSE_LASER = 1
+CAUSE_SPIKE = 2
+CAUSE_BULLET = 3
+CAUSE_BANKRUPT = 4  # 分數跌到 0 以下
+
+CAUSE_NAMES = {
+    CAUSE_NONE: "none",
+    CAUSE_LASER: "laser",
+    CAUSE_SPIKE: "spike",
+    CAUSE_BULLET: "bullet",
+    CAUSE_BANKRUPT: "bankrupt",
+}
+
+
+class TelemetryRecorder:
+    """把遊戲事件打包進固定大小的緩衝區，寫滿後交給背景執行緒批次寫檔"""
+
+    def __init__(self, directory=None, capacity=4096, spare_buffers=4):
+        self.enabled = directory is not None
+        self.frame = 0
+        self.dropped = 0      # 寫入端跟不上時被丟棄的事件數
+        self.written = 0      # 已交給寫入執行緒的事件數
+        if not self.enabled:
+            return
+
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(directory, f"session-{stamp}-{os.getpid()}.bin")
+        self.capacity = capacity
+        buffer_size = capacity * RECORD.size
+
+        # 空緩衝區池：主迴圈只從這裡拿，拿不到就丟事件，不會阻塞
+        self._free = queue.Queue()
+        for _ in range(spare_buffers):
+            self._free.put(bytearray(buffer_size))
+        self._pending = queue.Queue()
+        self._buffer = bytearray(buffer_size)
+        self._count = 0
+
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, time.time()))
+        self._writer = threading.Thread(target=self._write_loop, name="telemetry-writer", daemon=True)
+        self._writer.start()
+
+    def tick(self):
+        """每個模擬幀呼叫一次，事件會標上目前的幀號"""
+        self.frame += 1
+
+    def record(self, kind, value=0, score=0, detail=0):
+        if not self.enabled:
+            return
+        if self._buffer is None:
+            # 沒有可用的空緩衝區 (寫入端落後)，直接丟棄
+            self._buffer = self._take_free_buffer()
+            if self._buffer is None:
+                self.dropped += 1
+                return
+        RECORD.pack_into(self._buffer, self._count * RECORD.size, self.frame, kind, detail, value, score)
+        self._count += 1
+        if self._count >= self.capacity:
+            self.flush()
+
+    def flush(self):
+        """把目前累積的事件交給寫入執行緒 (不等待寫入完成)"""
+        if not self.enabled or self._buffer is None or self._count == 0:
+            return
+        self._pending.put((self._buffer, self._count))
+        self.written += self._count
+        self._buffer = self._take_free_buffer()
+        self._count = 0
+
+    def close(self):
+        """結束時呼叫：送出剩餘事件並等待寫入執行緒收尾"""
+        if not self.enabled:
+            return
+        self.flush()
+        self._pending.put(None)
+        self._writer.join()
+        self._file.close()
+        self.enabled = False
+
+    def _take_free_buffer(self):
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _write_loop(self):
+        while True:
+            job = self._pending.get()
+            if job is None:
+                break
+            buffer, count = job
+            self._file.write(memoryview(buffer)[:count * RECORD.size])
+            self._file.flush()
+            self._free.put(buffer)
+
+
+# --- 讀取工具 ---
+
+def _list_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(".bin"):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def read_events(paths):
+    """讀取一個或多個遙測檔 (或資料夾)，回傳欄位式 numpy 陣列的 dict
+
+    回傳的 key：session, frame, kind, detail, value, score
+    """
+    import numpy as np
+
+    dtype = np.dtype([("frame", "<u4"), ("kind", "u1"), ("detail", "u1"),
+                      ("pad", "V2"), ("value", "<i4"), ("score", "<i4")])
+    assert dtype.itemsize == RECORD.size
+
+    chunks = []
+    sessions = []
+    for session_id, path in enumerate(_list_files(paths)):
+        with open(path, "rb") as f:
+            magic, version, record_size, _ = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                raise ValueError(f"不是可讀取的遙測檔: {path}")
+            data = np.fromfile(f, dtype=dtype)
+        chunks.append(data)
+        sessions.append(np.full(len(data), session_id, dtype=np.uint32))
+
+    if not chunks:
+        data = np.zeros(0, dtype=dtype)
+        session = np.zeros(0, dtype=np.uint32)
+    else:
+        data = np.concatenate(chunks)
+        session = np.concatenate(sessions)
+    return {
+        "session": session,
+        "frame": data["frame"],
+        "kind": data["kind"],
+        "detail": data["detail"],
+        "value": data["value"],
+        "score": data["score"],
+    }
+
+
+def summarize(columns):
+    """以 bincount 彙總事件數與死因，適合上百萬筆事件"""
+    import numpy as np
+
+    kind_counts = np.bincount(columns["kind"], minlength=max(EVENT_NAMES) + 1)
+    deaths = columns["kind"] == DEATH
+    cause_counts = np.bincount(columns["detail"][deaths], minlength=max(CAUSE_NAMES) + 1)
+    purchases = columns["kind"] == SHOP_PURCHASE
+    return {
+        "sessions": int(len(np.unique(columns["session"]))),
+        "events": int(len(columns["kind"])),
+        "by_kind": {name: int(kind_counts[k]) for k, name in EVENT_NAMES.items()},
+        "death_causes": {name: int(cause_counts[c]) for c, name in CAUSE_NAMES.items() if cause_counts[c]},
+        "credits_spent": int(columns["value"][purchases].sum()),
+    }
+
+
+def find_desync(first, second):
+    """比較兩份紀錄的 STATE_HASH 事件，回傳第一個不同的 (幀號, 欄位索引, a, b)；
+    兩份以 (幀號, 欄位) 對齊，某一邊少了這筆時 a 或 b 為 None，完全相同時回傳 None"""
+    runs = []
+    for columns in (first, second):
+        hashes = columns["kind"] == STATE_HASH
+        values = {}
+        seen = Counter()
+        for frame, field, value in zip(columns["frame"][hashes].tolist(), columns["detail"][hashes].tolist(),
+                                       columns["value"][hashes].tolist()):
+            # 同一個檔案附加了好幾次遊玩時幀號會重複，第幾次出現也算進鍵裡
+            key = (frame, field)
+            values[seen[key], frame, field] = value
+            seen[key] += 1
+        runs.append(values)
+    a, b = runs
+    for key in sorted(a.keys() | b.keys()):
+        if a.get(key) != b.get(key):
+            _, frame, field = key
+            return frame, field, a.get(key), b.get(key)
+    return None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "desync":
+        from statehash import FIELDS
+        result = find_desync(read_events(sys.argv[2:3]), read_events(sys.argv[3:4]))
+        if result is None:
+            print("state hashes identical")
+            sys.exit(0)
+        frame, field, a, b = result
+        print(f"first divergence at frame {frame}: {FIELDS[field]} ({a} != {b})")
+        sys.exit(2)
+    if len(sys.argv) < 3 or sys.argv[1] != "summary":
+        print("用法: python telemetry.py summary <檔案或資料夾> ...")
+        print("      python telemetry.py desync <a.bin> <b.bin>")
+        sys.exit(1)
+    result = summarize(read_events(sys.argv[2:]))
+    print(f"Sessions: {result['sessions']}  Events: {result['events']}")
+    for name, count in result["by_kind"].items():
+        print(f"  {name:<14} {count}")
+    print("Death causes:")
+    for name, count in result["death_causes"].items():
+        print(f"  {name:<14} {count}")
+    print(f"Credits spent: {result['credits_spent']}")
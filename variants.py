@@ -0,0 +1,83 @@
+"""遊戲版本外掛 (--variant)
+
+所有版本共用 engine.py 的 GameSession 與實體，版本之間的差別都寫在這裡：
+
+*   laser：雷射特效美化版 (預設)
+*   flash：終極強化版，商店多一項「閃現」(3567 分)，按 B 瞬移到滑鼠位置，冷卻 30 秒；
+    落點在 FLASH_SAFE_FRAMES 幀內會被雷射/尖刺/子彈打到時改落在最近的安全位置 (hazardmap.py)
+    規則沿用原本 test.py 的版本：第三座雷射 (6000 分解鎖)、護盾不擋子彈也不擋金幣、格擋時照樣接金幣、
+    懲罰模式中漏接一般金幣也扣 5 分。閃現與格擋只能買一次 (商店標 OWNED；原本可以重複買但沒有效果)
+
+新增版本：繼承 Variant，覆寫需要的掛勾，用 @register 登記後 --variant 就能選。
+解析參數時就要匯入本模組，所以 pygame 與 engine 都在掛勾裡才匯入。
+"""
+VARIANTS = {}
+
+
+def register(cls):
+    VARIANTS[cls.name] = cls
+    return cls
+
+
+@register
+class Variant:
+    name = "laser"
+    caption = "接金幣遊戲 (雷射特效美化版)"
+
+    def configure(self, game):
+        """GameSession 建立後呼叫一次 (加商品等)"""
+
+    def handle_key(self, game, key, mouse_pos):
+        """遊戲中按下的按鍵 (KEYDOWN)；mouse_pos 為邏輯座標"""
+
+    def draw_overlay(self, game, surface):
+        """在 GameSession.draw 之後畫版本專屬的介面 (邏輯解析度)"""
+
+
+FLASH_ITEM = {"name": "閃現 (Flash Step) [B]", "cost": 3567, "type": "flash_step"}
+FLASH_SAFE_FRAMES = 30  # 落點至少要安全這麼多幀
+
+
+@register
+class FlashStepVariant(Variant):
+    name = "flash"
+    caption = "接金幣遊戲 - 終極強化版 (包含閃現與進階挑戰)"
+
+    def __init__(self):
+        self.labels = {}    # 冷卻秒數 -> 文字 Surface
+        self.hazards = None # 第一次閃現時才建立的 hazardmap.HazardMap
+
+    def configure(self, game):
+        import engine
+        game.shop.items.append(dict(FLASH_ITEM))
+        game.laser_cannons.append(engine.LaserCannon(6000))
+        game.shield_stops_bullets = False
+        game.guards_stop_coins = False
+        game.miss_penalty_in_penalty = True
+
+    def handle_key(self, game, key, mouse_pos):
+        import pygame
+        if key == pygame.K_b and not game.is_dead and game.player.flash_timer == 0:
+            game.player.flash_step(self.landing(game, mouse_pos))
+
+    def landing(self, game, pos):
+        """pos 在 FLASH_SAFE_FRAMES 幀內會致命時，改成同高度最近的安全位置 (到處都危險就照原位置)"""
+        if self.hazards is None:
+            from hazardmap import HazardMap
+            self.hazards = HazardMap()
+        self.hazards.sync(game)
+        x = self.hazards.nearest_safe(pos[0], game.player.hit_rect.width, FLASH_SAFE_FRAMES)
+        return pos if x is None else (x, pos[1])
+
+    def draw_overlay(self, game, surface):
+        if not game.shop.has_flash_step or game.player is None:
+            return
+        import pygame
+        import engine
+        seconds = (game.player.flash_timer + 59) // 60
+        label = self.labels.get(seconds)
+        if label is None:
+            text, color = (f"Flash CD: {seconds}s", engine.RED) if seconds else ("Flash READY (B)", engine.YELLOW)
+            label = self.labels[seconds] = engine.shop_font.render(text, True, color)
+        pygame.draw.rect(surface, engine.DARK_GRAY, (10, 155, 260, 30), border_radius=8)
+        surface.blit(label, (20, 158))
@@ -0,0 +1,180 @@
+"""分割畫面的本機雙人對戰 (--players 2)
+
+兩個玩家各自用 CharacterSelector 選角色，共用一個鍵盤 (KEYMAPS)，在同一場金幣雨與
+危險物裡搶分。每個玩家是一個 engine.Seat：自己的分數、商店 (護盾、格擋、升級)、
+懲罰與死亡狀態；世界只有一份：雷射、尖刺、空中敵人、金幣、子彈與 all_sprites 都是
+VersusSession (GameSession) 本身的，圖片、遮罩與介面圖層也都共用 resource_manager
+的快取，所以第二個玩家只多一個 Player 精靈、一組 HUD 與碰撞判定裡的一次比對
+(GameSession.check_hazards / collect_coins 對所有玩家只走訪一次金幣與子彈)。
+
+*   場上分數最高的玩家 (leader) 決定難度：危險物解鎖、金幣樣式與懲罰金幣雨，
+    空中敵人也瞄準他。GameSession 層級的 score/player/is_dead 等欄位跟著 leader
+    (is_dead 是全部陣亡)，只讀單人欄位的 metrics、hazardmap 照常運作
+*   死掉的玩家離場 120 幀後以新的一局 (分數歸零、商店清空) 重生，其他人繼續玩；
+    全部陣亡時世界暫停
+*   任何一人打開商店時整個模擬暫停 (與單人相同)
+*   畫面左右各半是兩個玩家的視窗：各自的 HUD 與死亡畫面；世界只畫一次
+
+python bench.py versus 量第二個玩家的邊際成本。
+"""
+import pygame
+
+import engine
+from engine import (GameSession, Seat, Player, SCREEN_WIDTH, SCREEN_HEIGHT, NORMAL_COIN_FREQUENCY,
+                    PENALTY_COIN_FREQUENCY, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP, INPUT_SHIELD, INPUT_BLOCK)
+
+# 每個玩家的 (左, 右, 跳, 護盾, 格擋) 按鍵與 HUD/商店上顯示的 (護盾, 格擋) 按鍵名稱
+KEYMAPS = (
+    ((pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_x, pygame.K_f), ("X", "F")),
+    ((pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN, pygame.K_RCTRL), ("DOWN", "R-CTRL")),
+)
+MAX_SEATS = len(KEYMAPS)
+LABEL_COLORS = (engine.GOLD, (120, 200, 255))
+
+
+class VersusSession(GameSession):
+    def __init__(self, recorder=None, run_store=None, squadron=0, sound=None, seats=2):
+        super().__init__(recorder, run_store, squadron, sound)
+        self.seats = []
+        for i in range(seats):
+            seat = Seat(self.recorder, run_store, self.sound)
+            seat.key_names = shield_key, block_key = KEYMAPS[i][1]
+            for item in seat.shop.items:
+                item["name"] = item["name"].replace("[X]", f"[{shield_key}]").replace("[F]", f"[{block_key}]")
+            self.seats.append(seat)
+        width = SCREEN_WIDTH // seats
+        self.views = [pygame.Rect(i * width, 0, width, SCREEN_HEIGHT) for i in range(seats)]
+        self.spawn_x = [view.centerx for view in self.views]
+        self.labels = None  # 玩家頭上的 P1/P2 (第一次繪製時渲染)
+        self.leader = self.seats[0]
+
+    def start(self, characters):
+        """characters：每個座位選的角色"""
+        for seat, character in zip(self.seats, characters):
+            seat.character = character
+            self.spawn(seat)
+        self.follow_leader()
+
+    def spawn(self, seat):
+        """seat 的玩家從自己那半邊的中間出場"""
+        player = seat.player = Player(seat, seat.character)
+        player.rect.centerx = self.spawn_x[self.seats.index(seat)]
+        player.hit_rect.center = player.rect.center
+        self.all_sprites.add(player)
+
+    def reset_game(self):
+        for seat in self.seats:
+            seat.reset_seat()
+        for lc in self.laser_cannons: lc.reset_cycle()
+        self.ground_spikes.reset_cycle()
+        if self.formation: self.formation.reset()
+        for sprite in self.all_sprites: sprite.kill()
+        self.bullets.empty()
+        for seat in self.seats:
+            if seat.player:
+                self.spawn(seat)
+        self.follow_leader()
+
+    def follow_leader(self):
+        """GameSession 層級的欄位跟著場上分數最高的玩家 (同分時座位在前的優先)"""
+        alive = [seat for seat in self.seats if not seat.is_dead]
+        leader = self.leader = max(alive or self.seats, key=lambda seat: seat.score)
+        self.player = leader.player
+        self.shop = leader.shop
+        self.score = leader.score
+        self.is_in_penalty_mode = leader.is_in_penalty_mode
+        self.has_cleared_penalty = leader.has_cleared_penalty
+        self.penalty_timer = leader.penalty_timer
+        self.peak_score = max(seat.peak_score for seat in self.seats)
+        self.is_dead = not alive
+
+    def live_players(self):
+        return tuple(seat.player for seat in self.seats if not seat.is_dead and seat.player)
+
+    def read_controls(self, key_downs, held):
+        """這一幀按下的按鍵 (KEYDOWN) 與按住的按鍵 (pygame.key.get_pressed()) -> 每個座位的 INPUT_* 位元遮罩"""
+        controls = []
+        for (left, right, jump, shield, block), _ in KEYMAPS[:len(self.seats)]:
+            bits = 0
+            if held[left]: bits |= INPUT_LEFT
+            if held[right]: bits |= INPUT_RIGHT
+            if held[block]: bits |= INPUT_BLOCK
+            if jump in key_downs: bits |= INPUT_JUMP
+            if shield in key_downs: bits |= INPUT_SHIELD
+            controls.append(bits)
+        return controls
+
+    def handle_click(self, pos):
+        """沒有商店打開時點自己的 HUD 打開商店；打開後點擊都交給那個商店 (點 HUD 關閉)"""
+        opened = next((i for i, seat in enumerate(self.seats) if seat.shop.is_open), None)
+        if opened is None:
+            for seat, view in zip(self.seats, self.views):
+                if not seat.is_dead and pygame.Rect(view.x, 0, 250, 150).collidepoint(pos):
+                    seat.shop.is_open = True
+                    return
+            return
+        seat = self.seats[opened]
+        if pygame.Rect(self.views[opened].x, 0, 250, 150).collidepoint(pos):
+            seat.shop.is_open = False
+        else:
+            seat.shop.handle_click(pos, seat.player)
+
+    def step(self, controls):
+        """推進一幀；controls 為每個座位的 INPUT_* 位元遮罩"""
+        seats = self.seats
+        for seat, bits in zip(seats, controls):
+            if not seat.is_dead:
+                if bits & INPUT_JUMP: seat.player.jump()
+                if bits & INPUT_SHIELD: seat.player.activate_shield()
+        if any(seat.shop.is_open for seat in seats):
+            return
+
+        players = self.live_players()
+        if players:
+            for player in players:
+                player.check_evolution(player.game.score)
+            self.follow_leader()
+            self.update_hazards(self.player.hit_rect)
+            self.check_hazards(players)
+
+            for seat, bits in zip(seats, controls):
+                seat.player.controls = bits
+            self.all_sprites.update()
+            self.coin_counter += 1
+            self.recorder.tick()
+            self.sound.tick()
+
+            freq = PENALTY_COIN_FREQUENCY if self.is_in_penalty_mode else NORMAL_COIN_FREQUENCY
+            if self.coin_counter % freq == 0: self.spawn_coin()
+
+            self.collect_coins(players)
+            for player in players:
+                seat = player.game
+                seat.run_frames += 1
+                seat.peak_score = max(seat.peak_score, seat.score)
+                if seat.is_dead:
+                    player.kill()   # 離場到重生為止
+
+        for seat in seats:
+            if seat.is_dead:
+                seat.death_timer -= 1
+                if seat.death_timer <= 0:
+                    seat.reset_seat()
+                    self.spawn(seat)
+        self.follow_leader()
+
+    def draw_ui(self, surface):
+        """每個座位的視窗裡畫自己的 HUD 與死亡畫面，玩家頭上標 P1/P2；打開的商店蓋住整個畫面"""
+        if self.labels is None:
+            self.labels = [engine.shop_font.render(f"P{i + 1}", True, LABEL_COLORS[i % len(LABEL_COLORS)])
+                           for i in range(len(self.seats))]
+        for seat, view, label in zip(self.seats, self.views, self.labels):
+            viewport = surface.subsurface(view)
+            seat.draw_hud(viewport)
+            if seat.is_dead:
+                seat.draw_death_screen(viewport)
+            else:
+                rect = seat.player.rect
+                surface.blit(label, (rect.centerx - label.get_width() // 2, rect.top - label.get_height()))
+        for seat in self.seats:
+            seat.shop.draw(surface)